@@ -25,8 +25,8 @@ class BacktestEngine:
             # 计算持仓
             self.positions = signals.shift(1).fillna(0)
             
-            # 计算收益
-            returns = data['close'].pct_change()
+            # 计算收益, 资金曲线需要逐日累乘, 始终用 float64
+            returns = data['close'].astype(np.float64).pct_change()
             strategy_returns = self.positions * returns
             
             # 计算资金曲线
@@ -0,0 +1,109 @@
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from .sweep import OBJECTIVES, TRADING_DAYS
+from ..indicators.rolling import CHUNK_ELEMENTS, rolling_mean_matrix
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 短、长均线的相对差小于该值时视为相等, 信号为0
+TIE_TOLERANCE = 1e-10
+
+def evaluate_ma_grid(
+    close: pd.Series,
+    short_windows: Sequence[int],
+    long_windows: Sequence[int],
+    cost_rate: Optional[float] = None,
+    chunk_elements: int = CHUNK_ELEMENTS
+) -> pd.DataFrame:
+    """批量评估均线交叉 (MAStrategy) 的全部参数组合
+
+    全部用到的窗口由一次累加和得到 (窗口数 × 时间) 的均线矩阵, 每个 short < long
+    的组合按 MAStrategy 的规则取信号 (短均线在上为1、在下为-1, 相等或无值时为0), 滞后一日
+    成为持仓, 持仓变化按 ``cost_rate`` 扣费, 与 ParameterSweep 用同样的定义计算
+    OBJECTIVES 中的全部指标。组合按块计算, 每块的 (组合数 × 时间) 不超过
+    ``chunk_elements`` 个元素, 临时内存与网格大小无关。
+
+    Returns:
+        每个组合一行: short_window、long_window 和各项指标, 可用
+        ``pivot(index='short_window', columns='long_window', values='sharpe')`` 画热力图
+    """
+    start = time.perf_counter()
+    if cost_rate is None:
+        settings = Config().get('backtest') or {}
+        cost_rate = settings.get('commission_rate', 0.0) + settings.get('slippage_rate', 0.0)
+    short_windows = np.asarray(short_windows, dtype=np.int64)
+    long_windows = np.asarray(long_windows, dtype=np.int64)
+    shorts, longs = np.meshgrid(short_windows, long_windows, indexing='ij')
+    valid = shorts < longs
+    shorts, longs = shorts[valid], longs[valid]
+
+    prices = close.to_numpy(dtype=np.float64)
+    windows, inverse = np.unique(np.concatenate([shorts, longs]), return_inverse=True)
+    averages = rolling_mean_matrix(prices, windows)
+    short_rows, long_rows = inverse[:len(shorts)], inverse[len(shorts):]
+
+    asset_returns = np.zeros(len(prices))
+    if len(prices) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            asset_returns[1:] = prices[1:] / prices[:-1] - 1
+        np.nan_to_num(asset_returns, copy=False, nan=0.0)
+
+    metrics = {name: np.full(len(shorts), np.nan) for name in OBJECTIVES}
+    step = max(1, chunk_elements // max(len(prices), 1))
+    for begin in range(0, len(shorts), step):
+        rows = slice(begin, begin + step)
+        for name, values in _grid_metrics(
+            averages[short_rows[rows]], averages[long_rows[rows]], asset_returns, cost_rate
+        ).items():
+            metrics[name][rows] = values
+
+    logger.info(f"均线网格: {len(shorts)} 组参数, {len(windows)} 条均线, 用时 {time.perf_counter() - start:.3f}秒")
+    return pd.DataFrame({'short_window': shorts, 'long_window': longs, **metrics})
+
+def _grid_metrics(
+    short_ma: np.ndarray,
+    long_ma: np.ndarray,
+    asset_returns: np.ndarray,
+    cost_rate: float
+) -> Dict[str, np.ndarray]:
+    """一块组合的信号、策略收益和指标, 输入为 (组合数 × 时间)"""
+    # 信号: 差值的符号, 均线无值 (NaN) 时为0; 缓冲区依次复用。两条均线在数学上
+    # 相等时 (例如价格不变), 累加和与 pandas 的舍入误差都可能给出任意符号, 相对差
+    # 小于 TIE_TOLERANCE 时按相等处理
+    signals = np.subtract(short_ma, long_ma, out=short_ma)
+    decided = np.abs(signals) > TIE_TOLERANCE * np.abs(long_ma)
+    np.sign(signals, out=signals)
+    signals[~decided] = 0.0
+
+    positions = np.zeros_like(signals)
+    positions[:, 1:] = signals[:, :-1]
+    returns = np.multiply(positions, asset_returns, out=long_ma)
+    if cost_rate:
+        trades = np.subtract(positions[:, 1:], positions[:, :-1], out=signals[:, 1:])
+        returns[:, 1:] -= np.abs(trades, out=trades) * cost_rate
+
+    n = returns.shape[1]
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1) if n > 1 else np.full(len(returns), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, np.sqrt(TRADING_DAYS) * mean / std, np.nan)
+
+    equity = np.add(returns, 1, out=returns)
+    np.cumprod(equity, axis=1, out=equity)
+    growth = equity[:, -1].copy()
+    peak = np.maximum.accumulate(equity, axis=1, out=positions)
+    drawdown = (np.divide(equity, peak, out=equity) - 1).min(axis=1)
+    annual = growth ** (TRADING_DAYS / max(n, 1)) - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calmar = np.where(drawdown < 0, annual / -drawdown, np.nan)
+    return {
+        'sharpe': sharpe,
+        'total_return': growth - 1,
+        'annual_return': annual,
+        'max_drawdown': drawdown,
+        'calmar': calmar,
+    }
@@ -21,8 +21,8 @@ class PerformanceAnalyzer:
     def calculate_metrics(self) -> Dict:
         """计算性能指标"""
         try:
-            # 计算收益率
-            self.returns = self.data['close'].pct_change()
+            # 计算收益率, 累计收益和方差始终用 float64
+            self.returns = self.data['close'].astype(np.float64).pct_change()
             self.cum_returns = (1 + self.returns).cumprod()
             
             # 年化收益率
@@ -0,0 +1,171 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PortfolioBacktestEngine:
+    """多股票组合回测引擎
+
+    输入为对齐的 (日期 × 股票) 收盘价和目标权重面板, 第 t 日收盘按目标权重调仓,
+    持有到第 t+1 日收盘, 与 ``BacktestEngine`` 中信号滞后一日生效的约定一致。
+    没有停牌时换手、交易成本、现金和资金曲线都按整个面板一次性计算:
+
+    - 调仓前权重为上一日目标权重随当日涨跌漂移后的权重, 换手 = Σ|目标 - 漂移后|;
+    - 成本 = 换手 × (佣金率 + 滑点率), 按调仓时的资产计;
+    - 现金权重 = 1 - Σ持仓权重, 不计利息。
+
+    停牌(价格为 NaN)的股票当日收益为0、不能交易: 股数保持不变, 权重随组合资产漂移
+    (现金相应增减), 不计换手, 复牌当日再按目标权重调仓。面板中有停牌时持仓只能
+    按日递推, 每个交易日在全部股票上向量化计算一次。费率和初始资金默认取配置文件
+    ``backtest`` 一节。
+    """
+
+    def __init__(
+        self,
+        initial_capital: Optional[float] = None,
+        commission_rate: Optional[float] = None,
+        slippage_rate: Optional[float] = None,
+        config: Optional[Config] = None,
+        trace_memory: bool = False
+    ):
+        settings = (config or Config()).get('backtest') or {}
+        self.initial_capital = (
+            initial_capital if initial_capital is not None else settings.get('initial_capital', 1000000)
+        )
+        self.commission_rate = (
+            commission_rate if commission_rate is not None else settings.get('commission_rate', 0.0)
+        )
+        self.slippage_rate = (
+            slippage_rate if slippage_rate is not None else settings.get('slippage_rate', 0.0)
+        )
+        self.trace_memory = trace_memory
+        self.stats: Dict[str, float] = {}
+
+    def run(self, prices: pd.DataFrame, weights: pd.DataFrame) -> Dict:
+        """运行回测
+
+        Args:
+            prices: 收盘价, 日期 × 股票
+            weights: 每日收盘后的目标权重, 按 prices 的日期和股票对齐, 缺失按0计
+
+        Returns:
+            returns/turnover/costs/cash/portfolio 为按日期的 Series,
+            weights 为每日收盘调仓后的持仓权重面板, stats 为本次运行的用时,
+            ``trace_memory`` 为 True 时还有由 tracemalloc 统计的峰值内存
+        """
+        # 只在调用方没有开启 tracemalloc 时由本次运行开启, 不重置调用方的统计
+        traced = self.trace_memory and not tracemalloc.is_tracing()
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            results = self._simulate(prices, weights)
+            peak = tracemalloc.get_traced_memory()[1] if traced else None
+        except Exception as e:
+            logger.error(f"组合回测执行失败: {str(e)}")
+            raise
+        finally:
+            if traced:
+                tracemalloc.stop()
+
+        self.stats = {
+            'seconds': time.perf_counter() - start,
+            'n_dates': prices.shape[0],
+            'n_symbols': prices.shape[1],
+        }
+        message = f"组合回测: {prices.shape[1]} 只股票 × {prices.shape[0]} 天, 用时 {self.stats['seconds']:.2f}秒"
+        if peak is not None:
+            self.stats['peak_memory_mb'] = peak / 1024 ** 2
+            message += f", 峰值内存 {self.stats['peak_memory_mb']:.1f}MB"
+        logger.info(message)
+        results['stats'] = dict(self.stats)
+        return results
+
+    def _simulate(self, prices: pd.DataFrame, weights: pd.DataFrame) -> Dict:
+        index = prices.index
+        price = prices.to_numpy(dtype=np.float64)
+        tradable = ~np.isnan(price)
+        target = weights.reindex(index=index, columns=prices.columns).to_numpy(dtype=np.float64, copy=True)
+        np.nan_to_num(target, copy=False)
+        target[~tradable] = 0.0
+
+        # 资金曲线需要逐日累乘, 始终用 float64; 停牌和上市前的收益按0计
+        filled = pd.DataFrame(price).ffill().to_numpy()
+        asset_returns = np.zeros_like(price)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(filled[1:], filled[:-1], out=asset_returns[1:])
+        asset_returns[1:] -= 1
+        np.nan_to_num(asset_returns, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+        fee = self.commission_rate + self.slippage_rate
+        # 没有持仓遇到停牌 (未上市、空仓时停牌) 时每日持仓都是目标权重
+        if not (~tradable[1:] & (target[:-1] != 0)).any():
+            held, gross, turnover = self._rebalance_all(target, asset_returns)
+        else:
+            held, gross, turnover = self._rebalance_with_suspensions(target, asset_returns, tradable, fee)
+
+        cost_rate = turnover * fee
+        growth = (1 + gross) * (1 - cost_rate)
+        portfolio = self.initial_capital * np.cumprod(growth)
+        before_costs = np.concatenate([[self.initial_capital], portfolio[:-1]]) * (1 + gross)
+
+        return {
+            'weights': pd.DataFrame(held, index=index, columns=prices.columns),
+            'returns': pd.Series(growth - 1, index=index),
+            'turnover': pd.Series(turnover, index=index),
+            'costs': pd.Series(before_costs * cost_rate, index=index),
+            'cash': pd.Series(portfolio * (1 - held.sum(axis=1)), index=index),
+            'portfolio': pd.Series(portfolio, index=index),
+        }
+
+    @staticmethod
+    def _rebalance_all(target: np.ndarray, asset_returns: np.ndarray):
+        """没有持仓停牌: 每日收盘持仓都是目标权重, 整个面板一次计算"""
+        # 第 t 日收益来自第 t-1 日收盘的持仓
+        gross = np.zeros(len(target))
+        returns = target[:-1] * asset_returns[1:]
+        gross[1:] = returns.sum(axis=1)
+
+        # 调仓前的权重: 持仓随当日涨跌漂移, 第一天从全现金开始
+        drifted = np.zeros_like(target)
+        np.add(target[:-1], returns, out=drifted[1:])
+        drifted[1:] /= (1 + gross[1:])[:, None]
+        trades = np.subtract(target, drifted, out=drifted)
+        turnover = np.abs(trades, out=trades).sum(axis=1)
+        return target, gross, turnover
+
+    @staticmethod
+    def _rebalance_with_suspensions(
+        target: np.ndarray,
+        asset_returns: np.ndarray,
+        tradable: np.ndarray,
+        fee: float
+    ):
+        """有停牌时逐日推进: 停牌股票股数不变, 权重随组合资产漂移, 复牌后再调回目标
+
+        停牌股票的权重取决于此前整个组合的收益和成本, 只能按日递推; 每步仍在全部
+        股票上向量化, 循环次数等于交易日数。
+        """
+        n_dates, n_symbols = target.shape
+        held = np.empty_like(target)
+        gross = np.zeros(n_dates)
+        turnover = np.zeros(n_dates)
+        current = np.zeros(n_symbols)
+        drifted = np.empty(n_symbols)
+        for t in range(n_dates):
+            np.multiply(current, asset_returns[t], out=drifted)
+            gross[t] = drifted.sum()
+            drifted += current
+            drifted /= 1 + gross[t]
+            # 可交易的股票调到目标权重, 停牌的保持漂移后的权重
+            current = np.where(tradable[t], target[t], drifted)
+            turnover[t] = np.abs(current - drifted).sum()
+            # 成本从组合资产中扣除, 停牌股票市值不变, 权重相应变大
+            current[~tradable[t]] /= 1 - turnover[t] * fee
+            held[t] = current
+        return held, gross, turnover
@@ -0,0 +1,191 @@
+import json
+import time
+import uuid
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .sweep import OBJECTIVES, ParameterSpace, evaluate_strategy, run_shared, to_plain
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def halving_schedule(
+    n_points: int,
+    n_rows: int,
+    budget: float,
+    eta: int = 3,
+    min_horizon: int = 500
+) -> List[Tuple[int, int]]:
+    """逐轮的 (参数组合数, 数据长度)
+
+    第一轮组合最多, 之后每轮保留 1/eta, 数据长度乘以 eta, 最后一轮用全部历史。
+    回测耗时与数据长度成正比, ``budget`` 按全部历史上的回测次数计, 在 1/eta
+    历史上的回测折算为 1/eta 次。在不超过预算、最短数据不少于 ``min_horizon``
+    根的前提下取尽量多的初始组合。
+    """
+    if budget <= 0:
+        raise ValueError("评估预算必须为正数")
+    if eta < 2:
+        raise ValueError("eta 必须不小于2")
+    max_rounds = 1
+    while max_rounds < 32 and n_rows // eta ** max_rounds >= min_horizon:
+        max_rounds += 1
+
+    best = [(max(min(n_points, int(budget)), 1), n_rows)]
+    for n_start in range(n_points, 0, -1):
+        rounds = 1
+        while rounds < max_rounds and n_start // eta ** rounds >= 1:
+            rounds += 1
+        schedule = [
+            (max(n_start // eta ** k, 1), n_rows // eta ** (rounds - 1 - k))
+            for k in range(rounds)
+        ]
+        if schedule_cost(schedule, n_rows) <= budget:
+            best = schedule
+            break
+    return best
+
+def schedule_cost(schedule: List[Tuple[int, int]], n_rows: int) -> float:
+    """折算为全部历史上的回测次数"""
+    return sum(n * horizon / n_rows for n, horizon in schedule)
+
+def _score_task(
+    data: pd.DataFrame,
+    strategy_cls: type,
+    init_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    cost_rate: float,
+    horizon: int
+) -> Tuple[Dict[str, float], float]:
+    """在最近 horizon 根K线上运行策略, 返回全部目标函数值和用时"""
+    start = time.perf_counter()
+    metrics = evaluate_strategy(strategy_cls, init_kwargs, params, data.iloc[-horizon:], cost_rate)
+    return metrics, time.perf_counter() - start
+
+class SuccessiveHalvingSearch:
+    """固定评估预算的参数搜索 (successive halving)
+
+    从参数空间中随机抽取一批组合, 先在最近的一小段数据上回测, 每轮按 ``objective``
+    保留最好的 1/eta, 同时把数据长度扩大 eta 倍, 直到在全部历史上比较剩下的组合。
+    大部分组合只在短数据上回测一次, 耗时按数据长度折算后不超过 ``budget`` 次
+    全历史回测 (见 :func:`halving_schedule`)。
+
+    每次评估 (轮次、数据长度、参数、全部指标、用时) 记入 ``evaluations``,
+    指定 ``log_path`` 时同时追加到 JSON 行文件, 用 :func:`load_evaluations`
+    读取后可按 ``run_id`` 比较不同次搜索。
+    """
+
+    def __init__(
+        self,
+        strategy_cls: type,
+        space: ParameterSpace,
+        budget: float = 50,
+        eta: int = 3,
+        min_horizon: int = 500,
+        init_kwargs: Optional[Dict[str, Any]] = None,
+        objective: str = 'sharpe',
+        workers: int = 1,
+        cost_rate: Optional[float] = None,
+        log_path: Optional[str] = None,
+        seed: int = 0
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"未知的目标函数: {objective}")
+        if workers <= 0:
+            raise ValueError("进程数必须为正整数")
+        self.strategy_cls = strategy_cls
+        self.space = space
+        self.budget = budget
+        self.eta = eta
+        self.min_horizon = min_horizon
+        self.init_kwargs = init_kwargs or {}
+        self.objective = objective
+        self.workers = workers
+        if cost_rate is None:
+            settings = Config().get('backtest') or {}
+            cost_rate = settings.get('commission_rate', 0.0) + settings.get('slippage_rate', 0.0)
+        self.cost_rate = cost_rate
+        self.log_path = Path(log_path) if log_path else None
+        self.seed = seed
+        self.run_id = ''
+        self.evaluations = pd.DataFrame()
+
+    def run(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """运行搜索, 返回最后一轮 (全部历史上) 目标函数最优的参数"""
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        points = list(self.space)
+        schedule = halving_schedule(len(points), len(data), self.budget, self.eta, self.min_horizon)
+        rng = np.random.default_rng(self.seed)
+        candidates = [points[i] for i in rng.permutation(len(points))[:schedule[0][0]]]
+        logger.info(
+            f"参数搜索 {self.run_id}: 参数空间 {len(points)} 组, "
+            f"各轮 (组合数, K线数) {schedule}, 共 {sum(n for n, _ in schedule)} 次回测, "
+            f"折合全部历史 {schedule_cost(schedule, len(data)):.1f} 次"
+        )
+
+        records = []
+        start = time.perf_counter()
+        with self._open_log() as log:
+            for round_no, (n_keep, horizon) in enumerate(schedule):
+                candidates = candidates[:n_keep]
+                scores = np.full(len(candidates), np.nan)
+                tasks = [
+                    (self.strategy_cls, self.init_kwargs, params, self.cost_rate, horizon)
+                    for params in candidates
+                ]
+                for i, result, error in run_shared(_score_task, tasks, data, self.workers):
+                    metrics, seconds = result if result is not None else ({}, np.nan)
+                    scores[i] = metrics.get(self.objective, np.nan)
+                    record = {
+                        'run_id': self.run_id, 'strategy': self.strategy_cls.__name__,
+                        'round': round_no, 'horizon': horizon,
+                        'horizon_start': str(data.index[-horizon]),
+                        'params': candidates[i], 'metrics': metrics, 'error': error, 'seconds': seconds,
+                    }
+                    records.append(record)
+                    if log is not None:
+                        log.write(json.dumps(record, default=str) + '\n')
+                        log.flush()
+                # 得分相同或无法计算时保持原顺序, NaN 排在最后
+                order = np.argsort(np.where(np.isnan(scores), np.inf, -scores), kind='stable')
+                candidates = [candidates[i] for i in order]
+
+        self.evaluations = _flatten(records)
+        final = self.evaluations[self.evaluations['round'] == len(schedule) - 1]
+        final = final.dropna(subset=[self.objective])
+        logger.info(f"参数搜索 {self.run_id} 完成, {len(records)} 次回测, 用时 {time.perf_counter() - start:.2f}秒")
+        if final.empty:
+            return {}
+        best = final.loc[final[self.objective].idxmax()]
+        return {name: to_plain(best[name]) for name in self.space.grid}
+
+    def _open_log(self):
+        if self.log_path is None:
+            return nullcontext()
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(self.log_path, 'a', encoding='utf-8')
+
+def load_evaluations(path: str) -> pd.DataFrame:
+    """读取搜索日志, 每次评估一行, 参数和指标展开为列"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return _flatten(records)
+
+def _flatten(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    rows = [
+        {
+            **{key: value for key, value in record.items() if key not in ('params', 'metrics')},
+            **record['params'],
+            **{name: record['metrics'].get(name, np.nan) for name in OBJECTIVES},
+        }
+        for record in records
+    ]
+    return pd.DataFrame(rows)
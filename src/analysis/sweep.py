@@ -0,0 +1,418 @@
+import itertools
+import json
+import multiprocessing as mp
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from ..indicators.result_cache import dataset_hash
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MarketFrames = Union[pd.DataFrame, Dict[str, pd.DataFrame]]
+
+TRADING_DAYS = 252
+
+def strategy_returns(signals: pd.Series, close: pd.Series, cost_rate: float = 0.0) -> pd.Series:
+    """策略日收益: 信号滞后一日成为持仓, 与 BacktestEngine 一致, 持仓变化按 cost_rate 扣费"""
+    positions = signals.astype(np.float64).shift(1).fillna(0.0)
+    returns = positions * close.astype(np.float64).pct_change().fillna(0.0)
+    if cost_rate:
+        returns -= positions.diff().abs().fillna(positions.abs()) * cost_rate
+    return returns
+
+def _sharpe(returns: pd.Series) -> float:
+    std = returns.std()
+    return float(np.sqrt(TRADING_DAYS) * returns.mean() / std) if std > 0 else float('nan')
+
+def _total_return(returns: pd.Series) -> float:
+    return float((1 + returns).prod() - 1)
+
+def _annual_return(returns: pd.Series) -> float:
+    return float((1 + returns).prod() ** (TRADING_DAYS / max(len(returns), 1)) - 1)
+
+def _max_drawdown(returns: pd.Series) -> float:
+    equity = (1 + returns).cumprod()
+    return float((equity / equity.cummax() - 1).min())
+
+def _calmar(returns: pd.Series) -> float:
+    drawdown = _max_drawdown(returns)
+    return _annual_return(returns) / -drawdown if drawdown < 0 else float('nan')
+
+# 目标函数名 -> 由策略日收益计算的指标, 均为越大越好 (回撤为负数)
+OBJECTIVES: Dict[str, Callable[[pd.Series], float]] = {
+    'sharpe': _sharpe,
+    'total_return': _total_return,
+    'annual_return': _annual_return,
+    'max_drawdown': _max_drawdown,
+    'calmar': _calmar,
+}
+
+def strategy_run_returns(
+    strategy_cls: type,
+    init_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    data: MarketFrames,
+    cost_rate: float = 0.0
+) -> pd.Series:
+    """用一组参数运行策略, 返回策略日收益
+
+    策略参数写入 ``params`` 或 ``parameters`` (两种策略基类的约定),
+    ``generate_signals`` 返回 Series 或含 ``signal`` 列的 DataFrame。
+    """
+    strategy = strategy_cls(**init_kwargs)
+    settings = strategy.params if hasattr(strategy, 'params') else strategy.parameters
+    settings.update(params)
+    if not strategy.validate_parameters():
+        raise ValueError(f"策略参数无效: {params}")
+
+    # 策略会在输入上添加列, 浅拷贝后数据本身仍然共享
+    if isinstance(data, pd.DataFrame):
+        frame = data.copy(deep=False)
+    else:
+        frame = {key: value.copy(deep=False) for key, value in data.items()}
+    signals = strategy.generate_signals(frame)
+    if isinstance(signals, pd.DataFrame) and 'signal' in signals:
+        signals = signals['signal']
+    return strategy_returns(signals, frame['close'], cost_rate)
+
+def evaluate_strategy(
+    strategy_cls: type,
+    init_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    data: MarketFrames,
+    cost_rate: float = 0.0
+) -> Dict[str, float]:
+    """用一组参数运行策略, 返回全部目标函数的值"""
+    return score_returns(strategy_run_returns(strategy_cls, init_kwargs, params, data, cost_rate))
+
+def score_returns(returns: pd.Series) -> Dict[str, float]:
+    """策略日收益的全部目标函数值"""
+    return {name: fn(returns) for name, fn in OBJECTIVES.items()}
+
+class ParameterSpace:
+    """参数网格: 参数名 -> 候选值, 按笛卡尔积展开, 可用 constraint 过滤组合"""
+
+    def __init__(self, grid: Dict[str, Sequence], constraint: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        if not grid:
+            raise ValueError("参数网格不能为空")
+        self.grid = {name: [to_plain(value) for value in values] for name, values in grid.items()}
+        self.constraint = constraint
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.grid)
+        for values in itertools.product(*self.grid.values()):
+            point = dict(zip(names, values))
+            if self.constraint is None or self.constraint(point):
+                yield point
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+class SharedMarketData:
+    """放在共享内存中的行情数据, 工作进程映射同一份数据而不是各自反序列化
+
+    数值列和数值/日期索引写入一块 SharedMemory, ``handle`` 只描述各列的位置,
+    可以廉价地 pickle 给工作进程, 由 :meth:`attach` 还原为零拷贝的只读 DataFrame。
+    其他类型的列随 handle 传递。创建者负责在用完后调用 :meth:`close` 释放。
+    """
+
+    def __init__(self, data: MarketFrames):
+        frames = {'': data} if isinstance(data, pd.DataFrame) else data
+        arrays, layout = [], {}
+        offset = 0
+        for key, frame in frames.items():
+            columns = []
+            for column in [None] + list(frame.columns):
+                values = frame.index if column is None else frame[column]
+                if _shareable(values.dtype):
+                    array = np.ascontiguousarray(values.to_numpy())
+                    offset = -(-offset // 64) * 64
+                    columns.append((column, ('shared', str(array.dtype), offset, len(array))))
+                    arrays.append((offset, array))
+                    offset += array.nbytes
+                else:
+                    columns.append((column, ('inline', values, None, None)))
+            layout[key] = {'columns': columns, 'index_name': frame.index.name}
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self._owner = True
+        for start, array in arrays:
+            np.ndarray(array.shape, array.dtype, buffer=self._shm.buf, offset=start)[:] = array
+        self.handle = {'name': self._shm.name, 'layout': layout, 'single': isinstance(data, pd.DataFrame)}
+        self.data = self._views()
+
+    @classmethod
+    def attach(cls, handle: Dict[str, Any]) -> 'SharedMarketData':
+        """在工作进程中映射已有的共享数据"""
+        shared = cls.__new__(cls)
+        shared._shm = shared_memory.SharedMemory(name=handle['name'])
+        shared._owner = False
+        shared.handle = handle
+        shared.data = shared._views()
+        return shared
+
+    def close(self):
+        """解除映射, 创建者同时释放共享内存"""
+        self.data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'SharedMarketData':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _views(self) -> MarketFrames:
+        frames = {}
+        for key, spec in self.handle['layout'].items():
+            arrays = {}
+            for column, (kind, payload, offset, length) in spec['columns']:
+                if kind == 'shared':
+                    values = np.ndarray((length,), np.dtype(payload), buffer=self._shm.buf, offset=offset)
+                    values.flags.writeable = False
+                else:
+                    values = payload
+                arrays[column] = values
+            index = pd.Index(arrays.pop(None), name=spec['index_name'])
+            frames[key] = pd.DataFrame(arrays, index=index, copy=False)
+        return frames[''] if self.handle['single'] else frames
+
+def _shareable(dtype: Any) -> bool:
+    return isinstance(dtype, np.dtype) and dtype.kind in 'biufM'
+
+def to_plain(value: Any) -> Any:
+    """numpy 标量转为 Python 类型, 便于 JSON 持久化"""
+    return value.item() if isinstance(value, np.generic) else value
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+# 工作进程中映射的共享数据, 由进程池的 initializer 设置
+_worker_data: Optional[SharedMarketData] = None
+
+def _init_worker(handle: Dict[str, Any]):
+    global _worker_data
+    _worker_data = SharedMarketData.attach(handle)
+
+def _call_shared(fn: Callable, task: Tuple) -> Any:
+    return fn(_worker_data.data, *task)
+
+def run_shared(fn: Callable, tasks: List[Tuple], data: MarketFrames, workers: int = 1) -> Iterator[Tuple[int, Any, str]]:
+    """对每个任务执行 ``fn(data, *task)``, 按完成顺序产出 (任务序号, 结果, 错误信息)
+
+    ``workers`` 为1时在当前进程中依次执行; 否则使用 spawn 进程池, data 放入
+    共享内存由各进程映射一次, fn 须为模块级函数以便 pickle。中断时取消未开始的任务。
+    """
+    if workers == 1 or len(tasks) <= 1:
+        for i, task in enumerate(tasks):
+            try:
+                result = fn(data, *task)
+            except Exception as e:
+                yield i, None, f"{type(e).__name__}: {str(e)}"
+            else:
+                yield i, result, ''
+        return
+
+    with SharedMarketData(data) as shared:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(shared.handle,)
+        )
+        try:
+            futures = {executor.submit(_call_shared, fn, task): i for i, task in enumerate(tasks)}
+            remaining = set(futures)
+            while remaining:
+                completed, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        yield futures[future], None, f"{type(e).__name__}: {str(e)}"
+                    else:
+                        yield futures[future], result, ''
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def _evaluate_task(
+    data: MarketFrames,
+    strategy_cls: type,
+    init_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    cost_rate: float
+) -> Dict[str, float]:
+    return evaluate_strategy(strategy_cls, init_kwargs, params, data, cost_rate)
+
+class ParameterSweep:
+    """并行参数扫描
+
+    每个参数组合新建一个策略实例运行, 按策略收益 (而不是标的本身的收益) 计算
+    OBJECTIVES 中的全部指标, 按 ``objective`` 排序。``workers`` > 1 时使用进程池,
+    行情数据放入共享内存, 各进程只映射一次。
+
+    指定 ``results_path`` 时每完成一个组合就追加一行 JSON, 中断后用同样的参数
+    再次运行会跳过已完成的组合。记录带有扫描签名 (策略、构造参数、费率和数据的
+    内容哈希), 数据或设置变化后旧记录不会被复用。
+    """
+
+    def __init__(
+        self,
+        strategy_cls: type,
+        space: ParameterSpace,
+        init_kwargs: Optional[Dict[str, Any]] = None,
+        objective: str = 'sharpe',
+        workers: int = 1,
+        results_path: Optional[str] = None,
+        cost_rate: Optional[float] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"未知的目标函数: {objective}")
+        if workers <= 0:
+            raise ValueError("进程数必须为正整数")
+        self.strategy_cls = strategy_cls
+        self.space = space
+        self.init_kwargs = init_kwargs or {}
+        self.objective = objective
+        self.workers = workers
+        self.results_path = Path(results_path) if results_path else None
+        if cost_rate is None:
+            settings = Config().get('backtest') or {}
+            cost_rate = settings.get('commission_rate', 0.0) + settings.get('slippage_rate', 0.0)
+        self.cost_rate = cost_rate
+        self.progress = progress
+        self.results = pd.DataFrame()
+        self.resumed = 0
+
+    def run(self, data: MarketFrames) -> pd.DataFrame:
+        """运行扫描, 返回每个组合的参数和指标, 按目标函数从优到劣排序"""
+        signature = self._signature(data)
+        points = list(self.space)
+        done = self._load(signature)
+        self.resumed = sum(_params_key(point) in done for point in points)
+        pending = [point for point in points if _params_key(point) not in done]
+        logger.info(f"参数扫描: 共 {len(points)} 组, 已完成 {self.resumed} 组, 待计算 {len(pending)} 组")
+
+        start = time.perf_counter()
+        tasks = [(self.strategy_cls, self.init_kwargs, params, self.cost_rate) for params in pending]
+        with self._open_log() as log:
+            results = run_shared(_evaluate_task, tasks, data, self.workers)
+            for completed, (i, metrics, error) in enumerate(results, self.resumed + 1):
+                params = pending[i]
+                done[_params_key(params)] = {'params': params, 'metrics': metrics, 'error': error}
+                if log is not None:
+                    entry = {'sweep': signature, 'params': params, 'metrics': metrics, 'error': error}
+                    log.write(json.dumps(entry) + '\n')
+                    log.flush()
+                self._report(completed, len(points), start)
+
+        self.results = self._collect(points, done)
+        return self.results
+
+    def best_params(self) -> Dict[str, Any]:
+        """目标函数最优的参数组合"""
+        ranked = self.results.dropna(subset=[self.objective])
+        if ranked.empty:
+            return {}
+        best = ranked.iloc[0]
+        return {name: to_plain(best[name]) for name in self.space.grid}
+
+    def _signature(self, data: MarketFrames) -> str:
+        frames = {'': data} if isinstance(data, pd.DataFrame) else data
+        inputs = {
+            f"{key}/{column}": frame[column]
+            for key, frame in frames.items() for column in frame.columns
+        }
+        settings = {
+            'strategy': f"{self.strategy_cls.__module__}.{self.strategy_cls.__qualname__}",
+            'init_kwargs': self.init_kwargs,
+            'cost_rate': self.cost_rate,
+        }
+        return f"{json.dumps(settings, sort_keys=True, default=str)}:{dataset_hash(inputs)}"
+
+    def _load(self, signature: str) -> Dict[str, Dict]:
+        """读取同一扫描已完成的组合, 忽略中断时写了一半的最后一行"""
+        done = {}
+        if self.results_path is None or not self.results_path.exists():
+            return done
+        with open(self.results_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('sweep') == signature:
+                    done[_params_key(entry['params'])] = entry
+        return done
+
+    def _open_log(self):
+        if self.results_path is None:
+            return nullcontext()
+        self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(self.results_path, 'a', encoding='utf-8')
+
+    def _report(self, completed: int, total: int, start: float):
+        if self.progress is not None:
+            self.progress(completed, total)
+        step = max(total // 10, 1)
+        if completed % step == 0 or completed == total:
+            logger.info(f"参数扫描进度: {completed}/{total}, 用时 {time.perf_counter() - start:.1f}秒")
+
+    def _collect(self, points: List[Dict], done: Dict[str, Dict]) -> pd.DataFrame:
+        rows = []
+        for point in points:
+            entry = done.get(_params_key(point))
+            if entry is None:
+                continue
+            metrics = entry['metrics'] or {name: np.nan for name in OBJECTIVES}
+            rows.append({**point, **metrics, 'error': entry.get('error', '')})
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+        return results.sort_values(self.objective, ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+
+def optimize_strategy(
+    strategy: Any,
+    data: MarketFrames,
+    grid: Optional[Dict[str, Sequence]] = None,
+    init_kwargs: Optional[Dict[str, Any]] = None,
+    objective: str = 'sharpe',
+    workers: int = 1,
+    results_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """在参数网格上优化策略实例的参数
+
+    ``grid`` 默认取策略类的 ``PARAMETER_GRID``, 网格之外的参数固定为策略当前的值。
+    每个组合由 ``init_kwargs`` 新建策略实例运行, 策略实例本身不会被修改。
+
+    Returns:
+        策略当前参数中, 网格内的参数替换为目标函数最优的值; 没有可用结果时原样返回
+    """
+    settings = strategy.params if hasattr(strategy, 'params') else strategy.parameters
+    grid = grid if grid is not None else getattr(type(strategy), 'PARAMETER_GRID', None)
+    if not grid:
+        raise ValueError(f"{type(strategy).__name__} 没有参数网格")
+    try:
+        space = ParameterSpace({
+            **{name: [value] for name, value in settings.items() if name not in grid},
+            **grid,
+        })
+        sweep = ParameterSweep(
+            type(strategy), space, init_kwargs=init_kwargs,
+            objective=objective, workers=workers, results_path=results_path
+        )
+        sweep.run(data)
+        return {**settings, **sweep.best_params()}
+    except Exception as e:
+        logger.error(f"参数优化失败: {str(e)}")
+        return dict(settings)
@@ -0,0 +1,206 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .sweep import OBJECTIVES, MarketFrames, ParameterSpace, run_shared, score_returns, strategy_run_returns
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Fold = Tuple[int, int, int, int]
+
+def walk_forward_splits(
+    n_rows: int,
+    train_size: int,
+    test_size: int,
+    step: Optional[int] = None,
+    anchored: bool = False
+) -> List[Fold]:
+    """按K线位置划分训练/测试窗口, 返回 (train_start, train_end, test_start, test_end)
+
+    训练窗口长 ``train_size`` 根, 紧接着的 ``test_size`` 根为测试窗口, 之后整体
+    前移 ``step`` 根 (默认等于 test_size, 各折的测试窗口首尾相接)。``anchored``
+    为 True 时训练窗口始终从第一根K线开始、逐折变长。最后一折的测试窗口可能不足
+    test_size 根。
+    """
+    step = step or test_size
+    if train_size <= 0 or test_size <= 0 or step <= 0:
+        raise ValueError("窗口长度必须为正整数")
+    if step < test_size:
+        raise ValueError("步长小于测试窗口时样本外收益会重叠")
+    folds = []
+    train_end = train_size
+    while train_end < n_rows:
+        train_start = 0 if anchored else train_end - train_size
+        folds.append((train_start, train_end, train_end, min(train_end + test_size, n_rows)))
+        train_end += step
+    return folds
+
+def _returns_task(
+    data: MarketFrames,
+    strategy_cls: type,
+    init_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    cost_rate: float,
+    start: int,
+    stop: int
+) -> np.ndarray:
+    """在第 start~stop 根K线上运行策略, 返回策略日收益"""
+    window = data.iloc[start:stop]
+    return strategy_run_returns(strategy_cls, init_kwargs, params, window, cost_rate).to_numpy()
+
+class WalkForwardOptimizer:
+    """滚动窗口 (walk-forward) 参数优化
+
+    每一折在训练窗口上按 ``objective`` 选出最优参数, 用它在紧随其后的测试窗口上
+    交易, 各折的样本外收益首尾相接得到样本外资金曲线。
+
+    默认每一折在自己的训练窗口上运行全部组合, 再以训练窗口为预热期在训练 + 测试
+    窗口上运行选出的参数, 任何策略都看不到测试窗口之后的数据。
+
+    ``reuse_history`` 为 True 时每个参数组合只在全部历史上运行一次, 各折的训练/测试
+    收益都是这条收益序列的切片, 总计算量与折数无关。只有确认信号是因果的 (只依赖
+    当日及之前的数据) 策略才能这样做; 使用全样本统计量的策略 (例如 MomentumStrategy
+    按全样本均值和标准差标准化动量) 会把未来信息带入样本外收益。
+
+    两种方式下的任务都交给 :func:`run_shared` 并行执行, 各进程通过共享内存
+    映射同一份行情数据, 每一折的数据只是它的切片。
+    """
+
+    def __init__(
+        self,
+        strategy_cls: type,
+        space: ParameterSpace,
+        train_size: int,
+        test_size: int,
+        step: Optional[int] = None,
+        anchored: bool = False,
+        init_kwargs: Optional[Dict[str, Any]] = None,
+        objective: str = 'sharpe',
+        workers: int = 1,
+        cost_rate: Optional[float] = None,
+        reuse_history: bool = False
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"未知的目标函数: {objective}")
+        if workers <= 0:
+            raise ValueError("进程数必须为正整数")
+        self.strategy_cls = strategy_cls
+        self.space = space
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step
+        self.anchored = anchored
+        self.init_kwargs = init_kwargs or {}
+        self.objective = objective
+        self.workers = workers
+        if cost_rate is None:
+            settings = Config().get('backtest') or {}
+            cost_rate = settings.get('commission_rate', 0.0) + settings.get('slippage_rate', 0.0)
+        self.cost_rate = cost_rate
+        self.reuse_history = reuse_history
+
+    def run(self, data: pd.DataFrame) -> Dict:
+        """运行滚动优化
+
+        Returns:
+            folds: 每折的窗口日期、选出的参数、样本内和样本外得分
+            returns/equity: 拼接的样本外日收益和资金曲线 (从1开始)
+            metrics: 样本外收益的全部目标函数值
+        """
+        start = time.perf_counter()
+        folds = walk_forward_splits(len(data), self.train_size, self.test_size, self.step, self.anchored)
+        if not folds:
+            raise ValueError("数据长度不足一个训练窗口")
+        points = list(self.space)
+        logger.info(f"滚动优化: {len(folds)} 折 × {len(points)} 组参数")
+
+        if self.reuse_history:
+            selected, oos = self._run_on_history(data, folds, points)
+        else:
+            selected, oos = self._run_per_fold(data, folds, points)
+
+        index = data.index
+        rows = []
+        for fold, (best, in_sample), returns in zip(folds, selected, oos):
+            train_start, train_end, test_start, test_end = fold
+            rows.append({
+                'train_start': index[train_start], 'train_end': index[train_end - 1],
+                'test_start': index[test_start], 'test_end': index[test_end - 1],
+                **(points[best] if best is not None else {}),
+                'in_sample': in_sample,
+                'out_of_sample': OBJECTIVES[self.objective](returns) if len(returns) else np.nan,
+            })
+        returns = pd.concat(oos) if oos else pd.Series(dtype=np.float64)
+        logger.info(f"滚动优化完成, 用时 {time.perf_counter() - start:.2f}秒")
+        return {
+            'folds': pd.DataFrame(rows),
+            'returns': returns,
+            'equity': (1 + returns).cumprod(),
+            'metrics': score_returns(returns),
+        }
+
+    def _tasks(self, points: List[Dict], start: int, stop: int) -> List[Tuple]:
+        return [
+            (self.strategy_cls, self.init_kwargs, params, self.cost_rate, start, stop)
+            for params in points
+        ]
+
+    def _select(self, scores: List[float]) -> Tuple[Optional[int], float]:
+        """得分最高的组合序号, 并列时取参数空间中靠前的"""
+        scores = np.asarray(scores, dtype=np.float64)
+        if np.isnan(scores).all():
+            return None, np.nan
+        best = int(np.nanargmax(scores))
+        return best, float(scores[best])
+
+    def _run_on_history(self, data: pd.DataFrame, folds: List[Fold], points: List[Dict]):
+        histories: List[Optional[np.ndarray]] = [None] * len(points)
+        for i, returns, error in run_shared(_returns_task, self._tasks(points, 0, len(data)), data, self.workers):
+            if error:
+                logger.error(f"参数 {points[i]} 运行失败: {error}")
+            histories[i] = returns
+
+        objective = OBJECTIVES[self.objective]
+        selected, oos = [], []
+        for train_start, train_end, test_start, test_end in folds:
+            scores = [
+                objective(pd.Series(history[train_start:train_end])) if history is not None else np.nan
+                for history in histories
+            ]
+            best, in_sample = self._select(scores)
+            selected.append((best, in_sample))
+            values = histories[best][test_start:test_end] if best is not None else []
+            oos.append(pd.Series(values, index=data.index[test_start:test_start + len(values)], dtype=np.float64))
+        return selected, oos
+
+    def _run_per_fold(self, data: pd.DataFrame, folds: List[Fold], points: List[Dict]):
+        # 第一轮: 各折训练窗口上的全部组合
+        tasks = []
+        for train_start, train_end, _, _ in folds:
+            tasks.extend(self._tasks(points, train_start, train_end))
+        scores = np.full(len(tasks), np.nan)
+        objective = OBJECTIVES[self.objective]
+        for i, returns, error in run_shared(_returns_task, tasks, data, self.workers):
+            if error:
+                logger.error(f"参数 {points[i % len(points)]} 运行失败: {error}")
+            else:
+                scores[i] = objective(pd.Series(returns))
+        selected = [self._select(scores[k * len(points):(k + 1) * len(points)]) for k in range(len(folds))]
+
+        # 第二轮: 选出的参数以训练窗口为预热期在训练 + 测试窗口上运行
+        tasks, owners = [], []
+        for k, ((train_start, _, test_start, test_end), (best, _)) in enumerate(zip(folds, selected)):
+            if best is not None:
+                tasks.extend(self._tasks([points[best]], train_start, test_end))
+                owners.append(k)
+        oos = [pd.Series(dtype=np.float64, index=data.index[:0]) for _ in folds]
+        for i, returns, error in run_shared(_returns_task, tasks, data, self.workers):
+            k = owners[i]
+            _, _, test_start, test_end = folds[k]
+            if error:
+                logger.error(f"第 {k + 1} 折样本外运行失败: {error}")
+                continue
+            oos[k] = pd.Series(returns[-(test_end - test_start):], index=data.index[test_start:test_end])
+        return selected, oos
@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple
+from .data_loader import DataLoader, query_history
+from ..utils.connection_pool import BaostockWorkerPool
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class AsyncDataLoader:
+    """DataLoader的异步封装
+
+    阻塞的数据查询在执行器中运行, 同时进行的查询数由信号量限制。
+    baostock的会话是进程级的, 线程之间不能并发查询, 因此:
+
+    - 传入 ``pool`` 时, 查询分发到 BaostockWorkerPool 的各个进程并行执行,
+      磁盘缓存的读写在后台线程中依次完成, 同样不阻塞事件循环;
+    - 不传 ``pool`` 时, 查询在单个后台线程中依次执行, 不会阻塞事件循环,
+      超时和取消同样有效。``stream`` 的整个批次交给 ``DataLoader.get_many_stock_data``,
+      只登录一次, 磁盘缓存已是最新的股票不访问网络。
+
+    ``max_concurrency`` 只限制提交到 ``pool`` 的查询数, 需要并发查询时必须传入 ``pool``。
+    """
+
+    def __init__(
+        self,
+        loader: Optional[DataLoader] = None,
+        pool: Optional[BaostockWorkerPool] = None,
+        max_concurrency: int = 16,
+        timeout: Optional[float] = None
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("并发数必须为正整数")
+        self.loader = loader if loader is not None else DataLoader()
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-loader")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def fetch(
+        self,
+        symbol: str,
+        start_date: str = '2020-01-01',
+        end_date: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[pd.DataFrame]:
+        """获取股票数据
+
+        超时抛出 ``asyncio.TimeoutError``, 其他失败与 DataLoader 一致返回 None。
+        """
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._fetch(symbol, start_date, end_date), timeout)
+
+    async def stream(
+        self,
+        symbols: Iterable[str],
+        start_date: str = '2020-01-01',
+        end_date: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+        """批量获取, 按完成顺序逐只返回 ``(symbol, data, error)``
+
+        提前退出迭代或被取消时, 尚未完成的查询会被取消。不传 ``pool`` 时
+        ``timeout`` 是等待下一只股票的时间, 超时后剩余的股票都报告为 timeout。
+        """
+        if self.pool is None:
+            async for result in self._stream_batch(list(symbols), start_date, end_date, timeout):
+                yield result
+            return
+
+        async def fetch_one(symbol: str):
+            try:
+                df = await self.fetch(symbol, start_date, end_date, timeout)
+            except asyncio.TimeoutError:
+                return symbol, None, "timeout"
+            except Exception as e:
+                return symbol, None, str(e)
+            return symbol, df, None if df is not None else "no data"
+
+        tasks = [asyncio.ensure_future(fetch_one(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_batch(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: Optional[str],
+        timeout: Optional[float]
+    ) -> AsyncIterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+        """没有进程池时, 在后台线程中用一个会话依次拉取整个批次"""
+        timeout = self.timeout if timeout is None else timeout
+        remaining = []
+        for symbol in symbols:
+            df = self.loader.from_memory(symbol, start_date) if end_date is None else None
+            if df is not None:
+                yield symbol, df, None
+            else:
+                remaining.append(symbol)
+        if not remaining:
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # 事件循环已关闭
+                stopped.set()
+
+        def run():
+            results = self.loader.get_many_stock_data(remaining, start_date, end_date)
+            try:
+                for result in results:
+                    put(result)
+                    if stopped.is_set():
+                        break
+            except Exception as e:
+                logger.error(f"Batch fetch failed: {str(e)}")
+            finally:
+                results.close()
+                put(None)
+
+        self._executor.submit(run)
+        pending = set(remaining)
+        try:
+            while pending:
+                try:
+                    result = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    for symbol in remaining:
+                        if symbol in pending:
+                            yield symbol, None, "timeout"
+                    return
+                if result is None:
+                    break
+                pending.discard(result[0])
+                yield result
+            for symbol in remaining:
+                if symbol in pending:
+                    yield symbol, None, "no data"
+        finally:
+            stopped.set()
+
+    def close(self):
+        """关闭后台线程"""
+        self._executor.shutdown(wait=False)
+
+    async def _fetch(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: Optional[str]
+    ) -> Optional[pd.DataFrame]:
+        if end_date is None:
+            df = self.loader.from_memory(symbol, start_date)
+            if df is not None:
+                return df
+
+        if self.pool is None:
+            df = await self._run(self._executor.submit, self.loader.get_stock_data, symbol, start_date)
+            if df is not None and end_date:
+                df = df.loc[:end_date]
+            return df
+
+        loop = asyncio.get_running_loop()
+        try:
+            query_from, full = await loop.run_in_executor(
+                self._executor, self.loader.plan_fetch, symbol, start_date
+            )
+            fetched = None
+            if query_from is not None:
+                fetched = await self._run(
+                    self.pool.submit, query_history, symbol, query_from, None, self.loader.dtype_profile
+                )
+            df = await loop.run_in_executor(
+                self._executor, self.loader.merge_history, symbol, start_date, end_date, fetched, full
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting data for {symbol}: {str(e)}")
+            return None
+
+        if df is not None and end_date is None:
+            self.loader.to_memory(symbol, start_date, df)
+        return df
+
+    async def _run(self, submit: Callable[..., Future], fn: Callable, *args):
+        """在信号量限制下提交任务, 任务真正结束后才释放名额"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+        loop = asyncio.get_running_loop()
+
+        await semaphore.acquire()
+        try:
+            future = submit(fn, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
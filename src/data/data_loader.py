@@ -1,98 +1,437 @@
 import baostock as bs
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict
+from concurrent.futures import Future, as_completed
+from contextlib import ExitStack, contextmanager
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple
 import logging
+from .resample import Resampler
+from ..utils.cache import Cache, LRUCache
+from ..utils.connection_pool import BaostockWorkerPool, check_result
 from ..utils.logger import setup_logger
+from ..utils.precision import get_precision
 
 logger = setup_logger(__name__)
 
+HISTORY_FIELDS = "date,open,high,low,close,volume,amount"
+HISTORY_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Amount']
+
+# baostock 在交易日17:30完成当日日K线入库
+DAILY_UPDATE_TIME = pd.Timedelta(hours=17, minutes=30)
+
+# 日线字段的类型方案, legacy 保留逐列 pd.to_numeric 和字符串日期索引
+DTYPE_PROFILES: Dict[str, Optional[Dict[str, type]]] = {
+    'legacy': None,
+    'float64': {
+        'Open': np.float64, 'High': np.float64, 'Low': np.float64, 'Close': np.float64,
+        'Volume': np.int64, 'Amount': np.float64,
+    },
+    # 价格用float32, 成交额数值大, 仍用float64保证精度
+    'compact': {
+        'Open': np.float32, 'High': np.float32, 'Low': np.float32, 'Close': np.float32,
+        'Volume': np.int64, 'Amount': np.float64,
+    },
+}
+
+def decode_history(rows: List[List[str]], profile: str = 'float64') -> pd.DataFrame:
+    """把baostock返回的字符串行批量转换为DataFrame
+
+    除 legacy 外, 结果集先按列转置, 每列由numpy一次性解析为目标类型,
+    日期转换为 datetime64 索引, 不产生 object 类型的中间结果。
+    空字符串(如停牌日)在浮点列中记为 NaN, 在整数列中记为 0。
+    """
+    if profile not in DTYPE_PROFILES:
+        raise ValueError(f"未知的类型方案: {profile}")
+    
+    dtypes = DTYPE_PROFILES[profile]
+    if dtypes is None:
+        df = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+        numeric_columns = HISTORY_COLUMNS[1:]
+        df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric)
+        df.set_index('Date', inplace=True)
+        return df
+    
+    columns = list(zip(*rows)) if rows else [()] * len(HISTORY_COLUMNS)
+    dates = np.array(columns[0], dtype='datetime64[D]').astype('datetime64[ns]')
+    data = {
+        column: _parse_column(columns[i], dtypes[column])
+        for i, column in enumerate(HISTORY_COLUMNS[1:], start=1)
+    }
+    return pd.DataFrame(data, index=pd.DatetimeIndex(dates, name='Date'))
+
+def _parse_column(values: Tuple[str, ...], dtype: type) -> np.ndarray:
+    """字符串列转换为数值数组"""
+    try:
+        return np.array(values, dtype=dtype)
+    except ValueError:
+        pass
+    
+    # 含空值, 或整数列出现 '1.0' 之类的写法
+    text = np.array(values, dtype=str)
+    missing = text == ''
+    if missing.any():
+        text = np.where(missing, 'nan' if np.issubdtype(dtype, np.floating) else '0', text)
+    try:
+        return text.astype(dtype)
+    except ValueError:
+        return text.astype(np.float64).astype(dtype)
+
+def latest_trading_day(now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """已经可以查询到日线的最近交易日
+
+    只排除周末, 节假日由 DataLoader 记录的空查询结果跳过。当天的日线在
+    DAILY_UPDATE_TIME 之后才计入。
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    today = now.normalize()
+    if today.dayofweek < 5 and now >= today + DAILY_UPDATE_TIME:
+        return today
+    return today - pd.offsets.BDay(1)
+
+def query_history(
+    symbol: str,
+    start_date: str,
+    end_date: Optional[str] = None,
+    profile: str = 'float64'
+) -> Optional[pd.DataFrame]:
+    """查询日线数据(需已登录), 没有数据时返回 None"""
+    rs = check_result(bs.query_history_k_data_plus(
+        symbol,
+        HISTORY_FIELDS,
+        start_date=start_date,
+        end_date=end_date,
+        frequency="d",
+        adjustflag="3"
+    ))
+    
+    # 处理数据
+    data_list = []
+    while (rs.error_code == '0') & rs.next():
+        data_list.append(rs.get_row_data())
+    
+    if not data_list:
+        logger.warning(f"No data retrieved for {symbol} since {start_date}")
+        return None
+    
+    return decode_history(data_list, profile)
+
 class DataLoader:
-    """数据加载类"""
+    """数据加载类
+
+    日线数据按股票持久化到磁盘缓存, 再次请求时只向baostock查询最后一根K线之后的部分;
+    缓存已是最新时不登录, 登录或增量查询失败时返回磁盘缓存中已有的数据。
+    内存中按股票保留最近使用的数据, 总占用不超过 ``memory_budget`` 字节。
+    ``dtype_profile`` 选择字段类型方案, 见 DTYPE_PROFILES, 默认按全局计算精度
+    选择 (float32 时为 compact)。
+    """
     
-    def __init__(self):
-        self.cache: Dict[str, pd.DataFrame] = {}
+    def __init__(
+        self,
+        cache: Optional[Cache] = None,
+        memory_budget: int = 256 * 1024 * 1024,
+        dtype_profile: Optional[str] = None
+    ):
+        if dtype_profile is None:
+            dtype_profile = 'compact' if get_precision() == 'float32' else 'float64'
+        if dtype_profile not in DTYPE_PROFILES:
+            raise ValueError(f"未知的类型方案: {dtype_profile}")
+        self.dtype_profile = dtype_profile
+        self.cache = LRUCache(memory_budget)
+        self.store = cache if cache is not None else Cache()
+        self.resampler = Resampler(self.store)
+        self._in_session = False
+        # 增量查询没有新K线的股票 -> 当时的最近交易日, 节假日内不再重复查询
+        self._checked: Dict[str, pd.Timestamp] = {}
+    
+    @contextmanager
+    def session(self):
+        """登录baostock, 在with块内的所有查询复用同一个会话"""
+        if self._in_session:
+            yield self
+            return
+        
+        lg = bs.login()
+        if lg.error_code != '0':
+            raise ConnectionError(f"Login failed: {lg.error_msg}")
+        
+        self._in_session = True
+        try:
+            yield self
+        finally:
+            self._in_session = False
+            bs.logout()
+    
+    @contextmanager
+    def _session_if(self, needed: bool):
+        """需要查询时登录, 返回是否在线; 登录失败只记录警告"""
+        with ExitStack() as stack:
+            online = False
+            if needed:
+                try:
+                    stack.enter_context(self.session())
+                    online = True
+                except Exception as e:
+                    logger.warning(f"Login failed, using cached data only: {str(e)}")
+            yield online
     
     def get_stock_data(self, symbol: str, start_date: str = '2020-01-01') -> Optional[pd.DataFrame]:
         """获取股票数据"""
         try:
             # 检查缓存
-            cache_key = f"{symbol}_{start_date}"
-            if cache_key in self.cache:
+            df = self.from_memory(symbol, start_date)
+            if df is not None:
                 logger.info(f"Using cached data for {symbol}")
-                return self.cache[cache_key]
-            
-            # 登录系统
-            lg = bs.login()
-            if lg.error_code != '0':
-                logger.error(f"Login failed: {lg.error_msg}")
-                return None
-            
-            # 获取数据
-            rs = bs.query_history_k_data_plus(
-                symbol,
-                "date,open,high,low,close,volume,amount",
-                start_date=start_date,
-                frequency="d",
-                adjustflag="3"
-            )
+                return df
             
-            if rs.error_code != '0':
-                logger.error(f"Query failed: {rs.error_msg}")
+            query_from, full = self.plan_fetch(symbol, start_date)
+            with self._session_if(query_from is not None) as online:
+                df, updated = self._load_history(symbol, start_date, None, query_from, full, online)
+            if df is None:
                 return None
             
-            # 处理数据
-            data_list = []
-            while (rs.error_code == '0') & rs.next():
-                data_list.append(rs.get_row_data())
-            
-            if not data_list:
-                logger.warning(f"No data retrieved for {symbol}")
-                return None
-            
-            # 创建DataFrame
-            df = pd.DataFrame(data_list, columns=[
-                'Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Amount'
-            ])
-            
-            # 数据类型转换
-            numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Amount']
-            df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric)
-            df.set_index('Date', inplace=True)
-            
-            # 保存到缓存
-            self.cache[cache_key] = df
+            # 保存到缓存, 更新失败的数据不缓存, 下次请求重新查询
+            if updated:
+                self.to_memory(symbol, start_date, df)
             return df
             
         except Exception as e:
             logger.error(f"Error getting data for {symbol}: {str(e)}")
             return None
+    
+    def get_resampled_data(
+        self,
+        symbol: str,
+        timeframe: str = 'w',
+        start_date: str = '2020-01-01'
+    ) -> Optional[pd.DataFrame]:
+        """获取周线('w')或月线('m')
+
+        由日线合成, 不再单独向baostock查询; 合成结果按股票缓存, 日线追加新K线后
+        只更新最后一个周期。
+        """
+        if timeframe not in ('w', 'm'):
+            logger.error(f"日线只能合成周线或月线: {timeframe}")
+            return None
+        df = self.get_stock_data(symbol, start_date)
+        if df is None:
+            return None
+        try:
+            return self.resampler.get(symbol, df, timeframe)
+        except Exception as e:
+            logger.error(f"Error resampling {symbol} to {timeframe}: {str(e)}")
+            return None
+    
+    def from_memory(self, symbol: str, start_date: str) -> Optional[pd.DataFrame]:
+        """从内存缓存读取, 起始日期更早的缓存也可以截取后使用"""
+        entry = self.cache.get(symbol)
+        if entry is None:
+            return None
+        
+        cached_from, df = entry
+        if start_date < cached_from:
+            return None
+        if start_date == cached_from:
+            return df
+        return df.loc[start_date:]
+    
+    def to_memory(self, symbol: str, start_date: str, df: pd.DataFrame):
+        """写入内存缓存, 不覆盖覆盖区间更长的已有数据"""
+        entry = self.cache.peek(symbol)
+        if entry is not None and entry[0] <= start_date:
+            return
+        self.cache.set(symbol, (start_date, df))
+    
+    def get_many_stock_data(
+        self,
+        symbols: Iterable[str],
+        start_date: str = '2020-01-01',
+        end_date: Optional[str] = None,
+        pool: Optional[BaostockWorkerPool] = None
+    ) -> Iterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+        """批量获取股票数据
+
+        整个批次最多登录一次 (全部已是最新时不登录), 逐只返回 ``(symbol, data, error)``。
+        单只股票失败时 ``data`` 为 None, ``error`` 为失败原因, 不会中断后续股票。
+        结果不写入内存缓存。
+        传入 ``pool`` 时查询分发到各工作进程并行执行, 结果按完成顺序返回。
+        """
+        if pool is not None:
+            yield from self._get_many_with_pool(symbols, start_date, end_date, pool)
+            return
+        
+        plans = [(symbol, *self.plan_fetch(symbol, start_date)) for symbol in symbols]
+        with self._session_if(any(query_from is not None for _, query_from, _ in plans)) as online:
+            for symbol, query_from, full in plans:
+                try:
+                    df, _ = self._load_history(symbol, start_date, end_date, query_from, full, online)
+                except Exception as e:
+                    logger.error(f"Error getting data for {symbol}: {str(e)}")
+                    yield symbol, None, str(e)
+                    continue
+                
+                if df is None:
+                    yield symbol, None, "no data"
+                else:
+                    yield symbol, df, None
+    
+    def _get_many_with_pool(
+        self,
+        symbols: Iterable[str],
+        start_date: str,
+        end_date: Optional[str],
+        pool: BaostockWorkerPool
+    ) -> Iterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+        """通过进程池并行拉取, 缓存的读写仍在当前进程完成"""
+        pending = {}
+        for symbol in symbols:
+            query_from, full = self.plan_fetch(symbol, start_date)
+            if query_from is None:
+                pending[self._done_future(None)] = (symbol, full)
+            else:
+                pending[pool.submit(
+                    query_history, symbol, query_from, None, self.dtype_profile
+                )] = (symbol, full)
+        
+        for future in as_completed(pending):
+            symbol, full = pending[future]
+            try:
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    df = self._fallback(symbol, start_date, end_date, full, e)
+                else:
+                    df = self.merge_history(symbol, start_date, end_date, fetched, full)
+            except Exception as e:
+                logger.error(f"Error getting data for {symbol}: {str(e)}")
+                yield symbol, None, str(e)
+                continue
             
-        finally:
-            bs.logout()
+            if df is None:
+                yield symbol, None, "no data"
+            else:
+                yield symbol, df, None
+    
+    @staticmethod
+    def _done_future(result) -> Future:
+        future: Future = Future()
+        future.set_result(result)
+        return future
+    
+    def _load_history(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: Optional[str],
+        query_from: Optional[str],
+        full: bool,
+        online: bool
+    ) -> Tuple[Optional[pd.DataFrame], bool]:
+        """按 plan_fetch 的结果增量拉取并合并
+
+        Returns:
+            (数据, 是否已更新), 不在线或查询失败时返回磁盘缓存中已有的数据
+        """
+        fetched = None
+        if query_from is not None:
+            try:
+                if not online:
+                    raise ConnectionError("baostock 未登录")
+                fetched = query_history(symbol, query_from, profile=self.dtype_profile)
+            except Exception as e:
+                return self._fallback(symbol, start_date, end_date, full, e), False
+        return self.merge_history(symbol, start_date, end_date, fetched, full), True
+    
+    def _fallback(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: Optional[str],
+        full: bool,
+        error: Exception
+    ) -> Optional[pd.DataFrame]:
+        """查询失败时使用磁盘缓存, 缓存没有覆盖请求区间时抛出原异常"""
+        if full:
+            raise error
+        logger.warning(f"Update failed for {symbol}, using cached data: {str(error)}")
+        return self._read_store(symbol, start_date, end_date)
+    
+    def _read_store(self, symbol: str, start_date: str, end_date: Optional[str]) -> Optional[pd.DataFrame]:
+        df = self.store.get(f"{symbol}_d", start=start_date, end=end_date)
+        if df is None or df.empty:
+            logger.warning(f"No data retrieved for {symbol}")
+            return None
+        return df
+    
+    def plan_fetch(self, symbol: str, start_date: str) -> Tuple[Optional[str], bool]:
+        """确定需要向baostock查询的起始日期
+
+        最后一根K线已到最近交易日 (见 latest_trading_day), 或本实例在该交易日
+        已查询过且没有新K线时, 不需要查询。
+
+        Returns:
+            (查询起始日期, 是否全量拉取), 已是最新时查询起始日期为 None
+        """
+        first_date, last_date = self.store.index_bounds(f"{symbol}_d")
+        stored = self.store.get(f"{symbol}_d", columns=[]) if first_date is not None else None
+        stored_from = stored.attrs.get('start_date', first_date) if stored is not None else None
+        stored_profile = stored.attrs.get('dtype_profile', 'legacy') if stored is not None else None
+        
+        if (stored_from is None or stored_profile != self.dtype_profile
+                or pd.Timestamp(start_date) < pd.Timestamp(stored_from)):
+            # 没有覆盖请求区间, 全量拉取
+            return start_date, True
+        
+        latest = latest_trading_day()
+        if pd.Timestamp(last_date) >= latest or self._checked.get(symbol) == latest:
+            return None, False
+        next_date = (pd.Timestamp(last_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        return next_date, False
+    
+    def merge_history(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: Optional[str],
+        fetched: Optional[pd.DataFrame],
+        full: bool
+    ) -> Optional[pd.DataFrame]:
+        """把查询结果写入磁盘缓存, 并返回请求区间的数据"""
+        store_key = f"{symbol}_d"
+        if full:
+            if fetched is None:
+                return None
+            fetched.attrs['start_date'] = start_date
+            fetched.attrs['dtype_profile'] = self.dtype_profile
+            self.store.set(store_key, fetched)
+            self._checked[symbol] = latest_trading_day()
+            return fetched.loc[:end_date] if end_date else fetched
+        
+        if fetched is not None:
+            logger.info(f"Appending {len(fetched)} new bars for {symbol}")
+            self.store.append(store_key, fetched)
+        self._checked[symbol] = latest_trading_day()
+        return self._read_store(symbol, start_date, end_date)
     
     def get_stock_basic_info(self, symbol: str) -> Optional[Dict]:
         """获取股票基本信息"""
         try:
-            lg = bs.login()
-            rs = bs.query_stock_basic(code=symbol)
-            
-            if rs.error_code != '0':
-                logger.error(f"Query failed: {rs.error_msg}")
+            with self.session():
+                rs = bs.query_stock_basic(code=symbol)
+                
+                if rs.error_code != '0':
+                    logger.error(f"Query failed: {rs.error_msg}")
+                    return None
+                
+                if rs.next():
+                    stock_info = rs.get_row_data()
+                    return {
+                        'name': stock_info[1],
+                        'market_cap': float(stock_info[11]) if stock_info[11] else 0,
+                        'industry': stock_info[16],
+                        'pe_ratio': float(stock_info[15]) if stock_info[15] else 0,
+                    }
                 return None
             
-            if rs.next():
-                stock_info = rs.get_row_data()
-                return {
-                    'name': stock_info[1],
-                    'market_cap': float(stock_info[11]) if stock_info[11] else 0,
-                    'industry': stock_info[16],
-                    'pe_ratio': float(stock_info[15]) if stock_info[15] else 0,
-                }
-            return None
-            
         except Exception as e:
             logger.error(f"Error getting basic info for {symbol}: {str(e)}")
-            return None
-            
-        finally:
-            bs.logout() 
\ No newline at end of file
+            return None 
\ No newline at end of file
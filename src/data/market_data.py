@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+from .sources import DataSource
+from ..indicators.momentum import MomentumIndicators
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 市场概览页显示的指数
+INDICES = {
+    '上证指数': 'sh.000001',
+    '深证成指': 'sz.399001',
+    '创业板指': 'sz.399006',
+}
+
+class MarketData:
+    """界面使用的市场数据, 全部通过 DataSource 获取
+
+    最新价和涨跌幅由日线的最后两根K线计算, 名称、行业、市值、市盈率来自股票基本信息,
+    因此切换数据源 (在线或离线) 后各页面读取的是同一个数据源。涨跌家数、行业涨跌和
+    选股需要逐只读取日线, ``max_symbols`` 限制扫描的股票数, 读取结果在实例内复用。
+    """
+
+    def __init__(self, source: DataSource, start_date: str = '2020-01-01', max_symbols: Optional[int] = None):
+        self.source = source
+        self.start_date = start_date
+        self.max_symbols = max_symbols
+        self._bars: Optional[Dict[str, pd.DataFrame]] = None
+        self._snapshot: Optional[pd.DataFrame] = None
+
+    def get_stock_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """个股最新行情和基本信息, 没有日线时返回 None"""
+        try:
+            df = self.source.get_stock_data(symbol, self.start_date)
+            if df is None or df.empty:
+                return None
+            info = self.source.get_stock_basic_info(symbol) or {}
+            return {
+                **info,
+                **self._quote(df),
+                'data': df,
+            }
+        except Exception as e:
+            logger.error(f"获取 {symbol} 行情失败: {str(e)}")
+            return None
+
+    def get_market_overview(self) -> Dict[str, Dict[str, float]]:
+        """主要指数的最新点位和涨跌幅, 数据源中没有的指数不返回"""
+        start = (pd.Timestamp.now() - pd.Timedelta(days=30)).strftime('%Y-%m-%d')
+        overview = {}
+        for name, code in INDICES.items():
+            try:
+                df = self.source.get_stock_data(code, start)
+            except Exception as e:
+                logger.error(f"获取指数 {name} 失败: {str(e)}")
+                continue
+            if df is not None and not df.empty:
+                quote = self._quote(df)
+                overview[name] = {'value': quote['close'], 'change': quote['change_pct']}
+        return overview
+
+    def get_market_breadth(self) -> Dict[str, int]:
+        """上涨、下跌、平盘家数"""
+        change = self.snapshot()['change_pct'].dropna()
+        return {
+            'up': int((change > 0).sum()),
+            'down': int((change < 0).sum()),
+            'flat': int((change == 0).sum()),
+        }
+
+    def get_industry_data(self) -> pd.DataFrame:
+        """按行业汇总的平均涨跌幅和股票数, 按涨跌幅降序"""
+        snapshot = self.snapshot()
+        snapshot = snapshot[snapshot['industry'].fillna('') != '']
+        if snapshot.empty:
+            return pd.DataFrame(columns=['change_pct', 'count'])
+        grouped = snapshot.groupby('industry')['change_pct']
+        return pd.DataFrame({
+            'change_pct': grouped.mean(),
+            'count': grouped.size(),
+        }).sort_values('change_pct', ascending=False)
+
+    def screen_stocks(self, criteria: Dict[str, Any]) -> pd.DataFrame:
+        """按技术指标和基本面条件选股
+
+        支持均线多头 (短均线在长均线之上)、MACD 在信号线之上、RSI 区间, 以及市值、
+        市盈率区间和行业 (行业名包含所选关键字)。基本信息缺失的股票不按基本面过滤,
+        数据源不提供的字段 (市净率、ROE 等) 忽略。
+        """
+        snapshot = self.snapshot()
+        keep = pd.Series(True, index=snapshot.index)
+
+        def between(column: str, bounds) -> pd.Series:
+            values = snapshot[column]
+            known = values.notna() & (values != 0)
+            return ~known | values.between(*bounds)
+
+        if criteria.get('market_cap'):
+            keep &= between('market_cap', criteria['market_cap'])
+        if criteria.get('pe_range'):
+            keep &= between('pe_ratio', criteria['pe_range'])
+        if criteria.get('industry'):
+            industry = snapshot['industry'].fillna('')
+            matched = industry.apply(lambda name: any(key in name for key in criteria['industry']))
+            keep &= (industry == '') | matched
+
+        selected = []
+        for symbol in snapshot.index[keep]:
+            close = self._bars[symbol]['Close'].astype(np.float64)
+            if self._technical_match(close.reset_index(drop=True), criteria):
+                selected.append(symbol)
+        return snapshot.loc[selected]
+
+    def snapshot(self) -> pd.DataFrame:
+        """扫描范围内每只股票一行: 名称、行业、市值、市盈率、最新价、涨跌幅"""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        symbols = self.source.list_symbols()
+        if self.max_symbols is not None:
+            symbols = symbols[:self.max_symbols]
+
+        self._bars, rows = {}, []
+        for symbol, df, error in self.source.get_many_stock_data(symbols, self.start_date):
+            if df is None or df.empty:
+                logger.warning(f"跳过 {symbol}: {error}")
+                continue
+            self._bars[symbol] = df
+            info = self.source.get_stock_basic_info(symbol) or {}
+            rows.append({
+                'symbol': symbol,
+                'name': info.get('name', ''),
+                'industry': info.get('industry', ''),
+                'market_cap': info.get('market_cap', np.nan),
+                'pe_ratio': info.get('pe_ratio', np.nan),
+                **self._quote(df),
+            })
+
+        columns = ['name', 'industry', 'market_cap', 'pe_ratio', 'close', 'change_pct', 'volume']
+        self._snapshot = pd.DataFrame(rows, columns=['symbol'] + columns).set_index('symbol')
+        return self._snapshot
+
+    @staticmethod
+    def _quote(df: pd.DataFrame) -> Dict[str, float]:
+        """最新收盘价、涨跌幅(%)和成交量"""
+        close = df['Close'].astype(np.float64).dropna()
+        last = float(close.iloc[-1]) if len(close) else np.nan
+        change = (last / float(close.iloc[-2]) - 1) * 100 if len(close) > 1 else np.nan
+        volume = float(df['Volume'].iloc[-1]) if 'Volume' in df else np.nan
+        return {'close': last, 'change_pct': change, 'volume': volume}
+
+    @staticmethod
+    def _technical_match(close: pd.Series, criteria: Dict[str, Any]) -> bool:
+        if criteria.get('ma_enabled'):
+            short, long = criteria['ma_short'], criteria['ma_long']
+            if len(close) < long:
+                return False
+            if not close.iloc[-short:].mean() > close.iloc[-long:].mean():
+                return False
+        if criteria.get('macd_enabled'):
+            macd, signal, _ = MomentumIndicators.calculate_macd(
+                close, criteria['macd_fast'], criteria['macd_slow']
+            )
+            if macd.empty or not macd.iloc[-1] > signal.iloc[-1]:
+                return False
+        if criteria.get('rsi_enabled'):
+            rsi = MomentumIndicators.calculate_rsi(close, criteria['rsi_period'])
+            if rsi.empty or not criteria['rsi_lower'] <= rsi.iloc[-1] <= criteria['rsi_upper']:
+                return False
+        return True
@@ -0,0 +1,167 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from ..utils.cache import Cache, LRUCache
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 周期名与 baostock 的 frequency 参数一致
+TIMEFRAMES = ('w', 'm', '15', '30', '60')
+
+# A股交易时段 (分钟): 9:30-11:30, 13:00-15:00
+MORNING_OPEN = 9 * 60 + 30
+MORNING_CLOSE = 11 * 60 + 30
+AFTERNOON_OPEN = 13 * 60
+
+# 字段名 (小写) -> 合成方式, 包括 baostock 日线的 preclose/turn/pctChg
+AGGREGATIONS = {
+    'open': 'first', 'preclose': 'first',
+    'high': 'max', 'low': 'min', 'close': 'last',
+    'volume': 'sum', 'amount': 'sum', 'turn': 'sum',
+    'pctchg': 'compound',
+}
+
+def resample_bars(
+    bars: pd.DataFrame,
+    timeframe: str,
+    how: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """由更细周期的K线合成周/月线或15/30/60分钟线
+
+    开盘取首根K线开盘价, 最高/最低取极值, 收盘取末根收盘价, 成交量、成交额和换手率
+    求和, 涨跌幅 (%) 按复利累计, 列名大小写均可, 见 AGGREGATIONS。其他列需在
+    ``how`` 中指定合成方式 (first/last/max/min/sum/compound), 否则抛出 ValueError,
+    不会被悄悄丢弃。合成的K线以周期内最后一根基础K线的时间标记, 因此节假日所在
+    的周以实际最后交易日为日期, 未走完的周期即当前最新的状态。
+
+    分钟线要求基础K线按结束时间标记 (baostock 的5分钟线 09:35 表示 09:30-09:35),
+    按交易时段划分, 60分钟线为 10:30、11:30、14:00、15:00 四根。
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"不支持的周期: {timeframe}")
+    how = how or {}
+    rules = {column: how.get(column, AGGREGATIONS.get(str(column).lower())) for column in bars.columns}
+    unknown = [column for column, rule in rules.items() if rule is None]
+    if unknown:
+        raise ValueError(f"无法合成的列: {unknown}, 请通过 how 指定合成方式")
+    if bars.empty:
+        return bars.copy()
+
+    keys = _bucket_keys(pd.DatetimeIndex(bars.index), timeframe)
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.concatenate([starts[1:], [len(keys)]]) - 1
+
+    data = {}
+    for column, rule in rules.items():
+        values = bars[column].to_numpy()
+        if rule == 'first':
+            data[column] = values[starts]
+        elif rule == 'last':
+            data[column] = values[ends]
+        elif rule == 'max':
+            data[column] = np.maximum.reduceat(values, starts)
+        elif rule == 'min':
+            data[column] = np.minimum.reduceat(values, starts)
+        elif rule == 'sum':
+            data[column] = np.add.reduceat(values, starts)
+        elif rule == 'compound':
+            growth = np.multiply.reduceat(1 + values.astype(np.float64) / 100, starts)
+            data[column] = ((growth - 1) * 100).astype(values.dtype, copy=False)
+        else:
+            raise ValueError(f"未知的合成方式: {rule}")
+    return pd.DataFrame(data, index=bars.index[ends])
+
+def bars_hash(bars: pd.DataFrame) -> str:
+    """K线 (含索引) 的内容哈希, 用于发现被修订的历史K线"""
+    hashed = pd.util.hash_pandas_object(bars, index=True).to_numpy()
+    digest = hashlib.blake2b(hashed.tobytes(), digest_size=16)
+    digest.update(','.join(map(str, bars.columns)).encode())
+    return digest.hexdigest()
+
+def _bucket_keys(index: pd.DatetimeIndex, timeframe: str) -> np.ndarray:
+    """每根基础K线所属周期的编号, 同一周期内相同且随时间递增"""
+    if timeframe == 'w':
+        return index.to_period('W').asi8
+    if timeframe == 'm':
+        return index.to_period('M').asi8
+
+    minutes = index.hour * 60 + index.minute
+    # 按交易时段内的分钟数划分, 跳过午间休市
+    trading_minute = np.where(
+        minutes <= MORNING_CLOSE,
+        minutes - MORNING_OPEN,
+        MORNING_CLOSE - MORNING_OPEN + minutes - AFTERNOON_OPEN
+    )
+    bucket = -(-trading_minute // int(timeframe))
+    day = index.normalize().asi8 // (24 * 3600 * 10 ** 9)
+    return day * 1000 + bucket
+
+class Resampler:
+    """按股票缓存多周期K线, 随基础K线增量更新
+
+    合成结果以 ``<symbol>_<周期>`` 为键写入 Cache, 属性中记录基础K线的首尾时间、
+    行数、内容哈希和最后一个周期的起点。基础K线在尾部追加时只重新合成最后一个
+    周期及之后的部分; 已合成部分的基础K线内容有变化 (历史K线被修订, 或请求了
+    更早的起始日期) 时全量合成。
+    """
+
+    def __init__(self, store: Optional[Cache] = None, memory_budget: int = 64 * 1024 * 1024):
+        self.store = store
+        self.memory = LRUCache(memory_budget)
+        self.full_builds = 0
+        self.incremental_updates = 0
+
+    def get(self, symbol: str, bars: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """``bars`` 为该股票当前全部基础K线, 返回合成后的K线"""
+        key = f"{symbol}_{timeframe}"
+        cached = self._load(key)
+        if bars.empty:
+            return resample_bars(bars, timeframe)
+
+        state = cached.attrs if cached is not None else {}
+        base_last = pd.Timestamp(state['base_last']) if 'base_last' in state else None
+        reusable = (
+            base_last is not None
+            and pd.Timestamp(state['base_first']) == bars.index[0]
+            and bars.index.searchsorted(base_last, side='right') == state['base_rows']
+            and bars_hash(bars.iloc[:state['base_rows']]) == state.get('base_hash')
+        )
+        if reusable and bars.index[-1] == base_last:
+            return cached.copy()
+
+        if reusable:
+            # 最后一个周期可能未走完, 从它的起点开始重新合成
+            tail = resample_bars(bars.loc[pd.Timestamp(state['last_start']):], timeframe)
+            result = pd.concat([cached.iloc[:-1], tail])
+            self.incremental_updates += 1
+        else:
+            result = resample_bars(bars, timeframe)
+            self.full_builds += 1
+
+        keys = _bucket_keys(pd.DatetimeIndex(bars.index), timeframe)
+        last_start = bars.index[np.searchsorted(keys, keys[-1])]
+        result.attrs = {
+            'timeframe': timeframe,
+            'base_first': str(bars.index[0]),
+            'base_last': str(bars.index[-1]),
+            'base_rows': len(bars),
+            'base_hash': bars_hash(bars),
+            'last_start': str(last_start),
+        }
+        self._save(key, result)
+        return result.copy()
+
+    def _load(self, key: str) -> Optional[pd.DataFrame]:
+        result = self.memory.get(key)
+        if result is None and self.store is not None:
+            result = self.store.get(key)
+            if result is not None:
+                self.memory.set(key, result)
+        return result
+
+    def _save(self, key: str, result: pd.DataFrame):
+        self.memory.set(key, result)
+        if self.store is not None:
+            self.store.set(key, result)
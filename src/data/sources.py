@@ -0,0 +1,181 @@
+import baostock as bs
+import pandas as pd
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .data_loader import DataLoader
+from ..utils.column_store import ColumnStore
+from ..utils.logger import setup_logger
+from ..utils.precision import to_precision
+
+logger = setup_logger(__name__)
+
+class DataSource(ABC):
+    """数据源接口
+
+    日线数据统一为 Open/High/Low/Close/Volume/Amount 列、Date 索引的 DataFrame,
+    基本信息统一为 name/market_cap/industry/pe_ratio 字典。
+    """
+
+    name = ""
+
+    @abstractmethod
+    def get_stock_data(
+        self,
+        symbol: str,
+        start_date: str = '2020-01-01',
+        end_date: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """获取股票日线数据"""
+        pass
+
+    @abstractmethod
+    def get_stock_basic_info(self, symbol: str) -> Optional[Dict]:
+        """获取股票基本信息"""
+        pass
+
+    @abstractmethod
+    def list_symbols(self) -> List[str]:
+        """列出可用的股票代码"""
+        pass
+
+    def get_many_stock_data(
+        self,
+        symbols: Iterable[str],
+        start_date: str = '2020-01-01',
+        end_date: Optional[str] = None
+    ) -> Iterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+        """批量获取, 逐只返回 ``(symbol, data, error)``"""
+        for symbol in symbols:
+            try:
+                df = self.get_stock_data(symbol, start_date, end_date)
+            except Exception as e:
+                yield symbol, None, str(e)
+                continue
+            yield symbol, df, None if df is not None else "no data"
+
+class BaostockSource(DataSource):
+    """BaoStock在线数据源"""
+
+    name = "BaoStock"
+
+    def __init__(self, loader: Optional[DataLoader] = None):
+        self.loader = loader if loader is not None else DataLoader()
+
+    def get_stock_data(self, symbol, start_date='2020-01-01', end_date=None):
+        """获取股票日线数据"""
+        df = self.loader.get_stock_data(symbol, start_date)
+        if df is not None and end_date:
+            df = df.loc[:end_date]
+        return df
+
+    def get_stock_basic_info(self, symbol):
+        """获取股票基本信息"""
+        return self.loader.get_stock_basic_info(symbol)
+
+    def list_symbols(self) -> List[str]:
+        """列出当日全部A股代码"""
+        try:
+            with self.loader.session():
+                rs = bs.query_all_stock()
+                symbols = []
+                while (rs.error_code == '0') & rs.next():
+                    symbols.append(rs.get_row_data()[0])
+                return symbols
+        except Exception as e:
+            logger.error(f"获取股票列表失败: {str(e)}")
+            return []
+
+    def get_many_stock_data(self, symbols, start_date='2020-01-01', end_date=None):
+        """批量获取, 整批只登录一次"""
+        return self.loader.get_many_stock_data(symbols, start_date, end_date)
+
+class OfflineSource(DataSource):
+    """离线数据源
+
+    读取本地行情归档, 目录结构::
+
+        <root>/symbols.csv       股票列表: code,name,industry,market_cap,pe_ratio,...
+        <root>/bars/<code>/      每只股票一个 ColumnStore 分区
+
+    分区中的列以 ``.npy`` 文件内存映射读取, 只拷贝请求的日期区间。
+    价格列按全局计算精度返回。
+    """
+
+    name = "离线数据"
+
+    def __init__(self, root_dir: str = "data/offline"):
+        self.root_dir = Path(root_dir)
+        self.store = ColumnStore(str(self.root_dir / "bars"))
+        self._symbols: Optional[pd.DataFrame] = None
+
+    @property
+    def symbol_master(self) -> pd.DataFrame:
+        """股票列表"""
+        if self._symbols is None:
+            master_file = self.root_dir / "symbols.csv"
+            if master_file.exists():
+                self._symbols = pd.read_csv(master_file, dtype={'code': str}).set_index('code')
+            else:
+                logger.warning(f"离线数据缺少股票列表: {master_file}")
+                self._symbols = pd.DataFrame(
+                    columns=['name', 'industry', 'market_cap', 'pe_ratio']
+                ).rename_axis('code')
+        return self._symbols
+
+    def get_stock_data(self, symbol, start_date='2020-01-01', end_date=None, columns=None):
+        """获取股票日线数据, 可以只读取部分列"""
+        df = self.store.read(symbol, columns=columns, start=start_date, end=end_date)
+        if df is None or df.empty:
+            logger.warning(f"No offline data for {symbol}")
+            return None
+        return to_precision(df)
+
+    def get_stock_basic_info(self, symbol):
+        """获取股票基本信息"""
+        if symbol not in self.symbol_master.index:
+            return None
+        row = self.symbol_master.loc[symbol]
+        return {
+            'name': row.get('name', ''),
+            'market_cap': float(row['market_cap']) if pd.notna(row.get('market_cap')) else 0,
+            'industry': row.get('industry', ''),
+            'pe_ratio': float(row['pe_ratio']) if pd.notna(row.get('pe_ratio')) else 0,
+        }
+
+    def list_symbols(self) -> List[str]:
+        """列出归档中的股票代码"""
+        if len(self.symbol_master):
+            return list(self.symbol_master.index)
+        return self.store.symbols()
+
+    def save_stock_data(self, symbol: str, df: pd.DataFrame) -> bool:
+        """写入一只股票的日线数据"""
+        return self.store.write(symbol, df)
+
+    def save_symbol_master(self, symbols: pd.DataFrame) -> bool:
+        """写入股票列表, 需包含 code 列或以 code 为索引"""
+        try:
+            if 'code' not in symbols.columns:
+                symbols = symbols.rename_axis('code').reset_index()
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.root_dir / "symbols.csv.tmp"
+            symbols.to_csv(tmp_file, index=False)
+            tmp_file.replace(self.root_dir / "symbols.csv")
+            self._symbols = None
+            return True
+        except Exception as e:
+            logger.error(f"写入股票列表失败: {str(e)}")
+            return False
+
+# 界面上的数据源选项
+DATA_SOURCES = {
+    BaostockSource.name: BaostockSource,
+    OfflineSource.name: OfflineSource,
+}
+
+def create_data_source(name: str, **kwargs) -> DataSource:
+    """按名称创建数据源"""
+    if name not in DATA_SOURCES:
+        raise ValueError(f"不支持的数据源: {name}")
+    return DATA_SOURCES[name](**kwargs)
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+from .sources import OfflineSource
+from ..utils.logger import setup_logger
+from ..utils.precision import FLOAT64_COLUMNS, float_dtype, to_precision
+
+logger = setup_logger(__name__)
+
+INDUSTRIES = [
+    "金融", "科技", "医药", "消费", "地产", "新能源", "半导体",
+    "机械", "农业", "建筑", "交通", "传媒", "军工", "环保",
+]
+
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+
+class SyntheticMarket:
+    """可复现的合成A股日线行情
+
+    用于在开发机上按生产规模(数千只股票 × 数十年日线)测试指标、选股和回测的性能。
+    同一个 ``seed`` 总是生成相同的数据; 每只股票使用独立的随机数流,
+    因此结果与分块大小和生成顺序无关。
+
+    模型要点:
+    - 收益 = 市场因子 × beta + 行业因子 + GARCH(1,1) 个股波动, 波动率聚集;
+    - 主板涨跌停 ±10%, 创业板(300)/科创板(688) ±20%, 涨停日最高价即收盘价;
+    - 成交量为对数AR(1)过程并随 |收益| 放大, 形成放量聚集, 封板日缩量;
+    - 随机的上市日期和停牌区间, 面板中对应位置为 NaN, 单只股票数据中不含这些日期。
+    """
+
+    def __init__(
+        self,
+        n_symbols: int = 500,
+        start_date: str = '2005-01-04',
+        end_date: str = '2024-12-31',
+        seed: int = 0
+    ):
+        if n_symbols <= 0:
+            raise ValueError("股票数量必须为正整数")
+        self.n_symbols = n_symbols
+        self.seed = seed
+        self.dates = pd.bdate_range(start_date, end_date, name='Date')
+        self.symbols = self._make_symbols(n_symbols)
+
+        rng = np.random.default_rng([seed, 0])
+        n_days = len(self.dates)
+        self.industry_ids = rng.integers(0, len(INDUSTRIES), n_symbols)
+        self.market_returns = rng.standard_t(5, n_days) * 0.009 + 0.0002
+        self.industry_returns = rng.standard_normal((n_days, len(INDUSTRIES))) * 0.006
+
+    @property
+    def symbol_master(self) -> pd.DataFrame:
+        """股票列表, 与离线数据源的 symbols.csv 格式一致"""
+        rng = np.random.default_rng([self.seed, 1])
+        return pd.DataFrame({
+            'code': self.symbols,
+            'name': [f"合成{i:04d}" for i in range(self.n_symbols)],
+            'industry': [INDUSTRIES[i] for i in self.industry_ids],
+            'market_cap': np.round(np.exp(rng.normal(4.5, 1.2, self.n_symbols)), 2),
+            'pe_ratio': np.round(np.exp(rng.normal(3.0, 0.6, self.n_symbols)), 2),
+        })
+
+    def generate(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """生成第 start 到 stop 只股票的面板数据
+
+        Returns:
+            字段名 -> (日期 × 股票) 数组, 未上市和停牌的位置为 NaN
+        """
+        stop = self.n_symbols if stop is None else min(stop, self.n_symbols)
+        columns = range(start, stop)
+        n_days, n_cols = len(self.dates), len(columns)
+
+        # 每只股票独立的随机数流
+        params = np.empty((6, n_cols))
+        shocks = np.empty((4, n_days, n_cols))
+        tradable = np.ones((n_days, n_cols), dtype=bool)
+        for j, i in enumerate(columns):
+            rng = np.random.default_rng([self.seed, 2, i])
+            garch_alpha = rng.uniform(0.04, 0.09)
+            params[:, j] = [
+                rng.uniform(0.6, 1.4),     # 市场beta
+                garch_alpha,               # GARCH alpha
+                rng.uniform(0.85, 0.97 - garch_alpha),  # GARCH beta, 保证 alpha + beta < 1
+                rng.uniform(0.015, 0.03),  # 长期日波动率
+                np.exp(rng.normal(2.5, 0.8)),  # 初始价格
+                rng.normal(13.0, 1.0),     # 平均对数成交量
+            ]
+            shocks[:, :, j] = rng.standard_normal((4, n_days))
+            tradable[:, j] = self._tradable_days(rng, n_days)
+
+        market_beta, alpha, beta, long_vol, first_price, volume_level = params
+        omega = long_vol ** 2 * (1 - alpha - beta)
+        # 补偿波动带来的对数收益损耗, 避免价格长期趋于零
+        drift = 0.5 * long_vol ** 2
+        industry = self.industry_returns[:, self.industry_ids[start:stop]]
+        limit = np.array([0.2 if s[3:6] in ('300', '688') else 0.1 for s in self.symbols[start:stop]])
+
+        # GARCH方差、成交量AR(1)和价格需要按日递推, 每步都在整块股票上向量化
+        close = np.empty((n_days, n_cols))
+        log_volume = np.empty((n_days, n_cols))
+        sigma2 = long_vol ** 2
+        volume_state = np.zeros(n_cols)
+        prev_eps = np.zeros(n_cols)
+        first_price = np.round(first_price, 2)
+        price = first_price.copy()
+        for t in range(n_days):
+            sigma2 = omega + alpha * prev_eps ** 2 + beta * sigma2
+            prev_eps = np.sqrt(sigma2) * shocks[0, t]
+            ret = drift + market_beta * self.market_returns[t] + industry[t] + prev_eps
+            # 价格对初始水平弱均值回复, 避免长期漂移到接近零或过高
+            ret -= 0.002 * np.log(price / first_price)
+            # 按分取整后截断在涨跌停价之间, 停牌期间价格不变
+            upper, lower = np.round(price * (1 + limit), 2), np.round(price * (1 - limit), 2)
+            moved = np.clip(np.round(price * (1 + ret), 2), lower, upper)
+            price = np.where(tradable[t], moved, price)
+            close[t] = price
+            volume_state = 0.8 * volume_state + 0.25 * shocks[1, t]
+            log_volume[t] = volume_level + volume_state + 12 * np.abs(prev_eps)
+
+        prev_close = np.vstack([first_price[None, :], close[:-1]])
+        upper, lower = np.round(prev_close * (1 + limit), 2), np.round(prev_close * (1 - limit), 2)
+        limit_up = close >= upper
+        limit_down = close <= lower
+
+        returns = close / prev_close - 1
+        open_ = np.clip(np.round(prev_close * (1 + 0.3 * returns + 0.004 * shocks[2]), 2), lower, upper)
+        spread = np.abs(shocks[3]) * long_vol * 0.6
+        high = np.minimum(np.round(np.maximum(open_, close) * (1 + spread), 2), upper)
+        low = np.maximum(np.round(np.minimum(open_, close) * (1 - spread), 2), lower)
+        high = np.where(limit_up, close, high)
+        low = np.where(limit_down, close, low)
+
+        # 封板日缩量
+        log_volume = log_volume - 1.0 * (limit_up | limit_down)
+        volume = np.round(np.exp(log_volume) / 100) * 100
+        amount = np.round(volume * (open_ + high + low + close) / 4, 2)
+
+        panel = {
+            'open': open_, 'high': high, 'low': low, 'close': close,
+            'volume': volume, 'amount': amount,
+        }
+        for field in PANEL_FIELDS:
+            panel[field] = np.where(tradable, panel[field], np.nan)
+        return panel
+
+    def panel(self, fields: Sequence[str] = PANEL_FIELDS, chunk_size: int = 256) -> Dict[str, pd.DataFrame]:
+        """全部股票的面板数据, 日期 × 股票代码, 按全局计算精度返回
+
+        与 :meth:`write_archive` 一样按 ``chunk_size`` 只股票分块生成, 逐块写入
+        按最终类型预先分配的结果数组, 临时内存只与块大小有关。
+        """
+        n_days = len(self.dates)
+        dtypes = {
+            field: np.float64 if field in FLOAT64_COLUMNS else float_dtype()
+            for field in fields
+        }
+        arrays = {field: np.empty((n_days, self.n_symbols), dtype=dtypes[field]) for field in fields}
+        for start in range(0, self.n_symbols, chunk_size):
+            data = self.generate(start, start + chunk_size)
+            for field in fields:
+                arrays[field][:, start:start + chunk_size] = data[field]
+        return {
+            field: pd.DataFrame(arrays[field], index=self.dates, columns=self.symbols, copy=False)
+            for field in fields
+        }
+
+    def get_stock_data(self, symbol: str) -> pd.DataFrame:
+        """单只股票的日线, 格式与 DataLoader 一致"""
+        i = self.symbols.index(symbol)
+        return to_precision(self._to_bars(self.generate(i, i + 1), 0))
+
+    def write_archive(self, root_dir: str, chunk_size: int = 256) -> OfflineSource:
+        """按离线数据源格式写入 ``root_dir``, 分块生成以控制内存"""
+        source = OfflineSource(root_dir)
+        source.save_symbol_master(self.symbol_master)
+        for start in range(0, self.n_symbols, chunk_size):
+            data = self.generate(start, start + chunk_size)
+            for j, symbol in enumerate(self.symbols[start:start + chunk_size]):
+                source.save_stock_data(symbol, self._to_bars(data, j))
+            logger.info(f"已写入 {min(start + chunk_size, self.n_symbols)}/{self.n_symbols} 只股票")
+        return source
+
+    def _to_bars(self, data: Dict[str, np.ndarray], j: int) -> pd.DataFrame:
+        traded = ~np.isnan(data['close'][:, j])
+        return pd.DataFrame({
+            'Open': data['open'][traded, j],
+            'High': data['high'][traded, j],
+            'Low': data['low'][traded, j],
+            'Close': data['close'][traded, j],
+            'Volume': data['volume'][traded, j].astype(np.int64),
+            'Amount': data['amount'][traded, j],
+        }, index=self.dates[traded])
+
+    @staticmethod
+    def _tradable_days(rng: np.random.Generator, n_days: int) -> np.ndarray:
+        """随机上市日期和停牌区间"""
+        tradable = np.ones(n_days, dtype=bool)
+        # 约三成股票在区间内上市
+        if rng.random() < 0.3:
+            tradable[:rng.integers(0, n_days)] = False
+        # 平均每年约一次停牌, 停牌长度服从几何分布
+        for _ in range(rng.poisson(n_days / 250)):
+            begin = rng.integers(0, n_days)
+            tradable[begin:begin + rng.geometric(0.3)] = False
+        return tradable
+
+    def _make_symbols(self, n: int) -> List[str]:
+        """按沪市主板/深市主板/创业板/科创板 4:3:2:1 的比例分配代码"""
+        boards = [('sh', 600000), ('sh', 600000), ('sh', 600000), ('sh', 600000),
+                  ('sz', 1), ('sz', 1), ('sz', 1), ('sz', 300001), ('sz', 300001), ('sh', 688001)]
+        counters: Dict[int, int] = {}
+        symbols = []
+        for i in range(n):
+            exchange, base = boards[i % len(boards)]
+            symbols.append(f"{exchange}.{base + counters.get(base, 0):06d}")
+            counters[base] = counters.get(base, 0) + 1
+        return symbols
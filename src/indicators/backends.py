@@ -0,0 +1,336 @@
+import importlib.util
+import time
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from ..utils.logger import setup_logger
+from .trend import EPSILON, wilder_adx
+
+logger = setup_logger(__name__)
+
+class IndicatorBackend(ABC):
+    """指标计算后端
+
+    所有后端都按 TA-Lib 的定义计算(Wilder 平滑、总体标准差、ADOSC 以首个 AD 值起算等),
+    输入为一维 float64 数组, 输出为同长度数组, 预热期为 NaN。
+    """
+
+    name = ''
+
+    @classmethod
+    def available(cls) -> bool:
+        """当前环境能否使用该后端"""
+        return True
+
+    @abstractmethod
+    def sma(self, close: np.ndarray, period: int) -> np.ndarray:
+        """简单移动平均"""
+
+    @abstractmethod
+    def bbands(
+        self,
+        close: np.ndarray,
+        period: int,
+        nbdev_up: float,
+        nbdev_dn: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """布林带, 返回 (upper, middle, lower)"""
+
+    @abstractmethod
+    def obv(self, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """能量潮"""
+
+    @abstractmethod
+    def ad(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Chaikin A/D 线"""
+
+    @abstractmethod
+    def adosc(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        fast_period: int = 3,
+        slow_period: int = 10
+    ) -> np.ndarray:
+        """Chaikin A/D 振荡器"""
+
+    @abstractmethod
+    def atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """平均真实波幅 (Wilder 平滑)"""
+
+    @abstractmethod
+    def rsi(self, close: np.ndarray, period: int) -> np.ndarray:
+        """相对强弱指数 (Wilder 平滑)"""
+
+    @abstractmethod
+    def dx(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """方向运动指数"""
+
+    @abstractmethod
+    def adx(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """平均方向指数"""
+
+    @abstractmethod
+    def cci(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """顺势指标"""
+
+class TalibBackend(IndicatorBackend):
+    """TA-Lib 后端, 需要安装 TA-Lib"""
+
+    name = 'talib'
+
+    def __init__(self):
+        import talib
+        self._talib = talib
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec('talib') is not None
+
+    def sma(self, close, period):
+        return self._talib.SMA(close, timeperiod=period)
+
+    def bbands(self, close, period, nbdev_up, nbdev_dn):
+        return self._talib.BBANDS(close, timeperiod=period, nbdevup=nbdev_up, nbdevdn=nbdev_dn)
+
+    def obv(self, close, volume):
+        return self._talib.OBV(close, volume)
+
+    def ad(self, high, low, close, volume):
+        return self._talib.AD(high, low, close, volume)
+
+    def adosc(self, high, low, close, volume, fast_period=3, slow_period=10):
+        return self._talib.ADOSC(high, low, close, volume, fastperiod=fast_period, slowperiod=slow_period)
+
+    def atr(self, high, low, close, period):
+        return self._talib.ATR(high, low, close, timeperiod=period)
+
+    def rsi(self, close, period):
+        return self._talib.RSI(close, timeperiod=period)
+
+    def dx(self, high, low, close, period):
+        return self._talib.DX(high, low, close, timeperiod=period)
+
+    def adx(self, high, low, close, period):
+        return self._talib.ADX(high, low, close, timeperiod=period)
+
+    def cci(self, high, low, close, period):
+        return self._talib.CCI(high, low, close, timeperiod=period)
+
+class NumpyBackend(IndicatorBackend):
+    """向量化的 NumPy/pandas 后端, 无额外依赖
+
+    Wilder 平滑 ``s = s + (x - s) / n`` 是 alpha = 1/n 的指数平滑,
+    交给 pandas 的 ewm 计算, 不做逐元素的 Python 循环。
+    """
+
+    name = 'numpy'
+
+    def sma(self, close, period):
+        return pd.Series(close).rolling(period).mean().to_numpy()
+
+    def bbands(self, close, period, nbdev_up, nbdev_dn):
+        values = pd.Series(close)
+        middle = values.rolling(period).mean().to_numpy()
+        # TA-Lib 使用总体标准差
+        std = values.rolling(period).std(ddof=0).to_numpy()
+        return middle + nbdev_up * std, middle, middle - nbdev_dn * std
+
+    def obv(self, close, volume):
+        if len(close) == 0:
+            return np.array([], dtype=np.float64)
+        signed = np.sign(np.diff(close)) * volume[1:]
+        return volume[0] + np.concatenate([[0.0], np.cumsum(signed)])
+
+    def ad(self, high, low, close, volume):
+        return np.cumsum(self._money_flow_volume(high, low, close, volume))
+
+    def adosc(self, high, low, close, volume, fast_period=3, slow_period=10):
+        ad = pd.Series(self.ad(high, low, close, volume))
+        result = (ad.ewm(span=fast_period, adjust=False).mean() - ad.ewm(span=slow_period, adjust=False).mean()).to_numpy(copy=True)
+        result[:max(fast_period, slow_period) - 1] = np.nan
+        return result
+
+    def atr(self, high, low, close, period):
+        tr = _true_range(high, low, close)
+        if period <= 1:
+            return tr
+        return _wilder(tr, period, period, np.mean(tr[1:period + 1]))
+
+    def rsi(self, close, period):
+        delta = np.concatenate([[np.nan], np.diff(close)])
+        gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+        avg_gain = _wilder(gains, period, period, np.mean(gains[1:period + 1]))
+        avg_loss = _wilder(losses, period, period, np.mean(losses[1:period + 1]))
+        total = avg_gain + avg_loss
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(np.abs(total) < EPSILON, 0.0, 100 * avg_gain / total)
+        return np.where(np.isnan(total), np.nan, rsi)
+
+    def dx(self, high, low, close, period):
+        dx = self._dx(high, low, close, period)
+        # 无法计算时 TA-Lib 沿用上一个值, 首个值为0
+        result = pd.Series(dx).ffill().fillna(0.0).to_numpy(copy=True)
+        result[:period] = np.nan
+        return result
+
+    def adx(self, high, low, close, period):
+        return wilder_adx(high[:, None], low[:, None], close[:, None], period)[0][:, 0]
+
+    def cci(self, high, low, close, period):
+        typical = (high + low + close) / 3
+        result = np.full(len(close), np.nan)
+        if len(close) < period:
+            return result
+        windows = np.lib.stride_tricks.sliding_window_view(typical, period)
+        average = windows.mean(axis=1)
+        deviation = np.abs(windows - average[:, None]).mean(axis=1)
+        distance = typical[period - 1:] - average
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cci = distance / (0.015 * deviation)
+        result[period - 1:] = np.where((distance != 0) & (deviation != 0), cci, 0.0)
+        return result
+
+    @staticmethod
+    def _money_flow_volume(high, low, close, volume):
+        spread = high - low
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(spread > 0, ((close - low) - (high - close)) / spread * volume, 0.0)
+
+    @staticmethod
+    def _dx(high, low, close, period):
+        """未填充的 DX, 无法计算的位置为 NaN"""
+        return wilder_adx(high[:, None], low[:, None], close[:, None], period)[3][:, 0]
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅, 第一根K线没有前收盘价, 为 NaN"""
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+def _wilder(values: np.ndarray, start: int, period: int, seed: float) -> np.ndarray:
+    """Wilder 平滑: 第 start 根取 seed, 之后 s = s + (x - s) / period"""
+    result = np.full(len(values), np.nan)
+    if start >= len(values):
+        return result
+    seeded = values[start:].copy()
+    seeded[0] = seed
+    result[start:] = pd.Series(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    return result
+
+BACKENDS: Dict[str, type] = {
+    TalibBackend.name: TalibBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+_active: Optional[IndicatorBackend] = None
+
+def available_backends() -> List[str]:
+    """当前环境可用的后端名称"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def get_backend() -> IndicatorBackend:
+    """当前使用的后端, 首次调用时自动选择"""
+    global _active
+    if _active is None:
+        _active = select_backend()
+    return _active
+
+def set_backend(name: str = 'auto') -> IndicatorBackend:
+    """指定后端, ``auto`` 表示按可用性和实测速度自动选择"""
+    global _active
+    if name == 'auto':
+        _active = select_backend()
+    elif name not in BACKENDS:
+        raise ValueError(f"未知指标后端: {name}")
+    elif not BACKENDS[name].available():
+        raise ValueError(f"指标后端不可用: {name}")
+    else:
+        _active = BACKENDS[name]()
+    return _active
+
+def select_backend(n_bars: int = 5000, repeat: int = 3) -> IndicatorBackend:
+    """在合成数据上对每个可用后端计时, 选择最快的"""
+    high, low, close, volume = _sample_bars(n_bars)
+    timings = {}
+    for name in available_backends():
+        try:
+            backend = BACKENDS[name]()
+            best = np.inf
+            for _ in range(repeat):
+                start = time.perf_counter()
+                backend.bbands(close, 20, 2.0, 2.0)
+                backend.adx(high, low, close, 14)
+                backend.cci(high, low, close, 14)
+                backend.adosc(high, low, close, volume)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = (best, backend)
+        except Exception as e:
+            logger.error(f"指标后端 {name} 测速失败: {str(e)}")
+
+    if not timings:
+        return NumpyBackend()
+    name = min(timings, key=lambda key: timings[key][0])
+    logger.info(
+        f"使用指标后端 {name} ("
+        + ", ".join(f"{key}: {seconds * 1000:.2f}ms" for key, (seconds, _) in timings.items())
+        + ")"
+    )
+    return timings[name][1]
+
+def compare_backends(
+    reference: IndicatorBackend,
+    candidate: IndicatorBackend,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    rtol: float = 1e-6,
+    atol: float = 1e-6
+) -> pd.DataFrame:
+    """比较两个后端在同一份数据上的全部指标
+
+    Returns:
+        每个指标一行: 最大绝对误差、最大相对误差、NaN 位置是否一致、是否在容差内
+    """
+    high, low, close, volume = (np.asarray(v, dtype=np.float64) for v in (high, low, close, volume))
+    calls = {
+        'sma': lambda b: b.sma(close, 20),
+        'bbands': lambda b: b.bbands(close, 20, 2.0, 2.0),
+        'obv': lambda b: b.obv(close, volume),
+        'ad': lambda b: b.ad(high, low, close, volume),
+        'adosc': lambda b: b.adosc(high, low, close, volume),
+        'atr': lambda b: b.atr(high, low, close, 14),
+        'rsi': lambda b: b.rsi(close, 14),
+        'dx': lambda b: b.dx(high, low, close, 14),
+        'adx': lambda b: b.adx(high, low, close, 14),
+        'cci': lambda b: b.cci(high, low, close, 14),
+    }
+    rows = []
+    for name, call in calls.items():
+        expected, actual = call(reference), call(candidate)
+        expected = np.atleast_2d(np.asarray(expected, dtype=np.float64))
+        actual = np.atleast_2d(np.asarray(actual, dtype=np.float64))
+        same_nan = np.array_equal(np.isnan(expected), np.isnan(actual))
+        both = ~np.isnan(expected) & ~np.isnan(actual)
+        error = np.abs(actual[both] - expected[both])
+        relative = error / np.maximum(np.abs(expected[both]), EPSILON)
+        rows.append({
+            'indicator': name,
+            'max_abs_error': error.max() if error.size else 0.0,
+            'max_rel_error': relative.max() if relative.size else 0.0,
+            'same_nan': same_nan,
+            'passed': same_nan and bool(np.all(error <= atol + rtol * np.abs(expected[both]))),
+        })
+    return pd.DataFrame(rows).set_index('indicator')
+
+def _sample_bars(n_bars: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """测速用的随机游走K线"""
+    rng = np.random.default_rng(0)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    spread = np.abs(rng.normal(0, 0.01, n_bars))
+    high, low = close * (1 + spread), close * (1 - spread)
+    volume = np.round(np.exp(rng.normal(13, 0.5, n_bars)) / 100) * 100
+    return high, low, close, volume
@@ -0,0 +1,32 @@
+import numpy as np
+from typing import List, Tuple
+
+def pack_valid(*arrays: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """把每列的有效值按原顺序移到列首, 含 NaN 的行(停牌)移到列尾
+
+    任一输入为 NaN 的行视为无效, 在所有输出中都置为 NaN。
+
+    Returns:
+        (valid, packed), valid 为原数组中有效位置的掩码, 用 :func:`unpack` 还原
+    """
+    valid = np.ones(arrays[0].shape, dtype=bool)
+    for arr in arrays:
+        valid &= ~np.isnan(arr)
+    n_rows = valid.shape[0]
+    # 在转置后的连续内存上按布尔掩码整体搬运, 比逐列或花式索引快
+    valid_t = np.ascontiguousarray(valid.T)
+    head_t = np.arange(n_rows)[None, :] < valid_t.sum(axis=1)[:, None]
+    packed = []
+    for arr in arrays:
+        out = np.full(valid_t.shape, np.nan, dtype=arr.dtype)
+        out[head_t] = np.ascontiguousarray(arr.T)[valid_t]
+        packed.append(out.T)
+    return valid, packed
+
+def unpack(valid: np.ndarray, packed: np.ndarray) -> np.ndarray:
+    """把压缩后的结果还原到原来的行, 停牌行为 NaN"""
+    valid_t = np.ascontiguousarray(valid.T)
+    head_t = np.arange(valid.shape[0])[None, :] < valid_t.sum(axis=1)[:, None]
+    out = np.full(valid_t.shape, np.nan, dtype=packed.dtype)
+    out[valid_t] = np.ascontiguousarray(packed.T)[head_t]
+    return out.T
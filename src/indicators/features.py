@@ -0,0 +1,298 @@
+import inspect
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from .base import pack_valid, unpack
+from .rolling import rolling_argmax, rolling_argmin, rolling_max, rolling_min
+from .trend import adx_kernel, supertrend_bands, supertrend_kernel
+from ..utils.logger import setup_logger
+from ..utils.precision import float_dtype, to_precision
+
+logger = setup_logger(__name__)
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+
+# 特征名 -> (计算函数, 默认参数)
+FEATURES: Dict[str, Tuple[Callable, Dict[str, Any]]] = {}
+
+def feature(name: str):
+    """注册特征
+
+    被装饰函数的第一个参数是 FeatureGraph, 通过 ``g.node(...)`` 取得依赖的输入或中间结果,
+    其余参数都必须带默认值, 默认参数和显式传入相同值的请求共用同一个结果。
+    """
+    def register(fn: Callable) -> Callable:
+        params = list(inspect.signature(fn).parameters.values())[1:]
+        FEATURES[name] = (fn, {p.name: p.default for p in params})
+        return fn
+    return register
+
+class FeatureGraph:
+    """指标计算图
+
+    同一份数据上的指标通过依赖关系共享中间结果(真实波幅、收益、滚动均值/标准差等),
+    每个 (特征, 参数) 只计算一次。输入可以是:
+
+    - 单只股票的 Series, 输出为同索引的 Series;
+    - (日期 × 股票) 的 DataFrame 或二维数组, 输出为同形状的 DataFrame 或数组。
+      任一输入为 NaN 的行视为停牌, 所有特征都跳过停牌行计算, 停牌位置输出 NaN。
+
+    输入、中间结果和输出按创建时的全局计算精度 (见 ``utils.precision``) 存储,
+    滚动统计和指数平滑在 pandas 内部以 float64 累加。
+    """
+
+    def __init__(
+        self,
+        open: Any = None,
+        high: Any = None,
+        low: Any = None,
+        close: Any = None,
+        volume: Any = None,
+        amount: Any = None
+    ):
+        given = {
+            'open': open, 'high': high, 'low': low,
+            'close': close, 'volume': volume, 'amount': amount,
+        }
+        given = {field: data for field, data in given.items() if data is not None}
+        if not given:
+            raise ValueError("至少需要一个输入序列")
+
+        sample = next(iter(given.values()))
+        self._frame = sample if isinstance(sample, pd.DataFrame) else None
+        self._series_index = sample.index if isinstance(sample, pd.Series) else None
+        self._valid: Optional[np.ndarray] = None
+        self._dtype = float_dtype()
+        values = {field: np.asarray(data, dtype=self._dtype) for field, data in given.items()}
+        self._panel = sample.ndim == 2
+
+        if self._panel:
+            if any(np.isnan(v).any() for v in values.values()):
+                self._valid, packed = pack_valid(*values.values())
+                values = dict(zip(values, packed))
+            self._inputs = {field: pd.DataFrame(v) for field, v in values.items()}
+        else:
+            self._inputs = {field: pd.Series(v, index=self._series_index) for field, v in values.items()}
+
+        self._memo: Dict[Tuple, Any] = {}
+        self._outputs: Dict[Tuple, Any] = {}
+        # 每个 (特征, 参数) 的实际计算次数
+        self.evaluations: Dict[Tuple, int] = {}
+
+    @classmethod
+    def from_bars(cls, data: pd.DataFrame) -> 'FeatureGraph':
+        """由单只股票的日线创建, 列名大小写均可 (Close 或 close)"""
+        inputs = {}
+        for field in FIELDS:
+            for column in (field, field.capitalize()):
+                if column in data.columns:
+                    inputs[field] = data[column]
+                    break
+        return cls(**inputs)
+
+    def node(self, name: str, **params) -> Any:
+        """取得输入或特征的内部结果, 供特征函数使用"""
+        if name in FIELDS and not params:
+            if name not in self._inputs:
+                raise ValueError(f"缺少输入: {name}")
+            return self._inputs[name]
+
+        key = self._key(name, params)
+        if key not in self._memo:
+            fn, _ = FEATURES[name]
+            self._memo[key] = to_precision(fn(self, **dict(key[1])), self._dtype)
+            self.evaluations[key] = self.evaluations.get(key, 0) + 1
+        return self._memo[key]
+
+    def get(self, name: str, **params) -> Any:
+        """计算特征, 多输出的特征返回元组"""
+        key = self._key(name, params) if name not in FIELDS else (name, ())
+        if key not in self._outputs:
+            self._outputs[key] = self._output(self.node(name, **params))
+        return self._outputs[key]
+
+    def compute(self, requests: Dict[str, Union[str, Tuple[str, Dict[str, Any]]]]) -> Dict[str, Any]:
+        """一次计算多个特征, 共享全部中间结果
+
+        Args:
+            requests: 结果名 -> 特征名 或 (特征名, 参数)
+        """
+        results = {}
+        for label, request in requests.items():
+            name, params = (request, {}) if isinstance(request, str) else request
+            results[label] = self.get(name, **params)
+        return results
+
+    def _key(self, name: str, params: Dict[str, Any]) -> Tuple:
+        if name not in FEATURES:
+            raise ValueError(f"未知特征: {name}")
+        defaults = FEATURES[name][1]
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"特征 {name} 不支持参数: {', '.join(sorted(unknown))}")
+        return name, tuple(sorted({**defaults, **params}.items()))
+
+    def _output(self, value: Any) -> Any:
+        if isinstance(value, tuple):
+            return tuple(self._output(v) for v in value)
+        if not self._panel:
+            return value if self._series_index is not None else value.to_numpy()
+        result = value.to_numpy(dtype=self._dtype)
+        if self._valid is not None:
+            result = unpack(self._valid, result)
+        if self._frame is not None:
+            result = pd.DataFrame(result, index=self._frame.index, columns=self._frame.columns)
+        return result
+
+def _apply(kernel: Callable, values: Any, *args) -> Any:
+    """在 Series/DataFrame 的数值上调用数组内核, 结果保留原索引"""
+    return _like(values, kernel(values.to_numpy(), *args))
+
+def _like(template: Any, result: np.ndarray) -> Any:
+    """把数组包装成与 template 相同索引(和列)的 Series/DataFrame"""
+    if isinstance(template, pd.Series):
+        return pd.Series(result, index=template.index)
+    return pd.DataFrame(result, index=template.index, columns=template.columns)
+
+# 中间结果
+
+@feature('prev_close')
+def _prev_close(g):
+    return g.node('close').shift(1)
+
+@feature('tr')
+def _true_range(g):
+    high, low, prev_close = g.node('high'), g.node('low'), g.node('prev_close')
+    return np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+
+@feature('delta')
+def _delta(g, field='close'):
+    return g.node(field).diff()
+
+@feature('returns')
+def _returns(g, field='close'):
+    values = g.node(field)
+    return values / values.shift(1) - 1
+
+@feature('rolling_mean')
+def _rolling_mean(g, field='close', window=20):
+    return g.node(field).rolling(window).mean()
+
+@feature('rolling_std')
+def _rolling_std(g, field='close', window=20):
+    return g.node(field).rolling(window).std()
+
+@feature('rolling_min')
+def _rolling_min(g, field='low', window=9):
+    return _apply(rolling_min, g.node(field), window)
+
+@feature('rolling_max')
+def _rolling_max(g, field='high', window=9):
+    return _apply(rolling_max, g.node(field), window)
+
+@feature('bars_since_high')
+def _bars_since_high(g, field='high', window=250):
+    return _apply(rolling_argmax, g.node(field), window)
+
+@feature('bars_since_low')
+def _bars_since_low(g, field='low', window=250):
+    return _apply(rolling_argmin, g.node(field), window)
+
+@feature('ema')
+def _ema(g, field='close', span=12):
+    return g.node(field).ewm(span=span, adjust=False).mean()
+
+@feature('dm')
+def _directional_movement(g):
+    high, low = g.node('high'), g.node('low')
+    up_move = high - high.shift(1)
+    down_move = low.shift(1) - low
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+    return plus_dm, minus_dm
+
+# 指标
+
+@feature('ma')
+def _ma(g, period=20):
+    return g.node('rolling_mean', field='close', window=period)
+
+@feature('atr')
+def _atr(g, period=14):
+    return g.node('rolling_mean', field='tr', window=period)
+
+@feature('bollinger')
+def _bollinger(g, period=20, std_dev=2.0):
+    middle = g.node('rolling_mean', field='close', window=period)
+    std = g.node('rolling_std', field='close', window=period)
+    return middle + std_dev * std, middle, middle - std_dev * std
+
+@feature('donchian')
+def _donchian(g, period=20):
+    upper = g.node('rolling_max', field='high', window=period)
+    lower = g.node('rolling_min', field='low', window=period)
+    return upper, (upper + lower) / 2, lower
+
+@feature('drawdown')
+def _drawdown(g, field='close', window=250):
+    return g.node(field) / g.node('rolling_max', field=field, window=window) - 1
+
+@feature('rsi')
+def _rsi(g, period=14):
+    delta = g.node('delta', field='close')
+    gains = delta.where(delta > 0, 0.0)
+    losses = (-delta).where(delta < 0, 0.0)
+    avg_gains = gains.ewm(alpha=1/period, adjust=False).mean()
+    avg_losses = losses.ewm(alpha=1/period, adjust=False).mean()
+    # 与 MomentumIndicators 一致, 平均跌幅为0时 RS 取0
+    rs = (avg_gains / avg_losses).where(avg_losses != 0, 0.0)
+    return 100 - 100 / (1 + rs)
+
+@feature('macd')
+def _macd(g, fast_period=12, slow_period=26, signal_period=9):
+    line = g.node('ema', field='close', span=fast_period) - g.node('ema', field='close', span=slow_period)
+    signal = line.ewm(span=signal_period, adjust=False).mean()
+    return line, signal, line - signal
+
+@feature('kdj')
+def _kdj(g, n=9, m1=3, m2=3):
+    lowest = g.node('rolling_min', field='low', window=n)
+    highest = g.node('rolling_max', field='high', window=n)
+    rsv = (g.node('close') - lowest) / (highest - lowest) * 100
+    k = rsv.ewm(com=m1-1).mean()
+    d = k.ewm(com=m2-1).mean()
+    return k, d, 3 * k - 2 * d
+
+@feature('adx')
+def _adx(g, period=14, smoothing='simple'):
+    if smoothing != 'simple':
+        # Wilder 平滑是递推的, 交给内核按股票跳过停牌行计算
+        high, low, close = g.node('high'), g.node('low'), g.node('close')
+        results = adx_kernel(high.to_numpy(), low.to_numpy(), close.to_numpy(), period, smoothing)
+        return tuple(_like(close, values) for values in results)
+    plus_dm, minus_dm = g.node('dm')
+    atr = g.node('atr', period=period)
+    plus_di = 100 * plus_dm.rolling(period).mean() / atr
+    minus_di = 100 * minus_dm.rolling(period).mean() / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return dx.rolling(period).mean(), plus_di, minus_di
+
+@feature('supertrend')
+def _supertrend(g, period=10, multiplier=3.0):
+    high, low, close = g.node('high'), g.node('low'), g.node('close')
+    if isinstance(close, pd.Series) and (high.isna() | low.isna() | close.isna()).any():
+        # 单只股票的数据含停牌行时交给内核处理
+        supertrend, direction, _, _ = supertrend_kernel(high, low, close, period, multiplier)
+        return pd.Series(supertrend, index=close.index), pd.Series(direction.astype(int), index=close.index)
+
+    atr = g.node('atr', period=period)
+    supertrend, _, _ = supertrend_bands(
+        ((high + low) / 2 + multiplier * atr).to_numpy(),
+        ((high + low) / 2 - multiplier * atr).to_numpy(),
+        close.to_numpy()
+    )
+    if isinstance(close, pd.Series):
+        supertrend = pd.Series(supertrend, index=close.index)
+        return supertrend, (close > supertrend).astype(int)
+    supertrend = pd.DataFrame(supertrend)
+    return supertrend, (close > supertrend).astype(float)
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from typing import Tuple, Optional
+from .rolling import rolling_max, rolling_min
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -60,9 +61,9 @@ class MomentumIndicators:
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算KDJ"""
         try:
-            rsv = (close - low.rolling(n).min()) / (
-                high.rolling(n).max() - low.rolling(n).min()
-            ) * 100
+            lowest = pd.Series(rolling_min(low.to_numpy(dtype=float), n), index=low.index)
+            highest = pd.Series(rolling_max(high.to_numpy(dtype=float), n), index=high.index)
+            rsv = (close - lowest) / (highest - lowest) * 100
             k = pd.DataFrame(rsv).ewm(com=m1-1).mean()
             d = k.ewm(com=m2-1).mean()
             j = 3 * k - 2 * d
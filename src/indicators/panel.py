@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple, Union
+from .features import FeatureGraph
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ArrayLike = Union[np.ndarray, pd.DataFrame]
+
+class PanelIndicators:
+    """全市场面板指标
+
+    输入为对齐的 (日期 × 股票) 二维数组或 DataFrame, 一次向量化计算全部股票。
+    停牌日(NaN)不参与计算、输出为 NaN, 每一列的结果与对该股票的日线
+    调用 MomentumIndicators / TrendIndicators / VolatilityIndicators 中的对应方法一致。
+    同时需要多个指标时直接使用 FeatureGraph 可以共享中间结果。
+    """
+
+    @staticmethod
+    def calculate_ma(close: ArrayLike, period: int = 20) -> ArrayLike:
+        """计算简单移动平均"""
+        return FeatureGraph(close=close).get('ma', period=period)
+
+    @staticmethod
+    def calculate_ema(close: ArrayLike, span: int = 20) -> ArrayLike:
+        """计算指数移动平均"""
+        return FeatureGraph(close=close).get('ema', span=span)
+
+    @staticmethod
+    def calculate_rsi(close: ArrayLike, period: int = 14) -> ArrayLike:
+        """计算RSI"""
+        return FeatureGraph(close=close).get('rsi', period=period)
+
+    @staticmethod
+    def calculate_macd(
+        close: ArrayLike,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9
+    ) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+        """计算MACD, 返回 (macd, signal, hist)"""
+        return FeatureGraph(close=close).get(
+            'macd', fast_period=fast_period, slow_period=slow_period, signal_period=signal_period
+        )
+
+    @staticmethod
+    def calculate_kdj(
+        high: ArrayLike,
+        low: ArrayLike,
+        close: ArrayLike,
+        n: int = 9,
+        m1: int = 3,
+        m2: int = 3
+    ) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+        """计算KDJ, 返回 (k, d, j)"""
+        return FeatureGraph(high=high, low=low, close=close).get('kdj', n=n, m1=m1, m2=m2)
+
+    @staticmethod
+    def calculate_atr(high: ArrayLike, low: ArrayLike, close: ArrayLike, period: int = 14) -> ArrayLike:
+        """计算ATR"""
+        return FeatureGraph(high=high, low=low, close=close).get('atr', period=period)
+
+    @staticmethod
+    def calculate_bollinger_bands(
+        close: ArrayLike,
+        period: int = 20,
+        std_dev: float = 2.0
+    ) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+        """计算布林带, 返回 (upper, middle, lower)"""
+        return FeatureGraph(close=close).get('bollinger', period=period, std_dev=std_dev)
+
+    @staticmethod
+    def calculate_adx(
+        high: ArrayLike,
+        low: ArrayLike,
+        close: ArrayLike,
+        period: int = 14,
+        smoothing: str = 'simple'
+    ) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+        """计算ADX, 返回 (adx, plus_di, minus_di), smoothing 见 ``TrendIndicators.calculate_adx``"""
+        return FeatureGraph(high=high, low=low, close=close).get('adx', period=period, smoothing=smoothing)
+
+    @staticmethod
+    def calculate_donchian(high: ArrayLike, low: ArrayLike, period: int = 20) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+        """计算唐奇安通道, 返回 (upper, middle, lower)"""
+        return FeatureGraph(high=high, low=low).get('donchian', period=period)
+
+    @staticmethod
+    def calculate_drawdown(close: ArrayLike, window: int = 250) -> ArrayLike:
+        """计算相对最近 window 日最高收盘价的回撤"""
+        return FeatureGraph(close=close).get('drawdown', window=window)
+
+    @staticmethod
+    def calculate_bars_since_high(high: ArrayLike, window: int = 250) -> ArrayLike:
+        """计算最近 window 日内最高价距今的天数"""
+        return FeatureGraph(high=high).get('bars_since_high', window=window)
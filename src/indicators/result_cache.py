@@ -0,0 +1,175 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Optional
+from ..utils.cache import Cache, LRUCache
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Inputs = Dict[str, pd.Series]
+
+def dataset_hash(inputs: Inputs, stop: Optional[int] = None) -> str:
+    """输入序列(含索引)的内容哈希, ``stop`` 给定时只计算前 stop 行"""
+    digest = hashlib.blake2b(digest_size=16)
+    index = None
+    for name in sorted(inputs):
+        series = inputs[name] if stop is None else inputs[name].iloc[:stop]
+        values = series.to_numpy()
+        digest.update(f"{name}:{values.dtype}:{len(values)}".encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+        index = series.index
+    if index is not None:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class IndicatorCache:
+    """内容寻址的指标结果缓存
+
+    结果按 (输入数据的内容哈希, 指标名, 参数, 后端) 寻址, 数据有任何变化
+    (例如 DataLoader 追加了新K线) 都会得到新的键, 旧结果不会被误用。
+    内存层为 LRUCache, 可选的磁盘层为 Cache, 磁盘命中的结果会放回内存层。
+
+    对只依赖最近 ``lookback + 1`` 根K线的窗口类指标, 如果缓存中有同一序列
+    较短版本的结果 (按前缀的内容哈希确认), 只对新增的K线计算并拼接到旧结果后,
+    与全量计算在浮点舍入误差内一致。确认前缀用的谱系记录默认只放在内存层,
+    ``persist_lineage`` 为 True 时也写入磁盘层, 新进程同样可以增量计算,
+    代价是每次未命中多一次磁盘写入。
+    """
+
+    def __init__(
+        self,
+        store: Optional[Cache] = None,
+        memory_budget: int = 64 * 1024 * 1024,
+        persist_lineage: bool = False
+    ):
+        self.memory = LRUCache(memory_budget)
+        self.store = store
+        self.persist_lineage = persist_lineage
+        self.hits = 0
+        self.misses = 0
+        self.tail_updates = 0
+
+    def get_or_compute(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        inputs: Inputs,
+        compute: Callable[[Inputs], Any],
+        lookback: Optional[int] = None,
+        backend: str = ''
+    ) -> Any:
+        """读取缓存的结果, 未命中时计算并写入缓存
+
+        Args:
+            name: 指标名
+            params: 指标参数, 需可 JSON 序列化
+            inputs: 字段名 -> 等长、同索引的输入序列
+            compute: 由输入计算结果 (Series/DataFrame 或它们的元组, 与输入等长)
+            lookback: 每个输出依赖的之前K线数, 窗口类指标为 period-1;
+                None 表示依赖全部历史 (递推类指标), 不做增量计算
+            backend: 计算后端名称, 不同后端的结果分开缓存
+        """
+        signature = f"{name}:{json.dumps(params, sort_keys=True, default=str)}:{backend}"
+        digest = dataset_hash(inputs)
+        key = f"indicator:{signature}:{digest}"
+
+        result = self._get(key)
+        if result is not None:
+            self.hits += 1
+            return _copy(result)
+        self.misses += 1
+
+        n_rows = len(next(iter(inputs.values())))
+        lineage_key = f"indicator_lineage:{signature}:{self._head(inputs)}"
+        result = None
+        if lookback is not None:
+            result = self._extend(lineage_key, inputs, compute, lookback, n_rows)
+        if result is None:
+            result = compute(inputs)
+
+        self._set(key, result)
+        if lookback is not None:
+            lineage = {'rows': n_rows, 'prefix': digest, 'key': key}
+            self._set(lineage_key, lineage, persist=self.persist_lineage)
+        return _copy(result)
+
+    def stats(self) -> Dict[str, int]:
+        """命中/未命中/增量计算次数"""
+        return {'hits': self.hits, 'misses': self.misses, 'tail_updates': self.tail_updates}
+
+    def clear(self):
+        """清空内存层, 磁盘层由 Cache 自己管理"""
+        self.memory.clear()
+
+    def _extend(
+        self,
+        lineage_key: str,
+        inputs: Inputs,
+        compute: Callable[[Inputs], Any],
+        lookback: int,
+        n_rows: int
+    ) -> Any:
+        """在同一序列较短版本的结果后只计算新增的K线, 不满足条件时返回 None"""
+        lineage = self._get(lineage_key, persist=self.persist_lineage)
+        if lineage is None:
+            return None
+        cached_rows = lineage['rows']
+        if not lookback <= cached_rows < n_rows or dataset_hash(inputs, cached_rows) != lineage['prefix']:
+            return None
+        previous = self._get(lineage['key'])
+        if previous is None:
+            return None
+
+        start = cached_rows - lookback
+        tail = compute({field: series.iloc[start:] for field, series in inputs.items()})
+        self.tail_updates += 1
+        self._delete(lineage['key'])
+        return _concat(previous, tail, lookback)
+
+    def _head(self, inputs: Inputs) -> str:
+        """序列的标识: 首行的内容哈希, 前缀是否一致另行校验"""
+        return dataset_hash(inputs, 1)
+
+    def _get(self, key: str, persist: bool = True) -> Any:
+        value = self.memory.get(key)
+        if value is None and persist and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def _set(self, key: str, value: Any, persist: bool = True):
+        self.memory.set(key, value)
+        if persist and self.store is not None:
+            self.store.set(key, value)
+
+    def _delete(self, key: str):
+        self.memory.pop(key)
+        if self.store is not None:
+            self.store.clear(key)
+
+def _concat(previous: Any, tail: Any, lookback: int) -> Any:
+    """旧结果后接上 tail 中去掉前 lookback 行的部分"""
+    if isinstance(previous, tuple):
+        return tuple(_concat(p, t, lookback) for p, t in zip(previous, tail))
+    return pd.concat([previous, tail.iloc[lookback:]])
+
+def _copy(value: Any) -> Any:
+    """返回副本, 调用方修改结果不影响缓存"""
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value.copy()
+
+# 默认只用内存层, 需要跨进程复用时设置带磁盘层的缓存
+_active: Optional[IndicatorCache] = IndicatorCache()
+
+def get_indicator_cache() -> Optional[IndicatorCache]:
+    """TechnicalIndicators 使用的缓存, None 表示不缓存"""
+    return _active
+
+def set_indicator_cache(cache: Optional[IndicatorCache]):
+    """设置 TechnicalIndicators 使用的缓存, 传入 None 关闭缓存"""
+    global _active
+    _active = cache
@@ -0,0 +1,153 @@
+import numpy as np
+from typing import Sequence, Tuple
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 每次处理的元素数上限, 控制分块计算的临时内存
+CHUNK_ELEMENTS = 1 << 20
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动最大值, 与 ``rolling(window).max()`` 一致
+
+    一维数组或 (日期 × 股票) 二维数组, 沿第0轴计算。窗口内有 NaN 或不足
+    ``window`` 个值时结果为 NaN。无论窗口多大, 每个元素只做常数次比较。
+    """
+    return _rolling_extreme(values, window, 'max', with_index=False)[0]
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动最小值, 与 ``rolling(window).min()`` 一致"""
+    return _rolling_extreme(values, window, 'min', with_index=False)[0]
+
+def rolling_argmax(values: np.ndarray, window: int) -> np.ndarray:
+    """窗口内最高值距今的K线数, 0 表示当天即为最高; 有并列时取最近的一次"""
+    return _rolling_extreme(values, window, 'max', with_index=True)[1]
+
+def rolling_argmin(values: np.ndarray, window: int) -> np.ndarray:
+    """窗口内最低值距今的K线数, 0 表示当天即为最低; 有并列时取最近的一次"""
+    return _rolling_extreme(values, window, 'min', with_index=True)[1]
+
+def rolling_drawdown(values: np.ndarray, window: int) -> np.ndarray:
+    """相对最近 ``window`` 根K线最高值的回撤, 0 表示处于窗口新高"""
+    values = _as_float(values)
+    return values / rolling_max(values, window) - 1
+
+def rolling_mean_matrix(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """一维序列在多个窗口上的滚动均值, 返回 (窗口数 × 时间) 矩阵
+
+    所有窗口共用一次累加和, 每个窗口只做一次相减, 与逐个 ``rolling(w).mean()``
+    相比没有重复的窗口求和。窗口内有 NaN 或不足 w 个值时为 NaN。累加前减去
+    序列首个有效值以减小累加和的量级, 与 pandas 的结果只在舍入误差内不同。
+    """
+    windows = np.asarray(windows, dtype=np.int64)
+    if windows.size and windows.min() <= 0:
+        raise ValueError("窗口必须为正整数")
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    missing = np.isnan(values)
+    offset = values[~missing][0] if (~missing).any() else 0.0
+
+    total = np.zeros(n + 1)
+    np.cumsum(np.where(missing, 0.0, values - offset), out=total[1:])
+    gaps = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(missing, out=gaps[1:])
+
+    result = np.full((len(windows), n), np.nan)
+    for row, window in enumerate(windows):
+        if window > n:
+            continue
+        end = np.arange(window, n + 1)
+        means = (total[end] - total[end - window]) / window + offset
+        result[row, window - 1:] = np.where(gaps[end] == gaps[end - window], means, np.nan)
+    return result
+
+def _as_float(values: np.ndarray) -> np.ndarray:
+    """float32 输入保持 float32 (极值计算没有舍入误差), 其余转为 float64"""
+    values = np.asarray(values)
+    return values if values.dtype == np.float32 else values.astype(np.float64)
+
+def _rolling_extreme(
+    values: np.ndarray,
+    window: int,
+    mode: str,
+    with_index: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    if window <= 0:
+        raise ValueError("窗口必须为正整数")
+    values = _as_float(values)
+    one_dim = values.ndim == 1
+    if one_dim:
+        values = values[:, None]
+    n_rows, n_cols = values.shape
+
+    extreme = np.full((n_rows, n_cols), np.nan, dtype=values.dtype)
+    since = np.full((n_rows, n_cols), np.nan) if with_index else None
+    if n_rows >= window:
+        step = max(1, CHUNK_ELEMENTS // max(n_rows, 1))
+        for start in range(0, n_cols, step):
+            cols = slice(start, start + step)
+            ext, idx = _van_herk(values[:, cols], window, mode, with_index)
+            extreme[window - 1:, cols] = ext
+            if with_index:
+                since[window - 1:, cols] = np.arange(window - 1, n_rows)[:, None] - idx
+
+    if one_dim:
+        extreme = extreme[:, 0]
+        since = since[:, 0] if with_index else None
+    return extreme, since
+
+def _van_herk(values: np.ndarray, window: int, mode: str, with_index: bool):
+    """van Herk/Gil-Werman 算法
+
+    按窗口长度分块, 块内分别做前缀和后缀极值, 任一窗口的极值是
+    起点所在块的后缀极值与终点所在块的前缀极值中的较大者。
+    """
+    n_rows, n_cols = values.shape
+    nan_mask = np.isnan(values)
+    has_gaps = nan_mask.any()
+    # 统一按最大值处理, 最小值取相反数
+    x = values if mode == 'max' else -values
+    if has_gaps:
+        x = np.where(nan_mask, -np.inf, x)
+
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), -np.inf, dtype=values.dtype)
+    padded[:n_rows] = x
+    blocks = padded.reshape(n_blocks, window, n_cols)
+    prefix = np.maximum.accumulate(blocks, axis=1)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+
+    n_out = n_rows - window + 1
+    prefix_flat = prefix.reshape(-1, n_cols)[window - 1:n_rows]
+    suffix_flat = suffix.reshape(-1, n_cols)[:n_out]
+    extreme = np.maximum(suffix_flat, prefix_flat)
+
+    index = None
+    if with_index:
+        position = np.arange(n_blocks * window).reshape(n_blocks, window, 1)
+        # 前缀: 最近一次达到前缀最大值的位置
+        prefix_index = np.maximum.accumulate(np.where(blocks == prefix, position, -1), axis=1)
+        # 后缀: 从右往左扫描时最后一次严格创新高的位置, 即最大值最靠右的位置
+        reversed_blocks = blocks[:, ::-1]
+        previous = np.concatenate(
+            [np.full((n_blocks, 1, n_cols), -np.inf), suffix[:, ::-1][:, :-1]],
+            axis=1
+        )
+        big = n_blocks * window
+        suffix_index = np.minimum.accumulate(
+            np.where(reversed_blocks > previous, position[:, ::-1], big), axis=1
+        )[:, ::-1]
+        prefix_index = prefix_index.reshape(-1, n_cols)[window - 1:n_rows]
+        suffix_index = suffix_index.reshape(-1, n_cols)[:n_out]
+        index = np.where(prefix_flat >= suffix_flat, prefix_index, suffix_index).astype(np.float64)
+
+    if mode == 'min':
+        extreme = -extreme
+    if has_gaps:
+        # 窗口内有 NaN 时与 pandas 一致输出 NaN
+        nan_count = np.concatenate([np.zeros((1, n_cols), dtype=np.int64), np.cumsum(nan_mask, axis=0)])
+        has_nan = (nan_count[window:] - nan_count[:n_out]) > 0
+        extreme[has_nan] = np.nan
+        if with_index:
+            index[has_nan] = np.nan
+    return extreme, index
@@ -0,0 +1,425 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NAN = float('nan')
+
+class StreamingIndicator(ABC):
+    """增量指标基类
+
+    每根新K线调用一次 ``update``, 计算量与历史长度无关。数值运算的顺序与
+    pandas 的 rolling/ewm 实现相同, 因此对同一段数据逐根更新的结果与
+    ``src/indicators`` 中的批量函数逐位一致(RollingStd 除外, 见其说明)。
+
+    ``snapshot()`` 返回只含基本类型的状态字典(可直接 JSON 序列化),
+    ``restore()`` 用它恢复到快照时的状态, 用于收盘后保存、次日继续增量计算。
+    """
+
+    @abstractmethod
+    def update(self, bar: Any) -> Any:
+        """输入一根新K线, 返回最新的指标值"""
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """保存当前状态"""
+        state = {}
+        for name, value in self.__dict__.items():
+            if isinstance(value, StreamingIndicator):
+                value = value.snapshot()
+            elif isinstance(value, deque):
+                value = [list(item) if isinstance(item, tuple) else item for item in value]
+            state[name] = value
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> 'StreamingIndicator':
+        """从快照恢复状态"""
+        for name, value in state.items():
+            current = self.__dict__.get(name)
+            if isinstance(current, StreamingIndicator):
+                current.restore(value)
+                continue
+            if isinstance(current, deque):
+                value = deque((tuple(item) if isinstance(item, list) else item for item in value), current.maxlen)
+            self.__dict__[name] = value
+        return self
+
+def _hlc(bar: Any) -> Tuple[float, float, float]:
+    """从K线(字典、Series 或 (high, low, close) 元组)中取最高价、最低价、收盘价"""
+    if isinstance(bar, tuple):
+        high, low, close = bar
+    else:
+        high = bar['High'] if 'High' in bar else bar['high']
+        low = bar['Low'] if 'Low' in bar else bar['low']
+        close = bar['Close'] if 'Close' in bar else bar['close']
+    return float(high), float(low), float(close)
+
+class RollingMean(StreamingIndicator):
+    """滚动均值, 与 ``Series.rolling(window).mean()`` 一致
+
+    与 pandas 相同, 采用 Kahan 补偿求和, 窗口移出和移入分别累计补偿项。
+    """
+
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("窗口必须为正整数")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NAN
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        if len(self.values) == 0 or self.window == 1:
+            # pandas 在第一个窗口(以及窗口不重叠时)从头累加
+            self.nobs = self.neg_ct = 0
+            self.sum_x = self.compensation_add = self.compensation_remove = 0.0
+            self.num_consecutive_same_value = 0
+            self.prev_value = value
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.nobs < self.window or self.nobs == 0:
+            return NAN
+        result = self.sum_x / self.nobs
+        if self.num_consecutive_same_value >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def _add(self, value: float):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        if value == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = value
+
+    def _remove(self, value: float):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+class RollingStd(StreamingIndicator):
+    """滚动标准差, 与 ``Series.rolling(window).std(ddof)`` 一致
+
+    Welford 在线算法, 移入时更新均值和离差平方和, 移出时反向更新。
+    pandas 在窗口内离差平方和因抵消变为负数等情况下另有修正, 这里没有逐位复现,
+    两者的差异在浮点舍入误差量级(相对误差约 1e-12)。
+    """
+
+    def __init__(self, window: int, ddof: int = 1):
+        if window <= 0:
+            raise ValueError("窗口必须为正整数")
+        self.window = window
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NAN
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        if len(self.values) == 0 or self.window == 1:
+            self.nobs = 0
+            self.mean_x = self.ssqdm_x = 0.0
+            self.compensation_add = self.compensation_remove = 0.0
+            self.num_consecutive_same_value = 0
+            self.prev_value = value
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def variance(self) -> float:
+        if self.nobs < self.window or self.nobs <= self.ddof:
+            return NAN
+        if self.nobs == 1 or self.num_consecutive_same_value >= self.nobs:
+            return 0.0
+        return self.ssqdm_x / (self.nobs - self.ddof)
+
+    @property
+    def value(self) -> float:
+        variance = self.variance
+        if variance != variance:
+            return NAN
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def _add(self, value: float):
+        if value != value:
+            return
+        if value == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = value
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation_add
+        y = value - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (value - prev_mean) * (value - self.mean_x)
+
+    def _remove(self, value: float):
+        if value != value:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = value - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (value - prev_mean) * (value - self.mean_x)
+        else:
+            self.mean_x = self.ssqdm_x = 0.0
+
+class RollingExtreme(StreamingIndicator):
+    """滚动最大值/最小值, 单调队列, 与 ``rolling(window).max()/min()`` 一致"""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        if window <= 0:
+            raise ValueError("窗口必须为正整数")
+        if mode not in ('max', 'min'):
+            raise ValueError("mode 必须为 'max' 或 'min'")
+        self.window = window
+        self.mode = mode
+        # (序号, 数值), 数值单调, 队首为窗口内的极值
+        self.candidates = deque()
+        self.observed = deque(maxlen=window)
+        self.nobs = 0
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        if self.count >= self.window and self.candidates and self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        if len(self.observed) == self.window:
+            self.nobs -= self.observed[0]
+        self.observed.append(value == value)
+        self.nobs += value == value
+        if value == value:
+            if self.mode == 'max':
+                while self.candidates and self.candidates[-1][1] <= value:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] >= value:
+                    self.candidates.pop()
+            self.candidates.append((self.count, value))
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.nobs < self.window or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+class EWM(StreamingIndicator):
+    """指数加权均值, 与 ``Series.ewm(...).mean()`` 一致
+
+    com/span/alpha 三选一, 与 pandas 一样先换算为 com 再得到平滑系数。
+    """
+
+    def __init__(
+        self,
+        com: Optional[float] = None,
+        span: Optional[float] = None,
+        alpha: Optional[float] = None,
+        adjust: bool = True,
+        ignore_na: bool = False
+    ):
+        if sum(x is not None for x in (com, span, alpha)) != 1:
+            raise ValueError("com、span、alpha 必须且只能指定一个")
+        if span is not None:
+            com = (span - 1) / 2
+        elif alpha is not None:
+            com = (1 - alpha) / alpha
+        if com < 0:
+            raise ValueError("平滑参数无效")
+        alpha = 1.0 / (1.0 + float(com))
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.ignore_na = ignore_na
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def update(self, value: float) -> float:
+        cur = float(value)
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                if is_observation or not self.ignore_na:
+                    self.old_wt *= self.old_wt_factor
+                    if is_observation:
+                        if self.weighted != cur:
+                            self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                            self.weighted /= self.old_wt + self.new_wt
+                        if self.adjust:
+                            self.old_wt += self.new_wt
+                        else:
+                            self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = cur
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.weighted if self.nobs >= 1 else NAN
+
+class EMA(EWM):
+    """指数移动平均, 与 ``ewm(span=span, adjust=False).mean()`` 一致"""
+
+    def __init__(self, span: int = 12):
+        super().__init__(span=span, adjust=False)
+
+class RSI(StreamingIndicator):
+    """Wilder RSI, 与 ``MomentumIndicators.calculate_rsi`` 一致"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.avg_gains = EWM(alpha=1/period, adjust=False)
+        self.avg_losses = EWM(alpha=1/period, adjust=False)
+        self.prev_close = NAN
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        delta = close - self.prev_close
+        self.prev_close = close
+        avg_gains = self.avg_gains.update(delta if delta > 0 else 0.0)
+        avg_losses = self.avg_losses.update(-delta if delta < 0 else 0.0)
+        rs = avg_gains / avg_losses if avg_losses != 0 else 0.0
+        return 100 - 100 / (1 + rs)
+
+class MACD(StreamingIndicator):
+    """MACD, 与 ``MomentumIndicators.calculate_macd`` 一致, 返回 (macd, signal, hist)"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast = EMA(fast_period)
+        self.slow = EMA(slow_period)
+        self.signal = EMA(signal_period)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+class TrueRange(StreamingIndicator):
+    """真实波幅, 第一根K线为最高价减最低价"""
+
+    def __init__(self):
+        self.prev_close = NAN
+
+    def update(self, bar: Any) -> float:
+        high, low, close = _hlc(bar)
+        ranges = [r for r in (high - low, abs(high - self.prev_close), abs(low - self.prev_close)) if r == r]
+        self.prev_close = close
+        return max(ranges) if ranges else NAN
+
+class ATR(StreamingIndicator):
+    """ATR, 与 ``VolatilityIndicators.calculate_atr`` 一致"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.mean = RollingMean(period)
+
+    def update(self, bar: Any) -> float:
+        return self.mean.update(self.true_range.update(bar))
+
+class KDJ(StreamingIndicator):
+    """KDJ, 与 ``MomentumIndicators.calculate_kdj`` 一致, 返回 (k, d, j)"""
+
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        self.lowest = RollingExtreme(n, 'min')
+        self.highest = RollingExtreme(n, 'max')
+        self.k = EWM(com=m1 - 1)
+        self.d = EWM(com=m2 - 1)
+
+    def update(self, bar: Any) -> Tuple[float, float, float]:
+        high, low, close = _hlc(bar)
+        lowest = self.lowest.update(low)
+        highest = self.highest.update(high)
+        rsv = _divide(close - lowest, highest - lowest) * 100
+        k = self.k.update(rsv)
+        d = self.d.update(k)
+        return k, d, 3 * k - 2 * d
+
+class ADX(StreamingIndicator):
+    """ADX, 与 ``TrendIndicators.calculate_adx`` 一致, 返回 (adx, plus_di, minus_di)"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.tr_mean = RollingMean(period)
+        self.plus_dm_mean = RollingMean(period)
+        self.minus_dm_mean = RollingMean(period)
+        self.dx_mean = RollingMean(period)
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+    def update(self, bar: Any) -> Tuple[float, float, float]:
+        high, low, _ = _hlc(bar)
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        tr = self.tr_mean.update(self.true_range.update(bar))
+        plus_di = _divide(100 * self.plus_dm_mean.update(plus_dm), tr)
+        minus_di = _divide(100 * self.minus_dm_mean.update(minus_dm), tr)
+        dx = _divide(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        return self.dx_mean.update(dx), plus_di, minus_di
+
+def _divide(a: float, b: float) -> float:
+    """按 numpy 的规则处理除以零"""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
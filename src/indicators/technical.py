@@ -1,22 +1,32 @@
 import numpy as np
 import pandas as pd
-import talib
-from typing import Tuple, Optional
+from typing import Any, Callable, Dict, Tuple, Optional
+from .backends import get_backend
+from .result_cache import get_indicator_cache
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class TechnicalIndicators:
-    """技术分析指标"""
+    """技术分析指标
+
+    按 TA-Lib 的定义计算, 安装了 TA-Lib 时可由它计算, 否则使用 NumPy 后端,
+    见 ``backends.get_backend`` / ``backends.set_backend``。结果按输入内容缓存,
+    见 ``result_cache.set_indicator_cache``。
+    """
     
     @staticmethod
     def calculate_ma(close: pd.Series, periods: list = [5, 10, 20, 60]) -> pd.DataFrame:
         """计算多周期移动平均"""
         try:
-            ma_dict = {}
-            for period in periods:
-                ma_dict[f'MA{period}'] = talib.MA(close, timeperiod=period)
-            return pd.DataFrame(ma_dict)
+            def compute(inputs):
+                backend = get_backend()
+                values = _values(inputs['close'])
+                ma_dict = {}
+                for period in periods:
+                    ma_dict[f'MA{period}'] = backend.sma(values, period)
+                return pd.DataFrame(ma_dict, index=inputs['close'].index)
+            return _cached('ma', {'periods': list(periods)}, {'close': close}, compute, max(periods) - 1)
         except Exception as e:
             logger.error(f"MA计算失败: {str(e)}")
             return pd.DataFrame()
@@ -29,13 +39,16 @@ class TechnicalIndicators:
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算布林带"""
         try:
-            upper, middle, lower = talib.BBANDS(
-                close,
-                timeperiod=period,
-                nbdevup=std_dev,
-                nbdevdn=std_dev
-            )
-            return upper, middle, lower
+            def compute(inputs):
+                index = inputs['close'].index
+                upper, middle, lower = get_backend().bbands(_values(inputs['close']), period, std_dev, std_dev)
+                return (
+                    pd.Series(upper, index=index),
+                    pd.Series(middle, index=index),
+                    pd.Series(lower, index=index)
+                )
+            params = {'period': period, 'std_dev': std_dev}
+            return _cached('bbands', params, {'close': close}, compute, period - 1)
         except Exception as e:
             logger.error(f"布林带计算失败: {str(e)}")
             return pd.Series(), pd.Series(), pd.Series()
@@ -49,14 +62,19 @@ class TechnicalIndicators:
     ) -> pd.DataFrame:
         """计算成交量指标"""
         try:
-            indicators = {}
-            # OBV - On Balance Volume
-            indicators['OBV'] = talib.OBV(close, volume)
-            # AD - Chaikin A/D Line
-            indicators['AD'] = talib.AD(high, low, close, volume)
-            # CMF - Chaikin Money Flow
-            indicators['CMF'] = talib.ADOSC(high, low, close, volume)
-            return pd.DataFrame(indicators)
+            def compute(inputs):
+                backend = get_backend()
+                close, volume, high, low = (_values(inputs[field]) for field in ('close', 'volume', 'high', 'low'))
+                indicators = {}
+                # OBV - On Balance Volume
+                indicators['OBV'] = backend.obv(close, volume)
+                # AD - Chaikin A/D Line
+                indicators['AD'] = backend.ad(high, low, close, volume)
+                # CMF - Chaikin Money Flow
+                indicators['CMF'] = backend.adosc(high, low, close, volume)
+                return pd.DataFrame(indicators, index=inputs['close'].index)
+            inputs = {'close': close, 'volume': volume, 'high': high, 'low': low}
+            return _cached('volume_indicators', {}, inputs, compute)
         except Exception as e:
             logger.error(f"成交量指标计算失败: {str(e)}")
             return pd.DataFrame()
@@ -69,14 +87,35 @@ class TechnicalIndicators:
     ) -> pd.DataFrame:
         """计算趋势指标"""
         try:
-            indicators = {}
-            # ADX - Average Directional Index
-            indicators['ADX'] = talib.ADX(high, low, close, timeperiod=14)
-            # CCI - Commodity Channel Index
-            indicators['CCI'] = talib.CCI(high, low, close, timeperiod=14)
-            # DX - Directional Movement Index
-            indicators['DX'] = talib.DX(high, low, close, timeperiod=14)
-            return pd.DataFrame(indicators)
+            def compute(inputs):
+                backend = get_backend()
+                close, high, low = (_values(inputs[field]) for field in ('close', 'high', 'low'))
+                indicators = {}
+                # ADX - Average Directional Index
+                indicators['ADX'] = backend.adx(high, low, close, 14)
+                # CCI - Commodity Channel Index
+                indicators['CCI'] = backend.cci(high, low, close, 14)
+                # DX - Directional Movement Index
+                indicators['DX'] = backend.dx(high, low, close, 14)
+                return pd.DataFrame(indicators, index=inputs['close'].index)
+            return _cached('trend_indicators', {}, {'close': close, 'high': high, 'low': low}, compute)
         except Exception as e:
             logger.error(f"趋势指标计算失败: {str(e)}")
-            return pd.DataFrame() 
\ No newline at end of file
+            return pd.DataFrame()
+
+def _cached(
+    name: str,
+    params: Dict[str, Any],
+    inputs: Dict[str, pd.Series],
+    compute: Callable,
+    lookback: Optional[int] = None
+) -> Any:
+    """经过结果缓存计算, 未设置缓存时直接计算"""
+    cache = get_indicator_cache()
+    if cache is None:
+        return compute(inputs)
+    return cache.get_or_compute(name, params, inputs, compute, lookback, get_backend().name)
+
+def _values(series: pd.Series) -> np.ndarray:
+    """后端的输入: 连续的 float64 数组"""
+    return np.ascontiguousarray(series, dtype=np.float64)
@@ -1,43 +1,43 @@
 import pandas as pd
 import numpy as np
 from typing import Tuple, Optional
+from .base import pack_valid, unpack
+from .rolling import rolling_max, rolling_min
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# TA-Lib 判断除数为零的阈值 (TA_IS_ZERO)
+EPSILON = 1e-8
+
+ADX_SMOOTHING = ('simple', 'wilder')
+
 class TrendIndicators:
     """趋势指标"""
     
     @staticmethod
-    def calculate_adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> Tuple[pd.Series, pd.Series, pd.Series]:
-        """计算ADX指标"""
+    def calculate_adx(
+        high: pd.Series,
+        low: pd.Series,
+        close: pd.Series,
+        period: int = 14,
+        smoothing: str = 'simple'
+    ) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """计算ADX指标, 返回 (adx, plus_di, minus_di)
+
+        smoothing 为 ``simple`` 时 DM/TR/DX 取简单移动平均, ``wilder`` 时按
+        TA-Lib 的 Wilder 平滑计算, 见 :func:`adx_kernel`。
+        """
         try:
-            # 计算方向移动
-            up_move = high - high.shift(1)
-            down_move = low.shift(1) - low
-            
-            plus_dm = pd.Series(0, index=up_move.index)
-            plus_dm[(up_move > down_move) & (up_move > 0)] = up_move
-            
-            minus_dm = pd.Series(0, index=down_move.index)
-            minus_dm[(down_move > up_move) & (down_move > 0)] = down_move
-            
-            # 计算TR
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            
-            # 计算方向指标
-            plus_di = 100 * plus_dm.rolling(period).mean() / tr.rolling(period).mean()
-            minus_di = 100 * minus_dm.rolling(period).mean() / tr.rolling(period).mean()
-            
-            # 计算ADX
-            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-            adx = dx.rolling(period).mean()
-            
-            return adx, plus_di, minus_di
-            
+            adx, plus_di, minus_di = adx_kernel(
+                high.to_numpy(dtype=float), low.to_numpy(dtype=float), close.to_numpy(dtype=float),
+                period, smoothing
+            )
+            return (
+                pd.Series(adx, index=close.index),
+                pd.Series(plus_di, index=close.index),
+                pd.Series(minus_di, index=close.index)
+            )
         except Exception as e:
             logger.error(f"ADX计算失败: {str(e)}")
             return pd.Series(), pd.Series(), pd.Series()
@@ -46,55 +46,308 @@ class TrendIndicators:
     def calculate_supertrend(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 10, multiplier: float = 3.0) -> Tuple[pd.Series, pd.Series]:
         """计算SuperTrend指标"""
         try:
-            # 计算ATR
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(period).mean()
-            
-            # 计算基础上下轨
-            basic_upper = (high + low) / 2 + multiplier * atr
-            basic_lower = (high + low) / 2 - multiplier * atr
-            
-            # 计算最终上下轨
-            final_upper = pd.Series(index=close.index)
-            final_lower = pd.Series(index=close.index)
-            
-            for i in range(len(close)):
-                if i == 0:
-                    final_upper.iloc[i] = basic_upper.iloc[i]
-                    final_lower.iloc[i] = basic_lower.iloc[i]
-                else:
-                    final_upper.iloc[i] = (
-                        basic_upper.iloc[i] 
-                        if (basic_upper.iloc[i] < final_upper.iloc[i-1] or close.iloc[i-1] > final_upper.iloc[i-1])
-                        else final_upper.iloc[i-1]
-                    )
-                    final_lower.iloc[i] = (
-                        basic_lower.iloc[i]
-                        if (basic_lower.iloc[i] > final_lower.iloc[i-1] or close.iloc[i-1] < final_lower.iloc[i-1])
-                        else final_lower.iloc[i-1]
-                    )
-            
-            # 计算SuperTrend
-            supertrend = pd.Series(index=close.index)
-            for i in range(len(close)):
-                if i == 0:
-                    supertrend.iloc[i] = final_upper.iloc[i]
-                else:
-                    supertrend.iloc[i] = (
-                        final_upper.iloc[i]
-                        if (supertrend.iloc[i-1] == final_upper.iloc[i-1] and close.iloc[i] <= final_upper.iloc[i])
-                        else (final_lower.iloc[i]
-                             if (supertrend.iloc[i-1] == final_upper.iloc[i-1] and close.iloc[i] > final_upper.iloc[i])
-                             else (final_lower.iloc[i]
-                                  if (supertrend.iloc[i-1] == final_lower.iloc[i-1] and close.iloc[i] >= final_lower.iloc[i])
-                                  else final_upper.iloc[i]))
-                    )
-            
-            return supertrend, pd.Series(close > supertrend).astype(int)
+            supertrend, direction, _, _ = supertrend_kernel(
+                high.to_numpy(dtype=float), low.to_numpy(dtype=float), close.to_numpy(dtype=float),
+                period, multiplier
+            )
+            return pd.Series(supertrend, index=close.index), pd.Series(direction.astype(int), index=close.index)
             
         except Exception as e:
             logger.error(f"SuperTrend计算失败: {str(e)}")
-            return pd.Series(), pd.Series() 
\ No newline at end of file
+            return pd.Series(), pd.Series()
+
+    @staticmethod
+    def calculate_donchian(high: pd.Series, low: pd.Series, period: int = 20) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """计算唐奇安通道, 返回 (上轨, 中轨, 下轨)"""
+        try:
+            upper = pd.Series(rolling_max(high.to_numpy(dtype=float), period), index=high.index)
+            lower = pd.Series(rolling_min(low.to_numpy(dtype=float), period), index=low.index)
+            return upper, (upper + lower) / 2, lower
+        except Exception as e:
+            logger.error(f"唐奇安通道计算失败: {str(e)}")
+            return pd.Series(), pd.Series(), pd.Series()
+
+def _true_range_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """真实波幅的简单移动平均, 输入为已去除 NaN 的一维或二维数组"""
+    prev_close = np.full_like(close, np.nan)
+    prev_close[1:] = close[:-1]
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    frame = pd.DataFrame(tr) if tr.ndim == 2 else pd.Series(tr)
+    return frame.rolling(period).mean().to_numpy()
+
+def supertrend_bands(
+    basic_upper: np.ndarray,
+    basic_lower: np.ndarray,
+    close: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """由基础上下轨递推最终上下轨和SuperTrend
+
+    输入不能含停牌行: 一维数组只允许开头ATR尚未有值的 NaN,
+    二维 (日期 × 股票) 数组须先用 ``pack_valid`` 把停牌行移到各列末尾。
+
+    Returns:
+        (supertrend, final_upper, final_lower)
+    """
+    if np.ndim(close) == 2:
+        return _supertrend_bands_panel(basic_upper, basic_lower, close)
+
+    basic_upper = np.asarray(basic_upper, dtype=np.float64).tolist()
+    basic_lower = np.asarray(basic_lower, dtype=np.float64).tolist()
+    c = np.asarray(close, dtype=np.float64).tolist()
+    n = len(c)
+    st_out = [np.nan] * n
+    upper_out = list(basic_upper)
+    lower_out = list(basic_lower)
+    # 纯Python浮点运算比逐元素访问numpy数组快一个数量级
+    prev_upper = prev_lower = prev_st = float('nan')
+    for i in range(n):
+        upper, lower = basic_upper[i], basic_lower[i]
+        if upper != upper:
+            continue
+        if prev_upper != prev_upper:
+            # ATR首次有值
+            st = upper
+        else:
+            if not (upper < prev_upper or c[i - 1] > prev_upper):
+                upper = prev_upper
+            if not (lower > prev_lower or c[i - 1] < prev_lower):
+                lower = prev_lower
+            if prev_st == prev_upper:
+                st = upper if c[i] <= upper else lower
+            else:
+                st = lower if c[i] >= lower else upper
+        upper_out[i] = prev_upper = upper
+        lower_out[i] = prev_lower = lower
+        st_out[i] = prev_st = st
+    return np.array(st_out), np.array(upper_out), np.array(lower_out)
+
+def _supertrend_bands_panel(
+    basic_upper: np.ndarray,
+    basic_lower: np.ndarray,
+    close: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """逐根K线递推, 每一步在全部股票上向量化"""
+    basic_upper = np.asarray(basic_upper, dtype=np.float64)
+    basic_lower = np.asarray(basic_lower, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    supertrend = np.full_like(c, np.nan)
+    final_upper = basic_upper.copy()
+    final_lower = basic_lower.copy()
+    prev_upper = np.full(c.shape[1], np.nan)
+    prev_lower = prev_upper.copy()
+    prev_st = prev_upper.copy()
+    prev_close = prev_upper.copy()
+    with np.errstate(invalid='ignore'):
+        for t in range(len(c)):
+            upper, lower = basic_upper[t], basic_lower[t]
+            ready = ~np.isnan(upper)
+            first = np.isnan(prev_upper)
+            if not ready.any() and not first.all():
+                # 之后只剩各列末尾的停牌行
+                break
+            upper = np.where(first | (upper < prev_upper) | (prev_close > prev_upper), upper, prev_upper)
+            lower = np.where(first | (lower > prev_lower) | (prev_close < prev_lower), lower, prev_lower)
+            st = np.where(
+                prev_st == prev_upper,
+                np.where(c[t] <= upper, upper, lower),
+                np.where(c[t] >= lower, lower, upper)
+            )
+            st = np.where(first, upper, st)
+            final_upper[t] = prev_upper = np.where(ready, upper, prev_upper)
+            final_lower[t] = prev_lower = np.where(ready, lower, prev_lower)
+            supertrend[t] = prev_st = np.where(ready, st, prev_st)
+            prev_close = c[t]
+
+    final_upper[np.isnan(basic_upper)] = np.nan
+    final_lower[np.isnan(basic_lower)] = np.nan
+    supertrend[np.isnan(basic_upper)] = np.nan
+    return supertrend, final_upper, final_lower
+
+def supertrend_kernel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 10,
+    multiplier: float = 3.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """单只股票的SuperTrend, 对原始数组单次遍历
+
+    ATR为最近 ``period`` 根K线真实波幅的简单平均, 在ATR首次有值的K线上
+    以基础上下轨初始化最终上下轨。含 NaN 的K线(停牌)输出 NaN, 不参与递推。
+
+    Returns:
+        (supertrend, direction, final_upper, final_lower), direction 为 1 表示收盘价在SuperTrend之上
+    """
+    if period <= 0:
+        raise ValueError("周期必须为正整数")
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    index = np.flatnonzero(~(np.isnan(high) | np.isnan(low) | np.isnan(close)))
+    h, l, c = high[index], low[index], close[index]
+    atr = _true_range_atr(h, l, c, period)
+    bands = supertrend_bands((h + l) / 2 + multiplier * atr, (h + l) / 2 - multiplier * atr, c)
+
+    supertrend, final_upper, final_lower = (np.full(len(close), np.nan) for _ in range(3))
+    for out, values in zip((supertrend, final_upper, final_lower), bands):
+        out[index] = values
+    direction = (close > supertrend).astype(np.int8)
+    return supertrend, direction, final_upper, final_lower
+
+def supertrend_panel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 10,
+    multiplier: float = 3.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """多只股票的SuperTrend, 输入为 (日期 × 股票) 的二维数组
+
+    停牌的K线先被移到各列末尾, 之后逐根K线递推, 每一步在全部股票上向量化;
+    每一列的结果与对该股票单独调用 :func:`supertrend_kernel` 相同。
+    (股票 × 日期) 排列的数据传入其转置视图 ``arr.T`` 即可, 不会复制。
+    """
+    if period <= 0:
+        raise ValueError("周期必须为正整数")
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    valid, (h, l, c) = pack_valid(high, low, close)
+    atr = _true_range_atr(h, l, c, period)
+    bands = supertrend_bands((h + l) / 2 + multiplier * atr, (h + l) / 2 - multiplier * atr, c)
+    supertrend, final_upper, final_lower = (unpack(valid, values) for values in bands)
+    direction = (close > supertrend).astype(np.int8)
+    return supertrend, direction, final_upper, final_lower
+
+def adx_kernel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 14,
+    smoothing: str = 'simple'
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ADX/DI, 输入为一维数组或 (日期 × 股票) 二维数组
+
+    - ``simple``: +DM/-DM/TR 取 ``period`` 日简单平均得到 DI, DX 再取简单平均;
+      第一根K线的TR为当日振幅。
+    - ``wilder``: 与 TA-Lib 的 ADX/PLUS_DI/MINUS_DI 一致, 前 period-1 根求和后按
+      ``s = s - s/n + x`` 平滑, ADX 以前 period 个 DX 的均值起算。
+
+    含 NaN 的K线(停牌)不参与计算、输出 NaN, 二维输入的每一列与对该股票单独计算相同。
+
+    Returns:
+        (adx, plus_di, minus_di)
+    """
+    if period <= 0:
+        raise ValueError("周期必须为正整数")
+    if smoothing not in ADX_SMOOTHING:
+        raise ValueError(f"未知的平滑方式: {smoothing}")
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    one_dim = close.ndim == 1
+    if one_dim:
+        high, low, close = high[:, None], low[:, None], close[:, None]
+
+    valid = None
+    if np.isnan(high).any() or np.isnan(low).any() or np.isnan(close).any():
+        valid, (high, low, close) = pack_valid(high, low, close)
+    if smoothing == 'simple':
+        results = _simple_adx(high, low, close, period)
+    else:
+        results = wilder_adx(high, low, close, period)[:3]
+    if valid is not None:
+        results = tuple(unpack(valid, values) for values in results)
+    if one_dim:
+        results = tuple(values[:, 0] for values in results)
+    return results
+
+def _directional_movement(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(日期 × 股票) 的 +DM、-DM 和 TR, 第一行 DM 为0、TR 为当日振幅"""
+    up = np.zeros_like(high)
+    down = np.zeros_like(low)
+    np.subtract(high[1:], high[:-1], out=up[1:])
+    np.subtract(low[:-1], low[1:], out=down[1:])
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    # up 不再使用, 作为 |最高/最低 - 前收| 的缓冲区
+    tr = np.subtract(high, low)
+    gap = up
+    for prev in (high, low):
+        np.subtract(prev[1:], close[:-1], out=gap[1:])
+        np.abs(gap[1:], out=gap[1:])
+        np.fmax(tr[1:], gap[1:], out=tr[1:])
+    return plus_dm, minus_dm, tr
+
+def _simple_adx(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    plus_dm, minus_dm, tr = _directional_movement(high, low, close)
+    tr_mean = _rolling_mean(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # DM 和 TR 的缓冲区依次复用为 +DI、-DI 和 DX
+        plus_di = np.multiply(_rolling_mean(plus_dm, period), 100, out=plus_dm)
+        np.divide(plus_di, tr_mean, out=plus_di)
+        minus_di = np.multiply(_rolling_mean(minus_dm, period), 100, out=minus_dm)
+        np.divide(minus_di, tr_mean, out=minus_di)
+        dx = np.subtract(plus_di, minus_di, out=tr)
+        np.abs(dx, out=dx)
+        np.multiply(dx, 100, out=dx)
+        np.divide(dx, plus_di + minus_di, out=dx)
+    return _rolling_mean(dx, period), plus_di, minus_di
+
+def wilder_adx(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """TA-Lib 定义的 ADX, 输入为不含 NaN 的 (日期 × 股票) 二维数组
+
+    Returns:
+        (adx, plus_di, minus_di, dx), 无法计算的 DX (TR 或 DI 之和为0) 为 NaN,
+        此时 ADX 沿用上一个值
+    """
+    n_rows = len(close)
+    adx, plus_di, minus_di, dx = (np.full(close.shape, np.nan) for _ in range(4))
+    if n_rows <= period:
+        return adx, plus_di, minus_di, dx
+
+    plus_dm, minus_dm, tr = _directional_movement(high, low, close)
+    # 前 period-1 根求和后 s = s - s/n + x, 同除以 n 后即 alpha = 1/n 的指数平滑
+    smoothed = [_wilder_smooth(values, period) for values in (plus_dm, minus_dm, tr)]
+    smoothed_plus, smoothed_minus, smoothed_tr = (values[period:] for values in smoothed)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        no_range = np.abs(smoothed_tr * period) < EPSILON
+        plus_di[period:] = np.where(no_range, 0.0, 100 * smoothed_plus / smoothed_tr)
+        minus_di[period:] = np.where(no_range, 0.0, 100 * smoothed_minus / smoothed_tr)
+        total = plus_di[period:] + minus_di[period:]
+        value = 100 * np.abs(plus_di[period:] - minus_di[period:]) / total
+    dx[period:] = np.where(no_range | (np.abs(total) < EPSILON), np.nan, value)
+
+    first = 2 * period - 1
+    if n_rows > first:
+        seeded = dx[first:].copy()
+        seeded[0] = np.nansum(dx[period:first + 1], axis=0) / period
+        adx[first:] = pd.DataFrame(seeded).ewm(alpha=1 / period, adjust=False, ignore_na=True).mean().to_numpy()
+    return adx, plus_di, minus_di, dx
+
+def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """TA-Lib 的DM/TR平滑除以 period, 第 period-1 行起有值"""
+    result = np.full(values.shape, np.nan)
+    seeded = values[period - 1:].copy()
+    seeded[0] = values[1:period].sum(axis=0) / period
+    result[period - 1:] = pd.DataFrame(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    return result
+
+def _rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.DataFrame(values).rolling(period).mean().to_numpy()
@@ -12,10 +12,9 @@ class VolatilityIndicators:
     def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
         """计算ATR"""
         try:
-            tr1 = high - low
-            tr2 = abs(high - close.shift())
-            tr3 = abs(low - close.shift())
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+            prev_close = close.shift()
+            # fmax 与 concat(...).max(axis=1) 一样跳过 NaN, 不构造中间 DataFrame
+            tr = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
             return tr.rolling(window=period).mean()
         except Exception as e:
             logger.error(f"ATR计算失败: {str(e)}")
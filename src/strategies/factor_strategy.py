@@ -3,6 +3,7 @@ import numpy as np
 from typing import Dict
 from .base_strategy import BaseStrategy
 from ..utils.logger import setup_logger
+from ..utils.precision import to_precision
 
 logger = setup_logger(__name__)
 
@@ -37,23 +38,23 @@ class FactorStrategy(BaseStrategy):
         try:
             # 计算因子
             # 1. 动量因子
-            data['momentum'] = data['close'].pct_change(self.parameters['momentum_period'])
+            data['momentum'] = to_precision(data['close'].pct_change(self.parameters['momentum_period']))
             
             # 2. 波动率因子
-            data['volatility'] = data['close'].pct_change().rolling(
+            data['volatility'] = to_precision(data['close'].pct_change().rolling(
                 self.parameters['volatility_period']
-            ).std()
+            ).std())
             
             # 3. 成交量因子
-            data['volume_factor'] = data['volume'].rolling(
+            data['volume_factor'] = to_precision(data['volume'].rolling(
                 self.parameters['volume_period']
-            ).mean()
+            ).mean())
             
             # 生成信号
             data['signal'] = 0
             
             # 综合因子得分
-            data['factor_score'] = (
+            data['factor_score'] = to_precision(
                 data['momentum'].rank(pct=True) * 0.4 +
                 (1 - data['volatility'].rank(pct=True)) * 0.3 +
                 data['volume_factor'].rank(pct=True) * 0.3
@@ -1,7 +1,7 @@
 import pandas as pd
 from typing import Dict
 from .base import BaseStrategy
-from ..indicators.trend import calculate_ma
+from ..indicators.features import FeatureGraph
 
 class MAStrategy(BaseStrategy):
     """均线交叉策略"""
@@ -25,8 +25,9 @@ class MAStrategy(BaseStrategy):
     
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """生成交易信号"""
-        short_ma = calculate_ma(data['close'], self.params['short_window'])
-        long_ma = calculate_ma(data['close'], self.params['long_window'])
+        graph = FeatureGraph(close=data['close'])
+        short_ma = graph.get('rolling_mean', field='close', window=self.params['short_window'])
+        long_ma = graph.get('rolling_mean', field='close', window=self.params['long_window'])
         
         signals = pd.Series(0, index=data.index)
         signals[short_ma > long_ma] = 1
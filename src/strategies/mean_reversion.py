@@ -2,8 +2,9 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional
 from .base_strategy import BaseStrategy
-from ..indicators.momentum import MomentumIndicators
+from ..indicators.features import FeatureGraph
 from ..utils.logger import setup_logger
+from ..utils.precision import to_precision
 
 logger = setup_logger(__name__)
 
@@ -12,7 +13,6 @@ class MeanReversionStrategy(BaseStrategy):
     
     def __init__(self, name: str = "均值回归"):
         super().__init__(name)
-        self.momentum_indicators = MomentumIndicators()
         self.parameters = {
             'ma_period': 20,        # 均线周期
             'std_dev': 2.0,         # 标准差倍数
@@ -39,20 +39,14 @@ class MeanReversionStrategy(BaseStrategy):
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """生成交易信号"""
         try:
-            # 计算技术指标
-            data['ma'] = data['close'].rolling(
-                window=self.parameters['ma_period']
-            ).mean()
-            data['std'] = data['close'].rolling(
-                window=self.parameters['ma_period']
-            ).std()
-            data['upper_band'] = data['ma'] + self.parameters['std_dev'] * data['std']
-            data['lower_band'] = data['ma'] - self.parameters['std_dev'] * data['std']
-            
-            data['rsi'] = self.momentum_indicators.calculate_rsi(
-                data['close'],
-                self.parameters['rsi_period']
+            # 计算技术指标, 均线和标准差在布林带与输出列之间共享
+            graph = FeatureGraph.from_bars(data)
+            period = self.parameters['ma_period']
+            data['upper_band'], data['ma'], data['lower_band'] = graph.get(
+                'bollinger', period=period, std_dev=self.parameters['std_dev']
             )
+            data['std'] = graph.get('rolling_std', field='close', window=period)
+            data['rsi'] = graph.get('rsi', period=self.parameters['rsi_period'])
             
             # 生成信号
             data['signal'] = 0
@@ -70,7 +64,7 @@ class MeanReversionStrategy(BaseStrategy):
             ] = -1
             
             # 计算持仓规模
-            data['position_size'] = data['signal'] * self.parameters['position_size']
+            data['position_size'] = to_precision(data['signal'] * self.parameters['position_size'])
             
             return data
             
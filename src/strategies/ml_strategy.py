@@ -3,6 +3,7 @@ import numpy as np
 from typing import Dict
 from .base_strategy import BaseStrategy
 from ..utils.logger import setup_logger
+from ..utils.precision import to_precision
 
 logger = setup_logger(__name__)
 
@@ -37,10 +38,10 @@ class MLStrategy(BaseStrategy):
         """生成交易信号"""
         try:
             # 计算技术特征
-            data['ma5'] = data['close'].rolling(5).mean()
-            data['ma10'] = data['close'].rolling(10).mean()
-            data['ma20'] = data['close'].rolling(20).mean()
-            data['vol_ma5'] = data['volume'].rolling(5).mean()
+            data['ma5'] = to_precision(data['close'].rolling(5).mean())
+            data['ma10'] = to_precision(data['close'].rolling(10).mean())
+            data['ma20'] = to_precision(data['close'].rolling(20).mean())
+            data['vol_ma5'] = to_precision(data['volume'].rolling(5).mean())
             
             # 生成信号
             data['signal'] = 0
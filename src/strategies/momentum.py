@@ -1,5 +1,4 @@
 import pandas as pd
-import numpy as np
 from typing import Optional
 from .base_strategy import BaseStrategy
 from ..indicators.technical import TechnicalIndicators
@@ -8,7 +7,17 @@ from ..utils.logger import setup_logger
 logger = setup_logger(__name__)
 
 class MomentumStrategy(BaseStrategy):
-    """动量策略"""
+    """动量策略
+
+    参数优化由 ``src.analysis.sweep.optimize_strategy`` 在 PARAMETER_GRID 上进行,
+    ``optimize_parameters`` 保留为它的简单封装。
+    """
+    
+    # 参数优化的默认搜索网格: 回看期 × 持有期
+    PARAMETER_GRID = {
+        'lookback': range(10, 60, 10),
+        'holding_period': range(1, 10, 2),
+    }
     
     def __init__(self, symbol: str, lookback: int = 20, holding_period: int = 5):
         super().__init__(symbol)
@@ -99,33 +108,11 @@ class MomentumStrategy(BaseStrategy):
             logger.error(f"持有期应用失败: {str(e)}")
             return signals
     
-    def optimize_parameters(self, data: pd.DataFrame) -> dict:
-        """优化策略参数"""
-        try:
-            best_sharpe = -np.inf
-            best_params = self.params.copy()
-            
-            # 参数网格搜索
-            for lookback in range(10, 60, 10):
-                for holding in range(1, 10, 2):
-                    self.params['lookback'] = lookback
-                    self.params['holding_period'] = holding
-                    
-                    # 运行回测
-                    result = self.run_strategy(data=data)
-                    if result is None:
-                        continue
-                    
-                    # 计算夏普比率
-                    returns = result['close'].pct_change()
-                    sharpe = np.sqrt(252) * returns.mean() / returns.std()
-                    
-                    if sharpe > best_sharpe:
-                        best_sharpe = sharpe
-                        best_params = self.params.copy()
-            
-            return best_params
-            
-        except Exception as e:
-            logger.error(f"参数优化失败: {str(e)}")
-            return self.params 
\ No newline at end of file
+    def optimize_parameters(self, data: pd.DataFrame, workers: int = 1, results_path: Optional[str] = None) -> dict:
+        """优化策略参数, 按策略收益的夏普比率在 PARAMETER_GRID 上搜索"""
+        # 在函数内导入, 策略模块不依赖 analysis
+        from ..analysis.sweep import optimize_strategy
+        return optimize_strategy(
+            self, data, init_kwargs={'symbol': self.name},
+            workers=workers, results_path=results_path
+        )
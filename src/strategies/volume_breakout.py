@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict
 from .base_strategy import BaseStrategy
+from ..indicators.features import FeatureGraph
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -38,11 +39,12 @@ class VolumeBreakoutStrategy(BaseStrategy):
         """生成交易信号"""
         try:
             # 计算技术指标
-            price_ma = data['close'].rolling(window=self.parameters['price_ma_period']).mean()
-            volume_ma = data['volume'].rolling(window=self.parameters['volume_ma_period']).mean()
+            graph = FeatureGraph.from_bars(data)
+            price_ma = graph.get('rolling_mean', field='close', window=self.parameters['price_ma_period'])
+            volume_ma = graph.get('rolling_mean', field='volume', window=self.parameters['volume_ma_period'])
             
             # 计算价格通道
-            price_std = data['close'].rolling(window=self.parameters['lookback_period']).std()
+            price_std = graph.get('rolling_std', field='close', window=self.parameters['lookback_period'])
             upper_band = price_ma + self.parameters['breakout_std'] * price_std
             lower_band = price_ma - self.parameters['breakout_std'] * price_std
             
@@ -1,64 +1,397 @@
 import os
 import pickle
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import pandas as pd
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
-from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from ..utils.column_store import ColumnStore
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class Cache:
-    """缓存管理"""
+    """缓存管理
+
+    DataFrame 按列存储在 ``<cache_dir>/columns`` 下, 读取时可以只取部分列和日期区间;
+    其他对象以 pickle 文件保存在 ``<cache_dir>/objects`` 下。
+
+    每个键对应的文件、大小、创建/访问时间和版本号记录在 SQLite 清单
+    ``<cache_dir>/manifest.db`` 中, 多个进程可以共享同一个缓存目录:
+    每次写入都生成新文件, 写完后在事务中切换清单里的路径, 再删除旧文件,
+    读取方要么读到旧版本, 要么读到新版本。设置 ``max_bytes`` 后,
+    总占用超出上限时按最近访问时间淘汰。
+    """
     
-    def __init__(self, cache_dir: str = ".cache"):
+    def __init__(self, cache_dir: str = ".cache", compress: bool = False,
+                 max_bytes: Optional[int] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(exist_ok=True)
+        self.store = ColumnStore(str(self.cache_dir / "columns"), compress=compress)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._init_manifest()
+    
+    def get(
+        self,
+        key: str,
+        ttl: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        start: Any = None,
+        end: Any = None
+    ) -> Any:
+        """获取缓存
+
+        columns/start/end 只对 DataFrame 生效, 分别按列和索引区间投影。
+        """
+        return self.get_many([key], ttl, columns, start, end).get(key)
     
-    def get(self, key: str, ttl: Optional[int] = None) -> Any:
-        """获取缓存"""
+    def get_many(
+        self,
+        keys: Iterable[str],
+        ttl: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        start: Any = None,
+        end: Any = None
+    ) -> Dict[str, Any]:
+        """批量获取缓存, 只返回命中的键"""
+        result = {}
         try:
-            cache_file = self.cache_dir / f"{key}.pkl"
-            
-            if not cache_file.exists():
-                return None
-            
-            # 检查过期时间
-            if ttl is not None:
-                modified_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-                if datetime.now() - modified_time > timedelta(seconds=ttl):
-                    return None
+            entries = self._lookup(list(keys))
+            now = time.time()
+            hits = []
+            for key, (path, kind, created) in entries.items():
+                # 检查过期时间
+                if ttl is not None and now - created > ttl:
+                    continue
+                value = self._read(path, kind, columns, start, end)
+                if value is not None:
+                    result[key] = value
+                    hits.append(key)
             
-            with open(cache_file, 'rb') as f:
-                return pickle.load(f)
-                
+            if hits:
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "UPDATE entries SET accessed = ? WHERE key = ?",
+                        [(now, key) for key in hits]
+                    )
         except Exception as e:
             logger.error(f"读取缓存失败: {str(e)}")
-            return None
+        return result
     
     def set(self, key: str, value: Any) -> bool:
         """设置缓存"""
+        return self.set_many({key: value})
+    
+    def set_many(self, items: Dict[str, Any]) -> bool:
+        """批量设置缓存, 所有键在同一个事务中生效"""
+        written = []
         try:
-            cache_file = self.cache_dir / f"{key}.pkl"
-            with open(cache_file, 'wb') as f:
-                pickle.dump(value, f)
+            for key, value in items.items():
+                written.append((key,) + self._write(key, value))
+            self._commit(written)
             return True
             
         except Exception as e:
             logger.error(f"写入缓存失败: {str(e)}")
+            for _, path, kind, _ in written:
+                self._remove(path, kind)
+            return False
+    
+    def append(self, key: str, value: pd.DataFrame) -> bool:
+        """向已缓存的DataFrame追加新行"""
+        try:
+            if not ColumnStore.supports(value):
+                logger.error(f"只有DataFrame支持追加: {key}")
+                return False
+            
+            existing = self.get(key)
+            if existing is None:
+                return self.set(key, value)
+            if not ColumnStore.supports(existing):
+                logger.error(f"已缓存的数据不支持追加: {key}")
+                return False
+            
+            combined = ColumnStore.merge_rows(existing, value)
+            if combined is existing:
+                return True
+            return self.set(key, combined)
+            
+        except Exception as e:
+            logger.error(f"追加缓存失败: {str(e)}")
             return False
     
+    def index_bounds(self, key: str):
+        """获取已缓存DataFrame索引的首尾值"""
+        entry = self._lookup([key]).get(key)
+        if entry is None or entry[1] != 'columns':
+            return None, None
+        return self.store.index_bounds(entry[0])
+    
+    def version(self, key: str) -> Optional[int]:
+        """缓存版本号, 每次写入加一"""
+        row = self._connection().execute(
+            "SELECT version FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def size(self) -> int:
+        """缓存总占用字节数"""
+        row = self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+    
     def clear(self, key: Optional[str] = None):
         """清除缓存"""
         try:
-            if key is None:
-                # 清除所有缓存
-                for file in self.cache_dir.glob("*.pkl"):
-                    file.unlink()
-            else:
-                # 清除指定缓存
-                cache_file = self.cache_dir / f"{key}.pkl"
-                if cache_file.exists():
-                    cache_file.unlink()
+            with self._transaction() as conn:
+                if key is None:
+                    # 清除所有缓存
+                    removed = conn.execute("SELECT path, kind FROM entries").fetchall()
+                    conn.execute("DELETE FROM entries")
+                else:
+                    # 清除指定缓存
+                    removed = conn.execute(
+                        "SELECT path, kind FROM entries WHERE key = ?", (key,)
+                    ).fetchall()
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            for path, kind in removed:
+                self._remove(path, kind)
                     
         except Exception as e:
-            logger.error(f"清除缓存失败: {str(e)}") 
\ No newline at end of file
+            logger.error(f"清除缓存失败: {str(e)}")
+    
+    def _init_manifest(self):
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                version INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程使用自己的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self.cache_dir / "manifest.db"), timeout=30, isolation_level=None
+            )
+            self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _lookup(self, keys: List[str]) -> Dict[str, Tuple[str, str, float]]:
+        result = {}
+        conn = self._connection()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, path, kind, created FROM entries "
+                f"WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            result.update({key: (path, kind, created) for key, path, kind, created in rows})
+        return result
+    
+    def _read(self, path: str, kind: str, columns, start, end) -> Any:
+        if kind == 'columns':
+            return self.store.read(path, columns=columns, start=start, end=end)
+        
+        try:
+            with open(self.objects_dir / path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            # 其他进程刚刚替换了这个键
+            return None
+        if isinstance(value, pd.DataFrame):
+            if columns is not None:
+                value = value[[col for col in columns if col in value.columns]]
+            if start is not None or end is not None:
+                value = value.loc[start:end]
+        return value
+    
+    def _write(self, key: str, value: Any) -> Tuple[str, str, int]:
+        """写入新文件, 返回 (路径, 类型, 大小)"""
+        name = f"{self._safe_name(key)}.{uuid.uuid4().hex}"
+        if ColumnStore.supports(value) and self.store.write(name, value):
+            partition = self.store.root_dir / name
+            size = sum(f.stat().st_size for f in partition.iterdir())
+            return name, 'columns', size
+        
+        path = f"{name}.pkl"
+        tmp_file = self.objects_dir / f".tmp-{path}"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(value, f)
+        os.replace(tmp_file, self.objects_dir / path)
+        return path, 'pickle', (self.objects_dir / path).stat().st_size
+    
+    def _commit(self, written: List[Tuple[str, str, str, int]]):
+        """在清单中切换到新文件, 删除旧文件并按上限淘汰"""
+        now = time.time()
+        with self._transaction() as conn:
+            replaced = []
+            for key, path, kind, size in written:
+                old = conn.execute(
+                    "SELECT path, kind, version FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                version = 1
+                if old is not None:
+                    replaced.append(old[:2])
+                    version = old[2] + 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, path, kind, size, now, now, version)
+                )
+            replaced.extend(self._evict(conn))
+        
+        for path, kind in replaced:
+            self._remove(path, kind)
+    
+    def _evict(self, conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+        """超出上限时删除最久未访问的项, 返回需要删除的文件"""
+        if self.max_bytes is None:
+            return []
+        
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        evicted = []
+        for key, path, kind, size in conn.execute(
+            "SELECT key, path, kind, size FROM entries ORDER BY accessed"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            evicted.append((path, kind))
+            total -= size
+        if evicted:
+            logger.info(f"缓存超出上限, 淘汰 {len(evicted)} 项")
+        return evicted
+    
+    def _remove(self, path: str, kind: str):
+        if kind == 'columns':
+            self.store.delete(path)
+        else:
+            try:
+                (self.objects_dir / path).unlink()
+            except FileNotFoundError:
+                pass
+    
+    @staticmethod
+    def _safe_name(key: str) -> str:
+        return "".join(c if c.isalnum() or c in "._-" else "_" for c in key)[:100]
+
+
+class LRUCache:
+    """按内存占用限制大小的LRU缓存
+
+    大小按 DataFrame/Series 的 ``memory_usage(deep=True)`` 计算, 超出预算时淘汰最久未使用的项。
+    """
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取缓存并标记为最近使用"""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key][0]
+    
+    def peek(self, key: str, default: Any = None) -> Any:
+        """读取缓存, 不改变使用顺序和统计"""
+        with self._lock:
+            entry = self._items.get(key)
+            return default if entry is None else entry[0]
+    
+    def set(self, key: str, value: Any) -> bool:
+        """写入缓存, 单项超过预算时不缓存"""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                logger.warning(f"{key} 占用 {size} 字节, 超过缓存上限, 不缓存")
+                return False
+            
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+            return True
+    
+    def pop(self, key: str, default: Any = None) -> Any:
+        """删除缓存"""
+        with self._lock:
+            if key not in self._items:
+                return default
+            value, size = self._items.pop(key)
+            self.current_bytes -= size
+            return value
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """命中/未命中/淘汰次数及占用"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'items': len(self._items),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+        }
+    
+    @staticmethod
+    def sizeof(value: Any) -> int:
+        """估算对象占用的内存, 元组按元素累加"""
+        if isinstance(value, tuple):
+            return sys.getsizeof(value) + sum(LRUCache.sizeof(item) for item in value)
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(index=True, deep=True))
+        return sys.getsizeof(value)
@@ -0,0 +1,361 @@
+import io
+import json
+import os
+import shutil
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_FILE = "__index__"
+META_FILE = "meta.json"
+NULL_SUFFIX = ".null"
+STORE_VERSION = 2
+
+
+class ColumnStore:
+    """列式行情存储
+
+    每个分区(通常为一只股票)对应一个目录, 目录下每列单独保存为一个
+    定长类型的 ``.npy`` 数组, 索引保存为 ``__index__.npy``, 列名和类型
+    记录在 ``meta.json`` 中。读取时只加载需要的列, 并按索引区间切片,
+    未压缩的列通过内存映射读取, 只拷贝实际用到的行。
+
+    文件名是转义后的列名, 列名中的 ``/`` 等字符不会影响路径。文本列中的缺失值
+    (None/NaN) 另存一个布尔掩码 ``<文件名>.null.npy``, 读取时还原为 NaN。
+
+    写入先在临时目录完成再重命名为分区目录, 读取方不会看到写了一半的分区。
+    """
+
+    def __init__(self, root_dir: str = ".cache/columns", compress: bool = False):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+
+    @staticmethod
+    def supports(df: Any) -> bool:
+        """判断对象能否按列存储"""
+        if not isinstance(df, pd.DataFrame):
+            return False
+        if isinstance(df.index, pd.MultiIndex) or isinstance(df.columns, pd.MultiIndex):
+            return False
+        if not df.columns.is_unique:
+            return False
+        if any(not isinstance(col, str) or col == INDEX_FILE for col in df.columns):
+            return False
+        if isinstance(df.index.dtype, pd.DatetimeTZDtype):
+            return False
+        return True
+
+    def exists(self, key: str) -> bool:
+        """分区是否存在"""
+        return self.meta_path(key).exists()
+
+    def meta_path(self, key: str) -> Path:
+        """分区元数据文件路径"""
+        return self._partition(key) / META_FILE
+
+    def symbols(self) -> List[str]:
+        """列出所有分区"""
+        return sorted(
+            p.parent.name for p in self.root_dir.glob(f"*/{META_FILE}")
+            if not p.parent.name.startswith(".")
+        )
+
+    def info(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取分区元数据"""
+        meta_file = self.meta_path(key)
+        if not meta_file.exists():
+            return None
+        with open(meta_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write(self, key: str, df: pd.DataFrame) -> bool:
+        """写入分区(覆盖)"""
+        try:
+            if not self.supports(df):
+                logger.error(f"不支持列式存储的数据: {key}")
+                return False
+
+            partition = self.root_dir / f".tmp-{key}-{uuid.uuid4().hex}"
+            partition.mkdir(parents=True)
+
+            index_meta = self._save_column(partition, INDEX_FILE, df.index)
+            index_meta["name"] = df.index.name
+            index_meta["sorted"] = bool(df.index.is_monotonic_increasing)
+
+            columns = {}
+            for col in df.columns:
+                columns[col] = self._save_column(partition, self._file_name(col), df[col])
+
+            meta = {
+                "version": STORE_VERSION,
+                "rows": len(df),
+                "compression": "zlib" if self.compress else None,
+                "index": index_meta,
+                "columns": columns,
+                "attrs": self._json_attrs(df.attrs),
+            }
+            with open(partition / META_FILE, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            self._replace(partition, self._partition(key))
+            return True
+
+        except Exception as e:
+            logger.error(f"写入列式存储失败: {str(e)}")
+            if 'partition' in locals():
+                shutil.rmtree(partition, ignore_errors=True)
+            return False
+
+    def read(
+        self,
+        key: str,
+        columns: Optional[Sequence[str]] = None,
+        start: Any = None,
+        end: Any = None,
+    ) -> Optional[pd.DataFrame]:
+        """读取分区
+
+        Args:
+            key: 分区名
+            columns: 需要的列, 默认全部
+            start: 起始索引(含)
+            end: 结束索引(含)
+        """
+        try:
+            meta = self.info(key)
+            if meta is None:
+                return None
+
+            partition = self._partition(key)
+            compressed = meta["compression"] is not None
+            index_meta = meta["index"]
+
+            if columns is None:
+                columns = list(meta["columns"])
+            missing = [col for col in columns if col not in meta["columns"]]
+            if missing:
+                logger.warning(f"{key} 缺少列: {missing}")
+                columns = [col for col in columns if col in meta["columns"]]
+
+            index_values = self._load_array(partition, INDEX_FILE, compressed)
+            rows = slice(0, meta["rows"])
+            if start is not None or end is not None:
+                rows = self._locate(index_values, index_meta, start, end)
+
+            index = self._load_column(partition, INDEX_FILE, index_meta, compressed, rows, index_values)
+            data = {}
+            for col in columns:
+                col_meta = meta["columns"][col]
+                file = col_meta.get("file", col)
+                data[col] = self._load_column(partition, file, col_meta, compressed, rows)
+
+            df = pd.DataFrame(data, index=pd.Index(index, name=index_meta["name"]),
+                              columns=list(columns))
+            df.attrs.update(meta.get("attrs", {}))
+            return df
+
+        except Exception as e:
+            logger.error(f"读取列式存储失败: {str(e)}")
+            return None
+
+    def append(self, key: str, df: pd.DataFrame) -> bool:
+        """追加行, 与已有索引重复的行会被忽略"""
+        try:
+            if not self.exists(key):
+                return self.write(key, df)
+
+            existing = self.read(key)
+            if existing is None:
+                return False
+
+            combined = self.merge_rows(existing, df)
+            if combined is existing:
+                return True
+            return self.write(key, combined)
+
+        except Exception as e:
+            logger.error(f"追加列式存储失败: {str(e)}")
+            return False
+
+    @staticmethod
+    def merge_rows(existing: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        """把新行接到已有数据之后, 索引重复的行忽略; 没有新行时返回 existing 本身"""
+        new_rows = df[~df.index.isin(existing.index)]
+        if new_rows.empty:
+            return existing
+
+        combined = pd.concat([existing, new_rows[existing.columns]])
+        combined.attrs = {**existing.attrs, **df.attrs}
+        return combined
+
+    def index_bounds(self, key: str):
+        """返回分区索引的首尾值, 分区不存在或为空时返回 (None, None)"""
+        try:
+            meta = self.info(key)
+            if meta is None or meta["rows"] == 0:
+                return None, None
+
+            partition = self._partition(key)
+            compressed = meta["compression"] is not None
+            index_values = self._load_array(partition, INDEX_FILE, compressed)
+            rows = [0, meta["rows"] - 1]
+            first, last = self._load_column(
+                partition, INDEX_FILE, meta["index"], compressed, rows, index_values
+            )
+            return first, last
+
+        except Exception as e:
+            logger.error(f"读取索引范围失败: {str(e)}")
+            return None, None
+
+    def delete(self, key: Optional[str] = None):
+        """删除分区, 不指定时删除全部"""
+        try:
+            if key is None:
+                for name in self.symbols():
+                    shutil.rmtree(self._partition(name), ignore_errors=True)
+            else:
+                shutil.rmtree(self._partition(key), ignore_errors=True)
+        except Exception as e:
+            logger.error(f"删除列式存储失败: {str(e)}")
+
+    def _partition(self, key: str) -> Path:
+        return self.root_dir / key
+
+    def _replace(self, source: Path, target: Path):
+        """用写好的临时目录替换分区目录"""
+        try:
+            os.rename(source, target)
+            return
+        except OSError:
+            if not target.exists():
+                raise
+
+        # 目录不能直接覆盖, 先把旧分区移走再替换
+        trash = self.root_dir / f".trash-{target.name}-{uuid.uuid4().hex}"
+        os.rename(target, trash)
+        os.rename(source, target)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    @staticmethod
+    def _json_attrs(attrs: Dict) -> Dict:
+        """只保留可以写入JSON的属性"""
+        result = {}
+        for name, value in attrs.items():
+            try:
+                json.dumps(value)
+                result[str(name)] = value
+            except (TypeError, ValueError):
+                logger.warning(f"忽略无法序列化的属性: {name}")
+        return result
+
+    def _locate(self, index_values: np.ndarray, index_meta: Dict, start: Any, end: Any) -> Any:
+        """根据索引区间定位行"""
+        start = self._coerce_bound(start, index_values.dtype, index_meta["kind"])
+        end = self._coerce_bound(end, index_values.dtype, index_meta["kind"])
+
+        if index_meta["sorted"]:
+            lo = 0 if start is None else int(np.searchsorted(index_values, start, side="left"))
+            hi = len(index_values) if end is None else int(
+                np.searchsorted(index_values, end, side="right")
+            )
+            return slice(lo, max(lo, hi))
+
+        mask = np.ones(len(index_values), dtype=bool)
+        if start is not None:
+            mask &= index_values >= start
+        if end is not None:
+            mask &= index_values <= end
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def _coerce_bound(bound: Any, dtype: np.dtype, kind: str) -> Any:
+        if bound is None:
+            return None
+        if kind == "datetime":
+            return pd.Timestamp(bound).to_datetime64().astype(dtype)
+        if kind == "str":
+            return str(bound)
+        return bound
+
+    @staticmethod
+    def _file_name(column: str) -> str:
+        """列名转义为文件名, 转义后不含 ``/`` 和 ``.``, 不会与掩码文件重名"""
+        return quote(column, safe="").replace(".", "%2E")
+
+    def _save_column(self, partition: Path, file: str, values: Any) -> Dict[str, Any]:
+        """保存一列(或索引)及其缺失值掩码, 返回该列的元数据"""
+        kind, array, nulls = self._encode(values)
+        self._save_array(partition, file, array)
+        meta = {"dtype": array.dtype.str, "kind": kind, "file": file}
+        if nulls is not None:
+            self._save_array(partition, file + NULL_SUFFIX, nulls)
+            meta["nulls"] = True
+        return meta
+
+    def _load_column(
+        self,
+        partition: Path,
+        file: str,
+        meta: Dict[str, Any],
+        compressed: bool,
+        rows: Any,
+        values: Optional[np.ndarray] = None,
+    ) -> Any:
+        if values is None:
+            values = self._load_array(partition, file, compressed)
+        result = self._decode(np.array(values[rows]), meta["kind"])
+        if meta.get("nulls"):
+            nulls = self._load_array(partition, file + NULL_SUFFIX, compressed)
+            result[np.array(nulls[rows])] = np.nan
+        return result
+
+    @staticmethod
+    def _encode(values: Any):
+        """转换为定长类型的numpy数组, 文本列同时返回缺失值掩码(无缺失时为 None)"""
+        dtype = values.dtype
+        if pd.api.types.is_datetime64_dtype(dtype):
+            return "datetime", np.asarray(values), None
+        if pd.api.types.is_bool_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return "bool", np.asarray(values), None
+        if pd.api.types.is_numeric_dtype(dtype):
+            if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+                return "numeric", values.to_numpy(dtype="float64", na_value=np.nan), None
+            return "numeric", np.asarray(values), None
+
+        nulls = np.asarray(pd.isna(values), dtype=bool)
+        if not nulls.any():
+            return "str", np.asarray(values, dtype=str), None
+        text = np.asarray(values, dtype=object).copy()
+        text[nulls] = ""
+        return "str", text.astype(str), nulls
+
+    @staticmethod
+    def _decode(values: np.ndarray, kind: str) -> Any:
+        if kind == "str":
+            return values.astype(object)
+        return values
+
+    def _save_array(self, partition: Path, name: str, values: np.ndarray):
+        if self.compress:
+            buffer = io.BytesIO()
+            np.save(buffer, values, allow_pickle=False)
+            with open(partition / f"{name}.npy.z", "wb") as f:
+                f.write(zlib.compress(buffer.getvalue()))
+        else:
+            np.save(partition / f"{name}.npy", values, allow_pickle=False)
+
+    @staticmethod
+    def _load_array(partition: Path, name: str, compressed: bool) -> np.ndarray:
+        if compressed:
+            with open(partition / f"{name}.npy.z", "rb") as f:
+                return np.load(io.BytesIO(zlib.decompress(f.read())), allow_pickle=False)
+        return np.load(partition / f"{name}.npy", mmap_mode="r", allow_pickle=False)
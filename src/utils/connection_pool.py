@@ -1,59 +1,285 @@
 import baostock as bs
-from typing import Optional
+import itertools
+import multiprocessing as mp
+import queue
 import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-class ConnectionPool:
-    """BaoStock连接池"""
-    
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super().__new__(cls)
-            return cls._instance
-    
-    def __init__(self):
-        self._pool = []
-        self._max_size = 5
+# 需要重新登录的baostock错误码: 未登录以及网络类错误
+SESSION_ERROR_CODES = {
+    '10001001',  # 用户未登陆
+    '10002001',  # 网络错误
+    '10002002',  # 网络连接失败
+    '10002003',  # 网络连接超时
+    '10002007',  # 网络接收错误
+    '10002008',  # 网络接收超时
+}
+
+class SessionExpired(Exception):
+    """baostock会话失效"""
+
+def check_result(rs):
+    """检查baostock返回结果, 会话失效时抛出 SessionExpired"""
+    if rs.error_code in SESSION_ERROR_CODES:
+        raise SessionExpired(f"{rs.error_code} {rs.error_msg}")
+    if rs.error_code != '0':
+        raise RuntimeError(f"Query failed: {rs.error_msg}")
+    return rs
+
+class _WorkerSession:
+    """工作进程内的baostock会话"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.logged_in = False
+
+    def login(self) -> bool:
+        try:
+            lg = bs.login()
+            self.logged_in = lg.error_code == '0'
+            if not self.logged_in:
+                logger.error(f"worker {self.worker_id} 登录失败: {lg.error_msg}")
+        except Exception as e:
+            self.logged_in = False
+            logger.error(f"worker {self.worker_id} 登录失败: {str(e)}")
+        return self.logged_in
+
+    def logout(self):
+        try:
+            if self.logged_in:
+                bs.logout()
+        except Exception:
+            pass
+        self.logged_in = False
+
+    def run(self, fn: Callable, args: Tuple, kwargs: Dict) -> Any:
+        """执行任务, 会话失效时重新登录并重试一次"""
+        if not self.logged_in:
+            self.login()
+        try:
+            return fn(*args, **kwargs)
+        except SessionExpired:
+            logger.warning(f"worker {self.worker_id} 会话失效, 重新登录")
+            self.login()
+            return fn(*args, **kwargs)
+
+    def keepalive(self):
+        """空闲时检查会话是否仍然有效"""
+        try:
+            today = datetime.now().strftime('%Y-%m-%d')
+            check_result(bs.query_trade_dates(start_date=today, end_date=today))
+        except Exception:
+            self.login()
+
+def _worker_main(worker_id: int, jobs, results, idle_timeout: float):
+    """工作进程入口, 从自己的任务队列领取任务"""
+    session = _WorkerSession(worker_id)
+    session.login()
+    try:
+        while True:
+            try:
+                job = jobs.get(timeout=idle_timeout)
+            except queue.Empty:
+                session.keepalive()
+                continue
+
+            if job is None:
+                break
+
+            job_id, fn, args, kwargs = job
+            try:
+                results.put(('done', job_id, worker_id, session.run(fn, args, kwargs)))
+            except Exception as e:
+                results.put(('error', job_id, worker_id, f"{type(e).__name__}: {str(e)}"))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.logout()
+
+class BaostockWorkerPool:
+    """baostock进程池
+
+    baostock的会话是进程级的全局状态, 因此每个工作进程各自登录并持有一个会话。
+    任务是可pickle的函数, 在工作进程中直接调用baostock接口, 会话失效时通过抛出
+    SessionExpired 触发重新登录。
+
+    任务先进入主进程的等待队列, 由主进程逐个分配给空闲的工作进程 (每个进程有
+    自己的任务队列, 同一时间最多持有一个任务), 因此每个任务在哪个进程上始终是
+    已知的。健康检查按 ``health_interval`` 定时执行, 与结果队列是否繁忙无关;
+    退出的进程被重新拉起, 分配给它的任务以异常结束。
+    """
+
+    def __init__(self, size: int = 4, idle_timeout: float = 60.0, health_interval: float = 5.0):
+        if size <= 0:
+            raise ValueError("进程数必须为正整数")
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+
+        self._ctx = mp.get_context('spawn')
+        self._results = self._ctx.Queue()
+        self._workers: Dict[int, Any] = {}
+        self._inboxes: Dict[int, Any] = {}
+        self._futures: Dict[int, Future] = {}
+        self._pending: Deque[Tuple[int, Callable, Tuple, Dict]] = deque()
+        self._running: Dict[int, int] = {}  # worker_id -> job_id
+        self._job_ids = itertools.count()
         self._lock = threading.Lock()
-    
-    def get_connection(self) -> Optional[bs]:
-        """获取连接"""
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def start(self):
+        """启动工作进程"""
         with self._lock:
-            if not self._pool:
-                try:
-                    lg = bs.login()
-                    if lg.error_code != '0':
-                        logger.error(f"登录失败: {lg.error_msg}")
-                        return None
-                    return bs
-                except Exception as e:
-                    logger.error(f"创建连接失败: {str(e)}")
-                    return None
-            return self._pool.pop()
-    
-    def release_connection(self, conn):
-        """释放连接"""
+            if self._collector is not None:
+                return
+            for worker_id in range(self.size):
+                self._spawn(worker_id)
+            self._collector = threading.Thread(target=self._collect, daemon=True)
+            self._collector.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """提交任务"""
+        if self._closed:
+            raise RuntimeError("进程池已关闭")
+        self.start()
+
+        future: Future = Future()
         with self._lock:
-            if len(self._pool) < self._max_size:
-                self._pool.append(conn)
-            else:
-                try:
-                    bs.logout()
-                except:
-                    pass
-    
-    def close_all(self):
-        """关闭所有连接"""
+            job_id = next(self._job_ids)
+            self._futures[job_id] = future
+            self._pending.append((job_id, fn, args, kwargs))
+            self._dispatch()
+        return future
+
+    def health_check(self) -> Dict[int, bool]:
+        """检查工作进程, 重启已退出的进程并让分配给它的任务失败"""
+        status = {}
+        failed = []
+        with self._lock:
+            if self._closed:
+                return status
+            for worker_id, process in list(self._workers.items()):
+                alive = process.is_alive()
+                status[worker_id] = alive
+                if alive:
+                    continue
+
+                logger.warning(f"worker {worker_id} 已退出(exitcode={process.exitcode}), 重新启动")
+                job_id = self._running.pop(worker_id, None)
+                if job_id is not None:
+                    failed.append((self._futures.pop(job_id, None), worker_id))
+                self._spawn(worker_id)
+            self._dispatch()
+
+        for future, worker_id in failed:
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError(f"worker {worker_id} 异常退出"))
+        return status
+
+    def shutdown(self, timeout: float = 10.0):
+        """关闭进程池, 等待正在执行的任务完成, 尚未分配的任务以异常结束"""
         with self._lock:
-            for _ in range(len(self._pool)):
-                conn = self._pool.pop()
-                try:
-                    bs.logout()
-                except:
-                    pass 
\ No newline at end of file
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            for inbox in self._inboxes.values():
+                inbox.put(None)
+
+        for process in workers:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"worker {process.name} 未能按时退出, 强制终止")
+                process.terminate()
+                process.join()
+
+        if self._collector is not None:
+            self._results.put(None)
+            self._collector.join()
+
+        with self._lock:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("进程池已关闭"))
+            self._futures.clear()
+            self._pending.clear()
+            self._running.clear()
+            self._workers.clear()
+            self._inboxes.clear()
+
+    def _spawn(self, worker_id: int):
+        # 新进程使用新的任务队列, 旧队列中残留的任务不会被重复执行
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, inbox, self._results, self.idle_timeout),
+            name=f"baostock-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = process
+        self._inboxes[worker_id] = inbox
+
+    def _dispatch(self):
+        """把等待中的任务分配给空闲的工作进程, 调用时需持有锁"""
+        if self._closed:
+            return
+        for worker_id in self._workers:
+            if worker_id in self._running:
+                continue
+            while self._pending:
+                job = self._pending.popleft()
+                future = self._futures.get(job[0])
+                # 分配后不能再取消; 已被调用方取消的任务直接丢弃
+                if future is None or not future.set_running_or_notify_cancel():
+                    self._futures.pop(job[0], None)
+                    continue
+                self._running[worker_id] = job[0]
+                self._inboxes[worker_id].put(job)
+                break
+
+    def _collect(self):
+        """收集工作进程返回的结果, 并定时检查工作进程"""
+        next_check = time.monotonic() + self.health_interval
+        while True:
+            try:
+                message = self._results.get(timeout=max(next_check - time.monotonic(), 0))
+            except queue.Empty:
+                message = ()
+
+            if time.monotonic() >= next_check:
+                self.health_check()
+                next_check = time.monotonic() + self.health_interval
+            if message is None:
+                break
+            if not message:
+                continue
+
+            kind, job_id, worker_id, payload = message
+            with self._lock:
+                if self._running.get(worker_id) == job_id:
+                    del self._running[worker_id]
+                future = self._futures.pop(job_id, None)
+                self._dispatch()
+
+            if future is None or future.done():
+                continue
+            if kind == 'done':
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
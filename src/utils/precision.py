@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+# 可选的计算精度
+PRECISIONS = {
+    'float64': np.float64,
+    'float32': np.float32,
+}
+
+# 数值量级大、float32 下误差不可忽略的列, 任何精度下都保持 float64
+FLOAT64_COLUMNS = ('Amount', 'amount')
+
+_precision = 'float64'
+
+def get_precision() -> str:
+    """当前的全局计算精度"""
+    return _precision
+
+def set_precision(name: str):
+    """设置全局计算精度
+
+    ``float32`` 时数据加载、指标和信号使用 float32 存储, 内存和带宽减半
+    (策略在 ``generate_signals`` 中写入的浮点列同样转换, 整数信号列保持不变);
+    滚动均值/方差、指数平滑由 pandas 在 float64 中累加, 累计收益等跨越全部
+    历史的计算也保持 float64。相对 float64 结果的误差上界:
+
+    - 均线、EMA、布林带、唐奇安通道等价格量纲的指标: 相对误差 < 1e-6
+      (输入取整到 float32 引入 2^-24 ≈ 6e-8, 输出再取整一次);
+    - ATR 等由价差计算的指标: 相对误差 < 1e-5; MACD、回撤: 绝对误差 < 1e-6 × 价格;
+    - RSI、KDJ 等 0~100 的振荡指标: 绝对误差 < 0.01, 窗口内价格几乎不变时
+      分母很小, 误差会放大;
+    - 信号: 只在指标与阈值的距离小于上述误差时可能不同。
+
+    DMI/ADX 比较相邻K线的上涨和下跌幅度, 以分为单位的价格经常正好相等,
+    舍入误差会改变比较结果; SuperTrend 方向在收盘价贴近通道时同理。这类
+    不连续的指标不在上述误差范围内, 需要逐点一致时使用 float64。
+    """
+    global _precision
+    if name not in PRECISIONS:
+        raise ValueError(f"未知的计算精度: {name}")
+    _precision = name
+
+@contextmanager
+def use_precision(name: str) -> Iterator[None]:
+    """在 with 块内临时使用指定精度"""
+    previous = get_precision()
+    set_precision(name)
+    try:
+        yield
+    finally:
+        set_precision(previous)
+
+def float_dtype() -> type:
+    """当前精度对应的浮点类型"""
+    return PRECISIONS[_precision]
+
+def to_precision(data: Any, dtype: Optional[type] = None) -> Any:
+    """把浮点数据转换为当前精度 (或指定的 ``dtype``), 整数列和 FLOAT64_COLUMNS 保持不变"""
+    dtype = dtype or float_dtype()
+    if isinstance(data, pd.DataFrame):
+        columns = {
+            column: dtype for column, column_dtype in data.dtypes.items()
+            if column not in FLOAT64_COLUMNS and np.issubdtype(column_dtype, np.floating)
+            and column_dtype != dtype
+        }
+        return data.astype(columns) if columns else data
+    if isinstance(data, (pd.Series, np.ndarray)):
+        if np.issubdtype(data.dtype, np.floating) and data.dtype != dtype:
+            return data.astype(dtype)
+        return data
+    if isinstance(data, tuple):
+        return tuple(to_precision(item, dtype) for item in data)
+    return data
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis.ma_grid import evaluate_ma_grid
+from src.analysis.sweep import evaluate_strategy
+from src.strategies.ma_strategy import MAStrategy
+
+@pytest.fixture(scope='module')
+def bars():
+    # 价格不取整到分, 两条均线不会恰好相等
+    rng = np.random.default_rng(11)
+    close = 20 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, 1500)))
+    return pd.DataFrame({'close': close}, index=pd.bdate_range('2015-01-01', periods=1500))
+
+def test_grid_matches_strategy_backtests(bars):
+    grid = evaluate_ma_grid(bars['close'], [5, 10, 20, 60], [10, 20, 60, 120], cost_rate=0.0004)
+    assert (grid['short_window'] < grid['long_window']).all() and len(grid) == 10
+
+    for row in grid.iloc[[0, 5, 9]].itertuples():
+        params = {'short_window': int(row.short_window), 'long_window': int(row.long_window)}
+        expected = evaluate_strategy(MAStrategy, {'symbol': 'x'}, params, bars, cost_rate=0.0004)
+        for name, value in expected.items():
+            assert getattr(row, name) == pytest.approx(value, rel=1e-9), name
+
+    # 分块大小不影响结果
+    chunked = evaluate_ma_grid(bars['close'], [5, 10, 20, 60], [10, 20, 60, 120], cost_rate=0.0004, chunk_elements=2000)
+    pd.testing.assert_frame_equal(chunked, grid)
+
+def test_equal_averages_give_no_position():
+    close = pd.Series(np.r_[np.linspace(10, 12, 100), np.full(200, 12.3)])
+    grid = evaluate_ma_grid(close, [5], [20], cost_rate=0.0)
+    changes = close.pct_change().fillna(0)
+    expected = evaluate_strategy(MAStrategy, {'symbol': 'x'}, {'short_window': 5, 'long_window': 20}, close.to_frame('close'), 0.0)
+    assert grid['total_return'].iloc[0] == pytest.approx(expected['total_return'], rel=1e-9)
+    # 从第20根K线起持多仓, 价格不变后两条均线相等, 不再持仓
+    assert grid['total_return'].iloc[0] == pytest.approx((1 + changes.iloc[20:101]).prod() - 1, rel=1e-9)
+    assert grid['max_drawdown'].iloc[0] == 0
@@ -0,0 +1,101 @@
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis.portfolio import PortfolioBacktestEngine
+from src.data.synthetic import SyntheticMarket
+
+def reference_backtest(prices, weights, capital, rate):
+    """逐日按股数记账的参考实现"""
+    price = prices.ffill().fillna(0.0).to_numpy()
+    tradable = prices.notna().to_numpy()
+    target = weights.to_numpy()
+    shares = np.zeros(prices.shape[1])
+    cash = capital
+    portfolio = []
+    for t in range(len(price)):
+        equity = cash + shares @ price[t]
+        held = shares.copy()
+        trades = 0.0
+        for j in range(price.shape[1]):
+            if tradable[t, j]:
+                wanted = target[t, j] * equity / price[t, j]
+                trades += abs(wanted - shares[j]) * price[t, j]
+                held[j] = wanted
+        cost = trades * rate
+        cash = equity - held @ price[t] - cost
+        # 按成本缩减后的资产重新按目标权重持仓
+        scale = (equity - cost) / equity
+        for j in range(price.shape[1]):
+            if tradable[t, j]:
+                held[j] *= scale
+        cash = equity - cost - held @ price[t]
+        shares = held
+        portfolio.append(cash + shares @ price[t])
+    return np.array(portfolio)
+
+@pytest.fixture(scope='module')
+def market():
+    return SyntheticMarket(6, '2019-01-01', '2020-12-31', seed=8)
+
+@pytest.mark.parametrize('suspensions', [False, True])
+def test_matches_share_based_reference(market, suspensions):
+    prices = market.panel(['close'])['close'].iloc[:, :4]
+    rng = np.random.default_rng(1)
+    weights = pd.DataFrame(rng.dirichlet(np.ones(5), len(prices))[:, :4], index=prices.index, columns=prices.columns)
+    # 每5天调仓一次, 其余日期沿用
+    weights.iloc[np.arange(len(weights)) % 5 != 0] = np.nan
+    weights = weights.ffill()
+    if suspensions:
+        # 上市后的停牌日保留, 持仓股数在停牌期间不变
+        prices = prices.loc[prices.ffill().notna().all(axis=1)]
+        assert prices.isna().any().any()
+    else:
+        prices = prices.loc[prices.notna().all(axis=1)]
+    weights = weights.loc[prices.index]
+
+    engine = PortfolioBacktestEngine(1e6, commission_rate=0.0003, slippage_rate=0.0001)
+    results = engine.run(prices, weights)
+    expected = reference_backtest(prices, weights, 1e6, 0.0004)
+    np.testing.assert_allclose(results['portfolio'].to_numpy(), expected, rtol=1e-9)
+    assert results['costs'].sum() > 0
+    assert results['turnover'].iloc[0] == pytest.approx(weights.iloc[0].sum())
+    assert 'peak_memory_mb' not in results['stats']
+
+def test_costs_from_config_and_suspensions(market):
+    engine = PortfolioBacktestEngine()
+    assert (engine.commission_rate, engine.slippage_rate) == (0.0003, 0.0001)
+
+    prices = market.panel(['close'])['close']
+    assert prices.isna().any().any()
+    weights = pd.DataFrame(1 / prices.shape[1], index=prices.index, columns=prices.columns)
+    results = engine.run(prices, weights)
+    # 停牌日不调仓, 股数不变: 权重 × 组合资产 (即持仓市值) 与停牌前一日相同
+    suspended = (prices.isna() & prices.ffill().notna()).to_numpy()
+    assert suspended.any()
+    value = results['weights'].to_numpy() * results['portfolio'].to_numpy()[:, None]
+    rows, cols = np.nonzero(suspended)
+    np.testing.assert_allclose(value[rows, cols], value[rows - 1, cols], rtol=1e-12)
+    assert not np.allclose(results['weights'].to_numpy()[suspended], 1 / prices.shape[1])
+    tradable = prices.notna().to_numpy()
+    np.testing.assert_allclose(results['weights'].to_numpy()[tradable], 1 / prices.shape[1])
+    assert results['turnover'].notna().all() and not results['portfolio'].isna().any()
+
+def test_memory_tracing_is_opt_in(market):
+    prices = market.panel(['close'])['close']
+    weights = pd.DataFrame(1 / prices.shape[1], index=prices.index, columns=prices.columns)
+    engine = PortfolioBacktestEngine(trace_memory=True)
+    assert engine.run(prices, weights)['stats']['peak_memory_mb'] > 0
+    assert not tracemalloc.is_tracing()
+
+    # 调用方已在统计时既不重置峰值, 也不停止统计
+    tracemalloc.start()
+    try:
+        ballast = np.ones(4 * 1024 ** 2)
+        del ballast
+        stats = engine.run(prices, weights)['stats']
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= 32 * 1024 ** 2
+        assert 'peak_memory_mb' not in stats
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.analysis.search import SuccessiveHalvingSearch, halving_schedule, load_evaluations, schedule_cost
+from src.analysis.sweep import ParameterSpace, ParameterSweep
+from src.data.synthetic import SyntheticMarket
+from src.strategies.mean_reversion import MeanReversionStrategy
+
+def test_schedule_fits_budget():
+    schedule = halving_schedule(243, 5000, 24)
+    assert schedule == [(72, 555), (24, 1666), (8, 5000)]
+    assert schedule_cost(schedule, 5000) <= 24
+    # 数据太短时只有一轮
+    assert halving_schedule(100, 300, 10) == [(10, 300)]
+    with pytest.raises(ValueError):
+        halving_schedule(10, 300, 0)
+
+def test_search_close_to_grid_optimum(tmp_path):
+    market = SyntheticMarket(1, '2012-01-01', '2020-12-31', seed=2)
+    bars = market.get_stock_data(market.symbols[0]).rename(columns=str.lower)
+    space = ParameterSpace({
+        'ma_period': [10, 20, 30], 'std_dev': [1.5, 2.0, 2.5],
+        'rsi_upper': [65, 70, 75], 'rsi_lower': [25, 30, 35],
+    })
+    grid = ParameterSweep(MeanReversionStrategy, space).run(bars)
+
+    path = tmp_path / 'search.jsonl'
+    search = SuccessiveHalvingSearch(MeanReversionStrategy, space, budget=16, log_path=str(path))
+    best = search.run(bars)
+    evaluations = search.evaluations
+    assert len(evaluations) < len(grid) / 2
+    assert evaluations['horizon'].max() == len(bars)
+
+    # 预算为网格的 1/5, 选出的参数在全部网格中排在前 1/4
+    ranked = grid[list(space.grid)].to_dict('records')
+    assert ranked.index(best) < len(grid) / 4
+
+    search.run(bars)
+    logged = load_evaluations(str(path))
+    assert len(logged) == 2 * len(evaluations) and logged['run_id'].nunique() == 2
+    np.testing.assert_allclose(logged['sharpe'].iloc[:len(evaluations)], evaluations['sharpe'])
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+from src.analysis.sweep import ParameterSpace, ParameterSweep, SharedMarketData, evaluate_strategy, optimize_strategy
+from src.data.synthetic import SyntheticMarket
+from src.strategies.mean_reversion import MeanReversionStrategy
+from src.strategies.momentum import MomentumStrategy
+
+@pytest.fixture(scope='module')
+def bars():
+    market = SyntheticMarket(1, '2016-01-01', '2020-12-31', seed=6)
+    return market.get_stock_data(market.symbols[0]).rename(columns=str.lower)
+
+SPACE = ParameterSpace(
+    {'ma_period': [10, 20, 30], 'std_dev': [1.5, 2.0], 'rsi_period': [7, 14]},
+    constraint=lambda p: p['rsi_period'] < p['ma_period']
+)
+
+def test_interrupted_sweep_resumes(bars, tmp_path):
+    path = tmp_path / 'sweep.jsonl'
+    seen = []
+
+    def interrupt(completed, total):
+        seen.append(completed)
+        if completed == 4:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        ParameterSweep(MeanReversionStrategy, SPACE, results_path=str(path), progress=interrupt).run(bars)
+    assert len(path.read_text().splitlines()) == 4
+    # 中断时写了一半的行被忽略
+    with open(path, 'a') as f:
+        f.write('{"sweep": ')
+
+    sweep = ParameterSweep(MeanReversionStrategy, SPACE, results_path=str(path))
+    results = sweep.run(bars)
+    assert sweep.resumed == 4 and len(results) == len(SPACE) == 10
+    assert results['sharpe'].is_monotonic_decreasing
+
+    fresh = ParameterSweep(MeanReversionStrategy, SPACE).run(bars)
+    pd.testing.assert_frame_equal(results, fresh)
+    assert sweep.best_params() == {name: fresh.iloc[0][name] for name in SPACE.grid}
+
+def test_parallel_sweep_uses_shared_data(bars):
+    serial = ParameterSweep(MeanReversionStrategy, SPACE, cost_rate=0.0004).run(bars)
+    parallel = ParameterSweep(MeanReversionStrategy, SPACE, cost_rate=0.0004, workers=2).run(bars)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    with SharedMarketData(bars) as shared:
+        attached = SharedMarketData.attach(shared.handle)
+        pd.testing.assert_frame_equal(attached.data, bars, check_freq=False)
+        assert not attached.data['close'].to_numpy().flags.writeable
+        metrics = evaluate_strategy(MeanReversionStrategy, {}, {'ma_period': 10}, attached.data)
+        assert 'signal' not in attached.data
+        attached.close()
+    assert set(metrics) == {'sharpe', 'total_return', 'annual_return', 'max_drawdown', 'calmar'}
+
+def test_momentum_optimizes_strategy_returns(bars):
+    strategy = MomentumStrategy('600000')
+    best = optimize_strategy(strategy, bars, init_kwargs={'symbol': '600000'})
+    assert set(best) == {'lookback', 'holding_period', 'momentum_threshold'}
+    assert strategy.params['lookback'] == 20
+    assert strategy.optimize_parameters(bars) == best
+    # 目标是策略收益, 不同参数的得分不同
+    scores = [
+        evaluate_strategy(MomentumStrategy, {'symbol': 'x'}, {'lookback': lookback}, bars)['sharpe']
+        for lookback in (10, 50)
+    ]
+    assert scores[0] != scores[1]
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis.sweep import OBJECTIVES, ParameterSpace, strategy_run_returns
+from src.analysis.walk_forward import WalkForwardOptimizer, walk_forward_splits
+from src.data.synthetic import SyntheticMarket
+from src.strategies.mean_reversion import MeanReversionStrategy
+
+SPACE = ParameterSpace({'ma_period': [10, 20], 'std_dev': [1.5, 2.5]})
+_sharpe = OBJECTIVES['sharpe']
+
+@pytest.fixture(scope='module')
+def bars():
+    market = SyntheticMarket(1, '2015-01-01', '2020-12-31', seed=9)
+    return market.get_stock_data(market.symbols[0]).rename(columns=str.lower)
+
+def test_splits():
+    assert walk_forward_splits(10, 4, 3) == [(0, 4, 4, 7), (3, 7, 7, 10)]
+    assert walk_forward_splits(10, 4, 2, step=3, anchored=True) == [(0, 4, 4, 6), (0, 7, 7, 9)]
+    with pytest.raises(ValueError):
+        walk_forward_splits(10, 4, 3, step=2)
+
+def test_reused_history_matches_direct_search(bars):
+    optimizer = WalkForwardOptimizer(
+        MeanReversionStrategy, SPACE, train_size=500, test_size=250, cost_rate=0.0, reuse_history=True
+    )
+    result = optimizer.run(bars)
+    folds = walk_forward_splits(len(bars), 500, 250)
+    histories = [strategy_run_returns(MeanReversionStrategy, {}, params, bars) for params in SPACE]
+
+    expected = []
+    for (train_start, train_end, test_start, test_end), row in zip(folds, result['folds'].itertuples()):
+        scores = [_sharpe(history.iloc[train_start:train_end]) for history in histories]
+        best = int(np.nanargmax(scores))
+        assert {'ma_period': row.ma_period, 'std_dev': row.std_dev} == list(SPACE)[best]
+        assert row.in_sample == pytest.approx(scores[best])
+        expected.append(histories[best].iloc[test_start:test_end])
+
+    pd.testing.assert_series_equal(result['returns'], pd.concat(expected), check_names=False, check_freq=False)
+    assert result['returns'].index.is_unique
+    assert result['equity'].iloc[-1] == pytest.approx((1 + result['returns']).prod())
+
+def test_per_fold_search_in_parallel(bars):
+    kwargs = dict(train_size=500, test_size=250, step=250, cost_rate=0.0)
+    serial = WalkForwardOptimizer(MeanReversionStrategy, SPACE, **kwargs).run(bars)
+    parallel = WalkForwardOptimizer(MeanReversionStrategy, SPACE, workers=2, **kwargs).run(bars)
+    pd.testing.assert_frame_equal(serial['folds'], parallel['folds'])
+    pd.testing.assert_series_equal(serial['returns'], parallel['returns'])
+
+    # 第一折: 只用训练窗口选参数, 以训练窗口为预热期交易测试窗口
+    first = serial['folds'].iloc[0]
+    params = {'ma_period': int(first['ma_period']), 'std_dev': float(first['std_dev'])}
+    scores = [_sharpe(strategy_run_returns(MeanReversionStrategy, {}, p, bars.iloc[:500])) for p in SPACE]
+    assert first['in_sample'] == pytest.approx(max(scores))
+    traded = strategy_run_returns(MeanReversionStrategy, {}, params, bars.iloc[:750]).iloc[500:]
+    pd.testing.assert_series_equal(serial['returns'].iloc[:250], traded, check_names=False, check_freq=False)
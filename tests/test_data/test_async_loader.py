@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import pandas as pd
+from src.data.async_loader import AsyncDataLoader
+from src.data.data_loader import DataLoader
+from src.utils.cache import Cache
+
+class SlowLoader(DataLoader):
+    """按股票代码模拟查询耗时"""
+
+    def __init__(self, cache, delays):
+        super().__init__(cache)
+        self.delays = delays
+
+    def get_stock_data(self, symbol, start_date='2020-01-01'):
+        time.sleep(self.delays.get(symbol, 0))
+        if symbol == 'bad':
+            return None
+        dates = pd.bdate_range(start_date, periods=5).strftime('%Y-%m-%d')
+        return pd.DataFrame({'Close': range(5)}, index=pd.Index(dates, name='Date'))
+
+    def get_many_stock_data(self, symbols, start_date='2020-01-01', end_date=None, pool=None):
+        self.batches = getattr(self, 'batches', []) + [(list(symbols), threading.get_ident())]
+        for symbol in symbols:
+            df = self.get_stock_data(symbol, start_date)
+            yield symbol, df, None if df is not None else "no data"
+
+def test_fetch_and_stream(tmp_path):
+    loader = SlowLoader(Cache(str(tmp_path)), {})
+
+    async def run():
+        async with AsyncDataLoader(loader) as async_loader:
+            df = await async_loader.fetch('sh.600000', '2023-01-02', end_date='2023-01-04')
+            results = [r async for r in async_loader.stream(['sh.600000', 'bad'], '2023-01-02')]
+        return df, results
+
+    df, results = asyncio.run(run())
+    assert list(df.index) == ['2023-01-02', '2023-01-03', '2023-01-04']
+    errors = {symbol: error for symbol, _, error in results}
+    assert errors == {'sh.600000': None, 'bad': 'no data'}
+
+def test_stream_without_pool_runs_one_batch(tmp_path):
+    loader = SlowLoader(Cache(str(tmp_path)), {})
+    cached = pd.DataFrame({'Close': [1.0]}, index=pd.Index(['2023-01-02'], name='Date'))
+    loader.to_memory('cached', '2023-01-02', cached)
+
+    async def run():
+        async with AsyncDataLoader(loader) as async_loader:
+            results = [r async for r in async_loader.stream(['a', 'cached', 'b'], '2023-01-02')]
+        return results, threading.get_ident()
+
+    results, loop_thread = asyncio.run(run())
+    assert [r[0] for r in results] == ['cached', 'a', 'b']
+    # 整个批次在后台线程中一次交给 get_many_stock_data, 内存缓存中的股票不再查询
+    assert len(loader.batches) == 1
+    symbols, thread = loader.batches[0]
+    assert symbols == ['a', 'b'] and thread != loop_thread
+
+def test_timeout(tmp_path):
+    loader = SlowLoader(Cache(str(tmp_path)), {'slow': 0.5})
+
+    async def run():
+        async with AsyncDataLoader(loader, timeout=0.1) as async_loader:
+            with pytest.raises(asyncio.TimeoutError):
+                await async_loader.fetch('slow')
+            return [r async for r in async_loader.stream(['slow'])]
+
+    assert asyncio.run(run()) == [('slow', None, 'timeout')]
+
+class FakePool:
+    """在线程中返回固定结果, 代替 BaostockWorkerPool"""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def submit(self, fn, symbol, *args):
+        dates = pd.bdate_range('2023-01-02', periods=5).strftime('%Y-%m-%d')
+        return self.executor.submit(lambda: pd.DataFrame({'Close': range(5)}, index=pd.Index(dates, name='Date')))
+
+class RecordingLoader(DataLoader):
+    """记录磁盘缓存读写所在的线程"""
+
+    def __init__(self, cache):
+        super().__init__(cache)
+        self.threads = []
+
+    def plan_fetch(self, symbol, start_date):
+        self.threads.append(threading.get_ident())
+        return start_date, True
+
+    def merge_history(self, symbol, start_date, end_date, fetched, full):
+        self.threads.append(threading.get_ident())
+        return fetched
+
+def test_pool_mode_keeps_disk_io_off_event_loop(tmp_path):
+    loader = RecordingLoader(Cache(str(tmp_path)))
+    pool = FakePool()
+
+    async def run():
+        async with AsyncDataLoader(loader, pool=pool) as async_loader:
+            return await async_loader.fetch('sh.600000', '2023-01-02'), threading.get_ident()
+
+    df, loop_thread = asyncio.run(run())
+    pool.executor.shutdown()
+    assert len(df) == 5
+    assert len(loader.threads) == 2 and loop_thread not in loader.threads
@@ -0,0 +1,182 @@
+import pytest
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from src.data import data_loader
+from src.data.data_loader import DataLoader, decode_history
+from src.utils.cache import Cache
+
+class FakeResultSet:
+    """模拟baostock查询结果"""
+
+    def __init__(self, rows):
+        self.error_code = '0'
+        self.error_msg = ''
+        self.rows = list(rows)
+
+    def next(self):
+        return bool(self.rows)
+
+    def get_row_data(self):
+        return self.rows.pop(0)
+
+class FakeBaostock:
+    """按日期区间返回预置K线, 并记录查询参数"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.queries = []
+        self.logins = 0
+
+    def login(self):
+        self.logins += 1
+        return SimpleNamespace(error_code='0', error_msg='')
+
+    def logout(self):
+        pass
+
+    def query_history_k_data_plus(self, code, fields, start_date=None, end_date=None,
+                                  frequency='d', adjustflag='3'):
+        self.queries.append((code, start_date, end_date))
+        rows = [bar for bar in self.bars.get(code, [])
+                if bar[0] >= start_date and (end_date is None or bar[0] <= end_date)]
+        return FakeResultSet(rows)
+
+    def add_bar(self, code, date):
+        self.bars[code].append([date, '10', '11', '9', '10.5', '1000', '10500'])
+
+def make_bars(dates):
+    return [[d, '10', '11', '9', '10.5', '1000', '10500'] for d in dates]
+
+@pytest.fixture
+def fake_bs(monkeypatch):
+    dates = pd.bdate_range('2023-01-02', periods=20).strftime('%Y-%m-%d')
+    fake = FakeBaostock({'sh.600000': make_bars(dates)})
+    monkeypatch.setattr(data_loader, 'bs', fake)
+    return fake
+
+def test_incremental_fetch(tmp_path, fake_bs):
+    cache = Cache(str(tmp_path))
+    df = DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    assert len(df) == 20
+
+    # 新的进程只拉取最后一根K线之后的数据
+    fake_bs.add_bar('sh.600000', '2023-01-30')
+    df = DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    assert len(df) == 21
+    assert df.index[-1] == pd.Timestamp('2023-01-30')
+    assert fake_bs.queries[-1][1] == '2023-01-28'
+
+def test_earlier_start_date_refetches(tmp_path, fake_bs):
+    cache = Cache(str(tmp_path))
+    DataLoader(cache).get_stock_data('sh.600000', '2023-01-10')
+    df = DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    assert fake_bs.queries[-1][1] == '2023-01-01'
+    assert len(df) == 20
+
+def test_get_many_stock_data_single_session(tmp_path, fake_bs):
+    loader = DataLoader(Cache(str(tmp_path)))
+    results = list(loader.get_many_stock_data(
+        ['sh.600000', 'sz.000001'], '2023-01-01', end_date='2023-01-13'
+    ))
+    assert fake_bs.logins == 1
+    assert [r[0] for r in results] == ['sh.600000', 'sz.000001']
+
+    symbol, df, error = results[0]
+    assert error is None and df.index[-1] == pd.Timestamp('2023-01-13')
+
+    # 失败的股票单独报告, 不影响批次
+    symbol, df, error = results[1]
+    assert df is None and error
+
+def test_memory_cache_serves_later_start_date(tmp_path, fake_bs):
+    loader = DataLoader(Cache(str(tmp_path)))
+    loader.get_stock_data('sh.600000', '2023-01-01')
+    queries = len(fake_bs.queries)
+
+    df = loader.get_stock_data('sh.600000', '2023-01-16')
+    assert len(fake_bs.queries) == queries
+    assert df.index[0] == pd.Timestamp('2023-01-16')
+    assert loader.cache.stats()['hits'] == 1
+
+def test_decode_history_profiles():
+    rows = make_bars(['2023-01-03', '2023-01-04'])
+    rows.append(['2023-01-05', '10', '11', '9', '10.5', '', ''])  # 停牌
+
+    legacy = decode_history(rows, 'legacy')
+    typed = decode_history(rows, 'float64')
+    compact = decode_history(rows, 'compact')
+
+    assert isinstance(typed.index, pd.DatetimeIndex)
+    assert typed['Volume'].dtype == np.int64 and typed['Volume'].iloc[-1] == 0
+    assert np.isnan(typed['Amount'].iloc[-1])
+    assert compact['Close'].dtype == np.float32
+    np.testing.assert_array_equal(typed['Close'].values, legacy['Close'].values)
+    assert list(typed.index.strftime('%Y-%m-%d')) == list(legacy.index)
+
+    with pytest.raises(ValueError):
+        decode_history(rows, 'float16')
+
+def test_profile_change_refetches(tmp_path, fake_bs):
+    cache = Cache(str(tmp_path))
+    DataLoader(cache, dtype_profile='legacy').get_stock_data('sh.600000', '2023-01-01')
+    df = DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    assert fake_bs.queries[-1][1] == '2023-01-01'
+    assert isinstance(df.index, pd.DatetimeIndex)
+
+def test_resampled_data_updates_incrementally(tmp_path, fake_bs):
+    cache = Cache(str(tmp_path))
+    weekly = DataLoader(cache).get_resampled_data('sh.600000', 'w', '2023-01-01')
+    assert list(weekly.index.strftime('%Y-%m-%d')) == [
+        '2023-01-06', '2023-01-13', '2023-01-20', '2023-01-27'
+    ]
+    assert weekly['Volume'].iloc[0] == 5000
+
+    # 新的进程追加一根日线, 周线只更新最后一周之后的部分
+    fake_bs.add_bar('sh.600000', '2023-01-30')
+    loader = DataLoader(cache)
+    weekly = loader.get_resampled_data('sh.600000', 'w', '2023-01-01')
+    assert weekly.index[-1] == pd.Timestamp('2023-01-30') and weekly['Volume'].iloc[-1] == 1000
+    assert loader.resampler.incremental_updates == 1 and loader.resampler.full_builds == 0
+
+def test_latest_trading_day():
+    # 周六取上周五, 交易日收盘入库前取前一交易日
+    assert data_loader.latest_trading_day(pd.Timestamp('2023-01-28 10:00')) == pd.Timestamp('2023-01-27')
+    assert data_loader.latest_trading_day(pd.Timestamp('2023-01-30 10:00')) == pd.Timestamp('2023-01-27')
+    assert data_loader.latest_trading_day(pd.Timestamp('2023-01-30 18:00')) == pd.Timestamp('2023-01-30')
+
+def test_current_cache_skips_login(tmp_path, fake_bs, monkeypatch):
+    cache = Cache(str(tmp_path))
+    DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    logins, queries = fake_bs.logins, len(fake_bs.queries)
+
+    monkeypatch.setattr(data_loader, 'latest_trading_day', lambda: pd.Timestamp('2023-01-27'))
+    df = DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+    assert len(df) == 20
+    assert fake_bs.logins == logins and len(fake_bs.queries) == queries
+
+def test_login_failure_returns_cached_bars(tmp_path, fake_bs, monkeypatch):
+    cache = Cache(str(tmp_path))
+    DataLoader(cache).get_stock_data('sh.600000', '2023-01-01')
+
+    monkeypatch.setattr(fake_bs, 'login', lambda: SimpleNamespace(error_code='1', error_msg='offline'))
+    loader = DataLoader(cache)
+    df = loader.get_stock_data('sh.600000', '2023-01-01')
+    assert len(df) == 20 and df.index[-1] == pd.Timestamp('2023-01-27')
+    # 没有更新的数据不进入内存缓存, 下次请求重新尝试
+    assert loader.cache.peek('sh.600000') is None
+
+    # 磁盘缓存没有覆盖请求区间时仍然失败
+    assert loader.get_stock_data('sh.600000', '2022-01-01') is None
+
+def test_empty_update_not_repeated(tmp_path, fake_bs, monkeypatch):
+    # 节假日: 最近交易日没有新K线, 同一交易日内只查询一次
+    loader = DataLoader(Cache(str(tmp_path)))
+    list(loader.get_many_stock_data(['sh.600000'], '2023-01-01'))
+    monkeypatch.setattr(data_loader, 'latest_trading_day', lambda: pd.Timestamp('2023-01-30'))
+    list(loader.get_many_stock_data(['sh.600000'], '2023-01-01'))
+    logins, queries = fake_bs.logins, len(fake_bs.queries)
+
+    results = list(loader.get_many_stock_data(['sh.600000'], '2023-01-01'))
+    assert len(results[0][1]) == 20
+    assert fake_bs.logins == logins and len(fake_bs.queries) == queries
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.data.market_data import MarketData
+from src.data.sources import OfflineSource
+
+def make_archive(root):
+    source = OfflineSource(str(root))
+    dates = pd.bdate_range('2022-01-03', periods=120, name='Date')
+    trends = {'sh.600000': np.linspace(10, 20, 120), 'sz.000001': np.linspace(20, 10, 120)}
+    for code, close in trends.items():
+        source.save_stock_data(code, pd.DataFrame({
+            'Open': close, 'High': close, 'Low': close, 'Close': close,
+            'Volume': np.arange(120, dtype=np.int64), 'Amount': np.ones(120),
+        }, index=dates))
+    source.save_symbol_master(pd.DataFrame({
+        'code': ['sh.600000', 'sz.000001'], 'name': ['浦发银行', '平安银行'],
+        'industry': ['银行', '银行'], 'market_cap': [2500.0, 2200.0], 'pe_ratio': [5.1, 6.0],
+    }))
+    return source
+
+def test_market_data_reads_through_source(tmp_path):
+    market = MarketData(make_archive(tmp_path), start_date='2022-01-01')
+
+    info = market.get_stock_info('sh.600000')
+    assert info['name'] == '浦发银行' and info['close'] == 20
+    assert info['change_pct'] > 0 and len(info['data']) == 120
+    assert market.get_stock_info('sh.999999') is None
+
+    # 离线归档中没有指数
+    assert market.get_market_overview() == {}
+    assert market.get_market_breadth() == {'up': 1, 'down': 1, 'flat': 0}
+    industry = market.get_industry_data()
+    assert industry.loc['银行', 'count'] == 2
+
+    criteria = {'ma_enabled': True, 'ma_short': 5, 'ma_long': 60, 'pe_range': (0, 50), 'industry': ['银行']}
+    assert list(market.screen_stocks(criteria).index) == ['sh.600000']
+    assert market.screen_stocks({**criteria, 'pe_range': (0, 5)}).empty
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.resample import Resampler, resample_bars
+from src.data.synthetic import SyntheticMarket
+
+@pytest.fixture
+def daily():
+    market = SyntheticMarket(1, '2019-01-01', '2021-12-31', seed=6)
+    return market.get_stock_data(market.symbols[0])
+
+@pytest.mark.parametrize('timeframe, period', [('w', 'W'), ('m', 'M')])
+def test_matches_groupby(daily, timeframe, period):
+    result = resample_bars(daily, timeframe)
+    grouped = daily.groupby(daily.index.to_period(period))
+    expected = grouped.agg({
+        'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+        'Volume': 'sum', 'Amount': 'sum',
+    })
+    expected.index = grouped.apply(lambda g: g.index[-1]).values
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_index_type=False)
+    assert result.index.name == 'Date'
+
+def test_intraday_sessions():
+    morning = pd.date_range('2024-03-01 09:35', '2024-03-01 11:30', freq='5min')
+    afternoon = pd.date_range('2024-03-01 13:05', '2024-03-01 15:00', freq='5min')
+    index = morning.append(afternoon)
+    bars = pd.DataFrame({
+        'open': np.arange(48.0), 'high': np.arange(48.0) + 1, 'low': np.arange(48.0) - 1,
+        'close': np.arange(48.0) + 0.5, 'volume': np.full(48, 100),
+    }, index=index)
+
+    hourly = resample_bars(bars, '60')
+    assert list(hourly.index.strftime('%H:%M')) == ['10:30', '11:30', '14:00', '15:00']
+    assert hourly['open'].tolist() == [0, 12, 24, 36]
+    assert hourly['close'].tolist() == [11.5, 23.5, 35.5, 47.5]
+    assert (hourly['volume'] == 1200).all()
+    assert len(resample_bars(bars, '15')) == 16 and len(resample_bars(bars, '30')) == 8
+    with pytest.raises(ValueError):
+        resample_bars(bars, '45')
+
+def test_incremental_update_matches_full(daily):
+    resampler = Resampler()
+    for end in (400, 401, 405, 500, len(daily)):
+        result = resampler.get('sh.600000', daily.iloc[:end], 'w')
+        pd.testing.assert_frame_equal(result, resample_bars(daily.iloc[:end], 'w'))
+    assert resampler.full_builds == 1 and resampler.incremental_updates == 4
+
+    # 起始日期变化时全量重建
+    resampler.get('sh.600000', daily.iloc[10:], 'w')
+    assert resampler.full_builds == 2
+
+def test_extra_columns_are_aggregated_or_rejected(daily):
+    bars = daily.assign(turn=0.5, pctChg=daily['Close'].pct_change().fillna(0) * 100)
+    weekly = resample_bars(bars, 'w')
+    expected = resample_bars(daily, 'w')
+    np.testing.assert_allclose(weekly['pctChg'].iloc[1:], expected['Close'].pct_change().iloc[1:] * 100, atol=1e-10)
+    np.testing.assert_allclose(weekly['turn'], bars.groupby(bars.index.to_period('W'))['turn'].sum())
+
+    with pytest.raises(ValueError, match='peTTM'):
+        resample_bars(bars.assign(peTTM=10.0), 'w')
+    custom = resample_bars(bars.assign(peTTM=10.0), 'w', how={'peTTM': 'last'})
+    assert (custom['peTTM'] == 10.0).all()
+
+def test_revised_history_triggers_rebuild(daily):
+    resampler = Resampler()
+    resampler.get('sh.600000', daily.iloc[:400], 'w')
+    revised = daily.iloc[:401].copy()
+    revised.iloc[100, revised.columns.get_loc('High')] += 5
+    result = resampler.get('sh.600000', revised, 'w')
+    assert resampler.full_builds == 2 and resampler.incremental_updates == 0
+    pd.testing.assert_frame_equal(result, resample_bars(revised, 'w'))
@@ -0,0 +1,41 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.data.sources import OfflineSource, create_data_source
+
+@pytest.fixture
+def archive(tmp_path):
+    source = OfflineSource(str(tmp_path))
+    dates = pd.bdate_range('2022-01-03', periods=250, name='Date')
+    for code in ['sh.600000', 'sz.000001']:
+        source.save_stock_data(code, pd.DataFrame({
+            'Open': np.linspace(10, 20, 250), 'High': np.linspace(11, 21, 250),
+            'Low': np.linspace(9, 19, 250), 'Close': np.linspace(10, 20, 250),
+            'Volume': np.arange(250, dtype=np.int64), 'Amount': np.ones(250),
+        }, index=dates))
+    source.save_symbol_master(pd.DataFrame({
+        'code': ['sh.600000', 'sz.000001'], 'name': ['浦发银行', '平安银行'],
+        'industry': ['银行', '银行'], 'market_cap': [2500.0, 2200.0], 'pe_ratio': [5.1, None],
+    }))
+    return str(tmp_path)
+
+def test_offline_source_queries(archive):
+    source = create_data_source('离线数据', root_dir=archive)
+    assert source.list_symbols() == ['sh.600000', 'sz.000001']
+
+    df = source.get_stock_data('sh.600000', '2022-06-01', '2022-06-30', columns=['Close'])
+    assert list(df.columns) == ['Close']
+    assert df.index.min() >= pd.Timestamp('2022-06-01')
+    assert df.index.max() <= pd.Timestamp('2022-06-30')
+
+    info = source.get_stock_basic_info('sz.000001')
+    assert info['name'] == '平安银行' and info['pe_ratio'] == 0
+    assert source.get_stock_basic_info('sh.999999') is None
+
+    results = list(source.get_many_stock_data(['sh.600000', 'sh.999999'], '2022-01-01'))
+    assert results[0][2] is None and len(results[0][1]) == 250
+    assert results[1][1] is None and results[1][2] == 'no data'
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        create_data_source('TuShare')
@@ -0,0 +1,38 @@
+import numpy as np
+from src.data.synthetic import SyntheticMarket
+
+def test_deterministic_and_chunk_independent():
+    market = SyntheticMarket(12, '2020-01-01', '2021-12-31', seed=7)
+    full = market.generate()
+    again = SyntheticMarket(12, '2020-01-01', '2021-12-31', seed=7).generate(5, 9)
+    np.testing.assert_array_equal(full['close'][:, 5:9], again['close'])
+    np.testing.assert_array_equal(full['volume'][:, 5:9], again['volume'])
+
+def test_bars_are_consistent():
+    market = SyntheticMarket(20, '2020-01-01', '2022-12-31', seed=1)
+    for symbol in market.symbols:
+        df = market.get_stock_data(symbol)
+        assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+        assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+        limit = 0.2 if symbol[3:6] in ('300', '688') else 0.1
+        prev = df['Close'].shift(1).iloc[1:]
+        close = df['Close'].iloc[1:]
+        assert (close <= np.round(prev * (1 + limit), 2) + 1e-9).all()
+        assert (close >= np.round(prev * (1 - limit), 2) - 1e-9).all()
+
+def test_write_archive(tmp_path):
+    market = SyntheticMarket(6, '2023-01-01', '2023-06-30')
+    source = market.write_archive(str(tmp_path), chunk_size=4)
+    assert source.list_symbols() == market.symbols
+    df = source.get_stock_data(market.symbols[2], '2023-01-01')
+    expected = market.get_stock_data(market.symbols[2])
+    np.testing.assert_allclose(df['Close'].values, expected['Close'].values)
+    assert source.get_stock_basic_info(market.symbols[2])['industry']
+
+def test_panel_is_generated_in_chunks():
+    market = SyntheticMarket(10, '2020-01-01', '2020-12-31', seed=3)
+    full = market.generate()
+    panel = market.panel(('close', 'amount'), chunk_size=3)
+    np.testing.assert_array_equal(panel['close'].to_numpy(), full['close'])
+    np.testing.assert_array_equal(panel['amount'].to_numpy(), full['amount'])
+    assert list(panel['close'].columns) == market.symbols
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators import backends
+from src.indicators.backends import NumpyBackend, compare_backends
+from src.indicators.technical import TechnicalIndicators
+
+@pytest.fixture
+def bars():
+    market = SyntheticMarket(1, '2016-01-01', '2020-12-31', seed=11)
+    data = market.get_stock_data(market.symbols[0])
+    return tuple(data[c].to_numpy(dtype=float) for c in ('High', 'Low', 'Close', 'Volume'))
+
+def _talib_adx(high, low, close, period):
+    """按 TA-Lib ta_ADX.c / ta_DX.c 的逐根循环翻译的参考实现"""
+    n = len(close)
+    dx_out, adx_out = np.full(n, np.nan), np.full(n, np.nan)
+    plus_dm = minus_dm = tr = 0.0
+    prev_dx, prev_adx, sum_dx = 0.0, 0.0, 0.0
+    for t in range(1, n):
+        up, down = high[t] - high[t - 1], low[t - 1] - low[t]
+        tr_t = max(high[t] - low[t], abs(high[t] - close[t - 1]), abs(low[t] - close[t - 1]))
+        if t >= period:
+            plus_dm -= plus_dm / period
+            minus_dm -= minus_dm / period
+            tr -= tr / period
+        if down > 0 and up < down:
+            minus_dm += down
+        elif up > 0 and up > down:
+            plus_dm += up
+        tr += tr_t
+        if t < period:
+            continue
+
+        dx = None
+        if abs(tr) >= 1e-8:
+            plus_di, minus_di = 100 * plus_dm / tr, 100 * minus_dm / tr
+            if abs(plus_di + minus_di) >= 1e-8:
+                dx = 100 * abs(minus_di - plus_di) / (plus_di + minus_di)
+        prev_dx = dx if dx is not None else (prev_dx if t > period else 0.0)
+        dx_out[t] = prev_dx
+
+        if t < 2 * period:
+            sum_dx += dx or 0.0
+            if t == 2 * period - 1:
+                prev_adx = sum_dx / period
+                adx_out[t] = prev_adx
+        else:
+            if dx is not None:
+                prev_adx = (prev_adx * (period - 1) + dx) / period
+            adx_out[t] = prev_adx
+    return dx_out, adx_out
+
+def _talib_rsi(close, period):
+    n = len(close)
+    out = np.full(n, np.nan)
+    diffs = np.diff(close)
+    gain = np.clip(diffs[:period], 0, None).sum() / period
+    loss = np.clip(-diffs[:period], 0, None).sum() / period
+    for t in range(period, n):
+        if t > period:
+            d = diffs[t - 1]
+            gain = (gain * (period - 1) + max(d, 0)) / period
+            loss = (loss * (period - 1) + max(-d, 0)) / period
+        out[t] = 0.0 if abs(gain + loss) < 1e-8 else 100 * gain / (gain + loss)
+    return out
+
+def _talib_cci(high, low, close, period):
+    typical = (high + low + close) / 3
+    out = np.full(len(close), np.nan)
+    for t in range(period - 1, len(close)):
+        window = typical[t - period + 1:t + 1]
+        average = window.mean()
+        deviation = np.abs(window - average).mean()
+        distance = typical[t] - average
+        out[t] = distance / (0.015 * deviation) if distance != 0 and deviation != 0 else 0.0
+    return out
+
+def _talib_adosc(high, low, close, volume, fast, slow):
+    out = np.full(len(close), np.nan)
+    ad = fast_ema = slow_ema = 0.0
+    for t in range(len(close)):
+        if high[t] > low[t]:
+            ad += ((close[t] - low[t]) - (high[t] - close[t])) / (high[t] - low[t]) * volume[t]
+        if t == 0:
+            fast_ema = slow_ema = ad
+        else:
+            fast_ema += 2 / (fast + 1) * (ad - fast_ema)
+            slow_ema += 2 / (slow + 1) * (ad - slow_ema)
+        if t >= max(fast, slow) - 1:
+            out[t] = fast_ema - slow_ema
+    return out
+
+def test_numpy_backend_matches_talib_reference(bars):
+    high, low, close, volume = bars
+    backend = NumpyBackend()
+    dx, adx = _talib_adx(high, low, close, 14)
+    np.testing.assert_allclose(backend.dx(high, low, close, 14), dx, rtol=1e-9)
+    np.testing.assert_allclose(backend.adx(high, low, close, 14), adx, rtol=1e-9)
+    np.testing.assert_allclose(backend.rsi(close, 14), _talib_rsi(close, 14), rtol=1e-9)
+    np.testing.assert_allclose(backend.cci(high, low, close, 14), _talib_cci(high, low, close, 14), rtol=1e-9)
+    np.testing.assert_allclose(
+        backend.adosc(high, low, close, volume), _talib_adosc(high, low, close, volume, 3, 10), rtol=1e-9, atol=1e-3
+    )
+
+    # 无方向运动的一字板区间: DX 沿用上一个值, ADX 不更新
+    flat = np.concatenate([np.full(40, close[0]), close[:60]])
+    dx, adx = _talib_adx(flat, flat, flat, 14)
+    np.testing.assert_allclose(backend.dx(flat, flat, flat, 14), dx)
+    np.testing.assert_allclose(backend.adx(flat, flat, flat, 14), adx)
+
+def test_numpy_backend_simple_indicators():
+    backend = NumpyBackend()
+    close = np.array([10.0, 11.0, 11.0, 10.5, 12.0])
+    volume = np.array([100.0, 200.0, 300.0, 400.0, 500.0])
+    np.testing.assert_array_equal(backend.obv(close, volume), [100, 300, 300, -100, 400])
+    high, low = close + 1, close - 1
+    np.testing.assert_allclose(backend.ad(high, low, close, volume), np.zeros(5))
+    upper, middle, lower = backend.bbands(close, 5, 2.0, 2.0)
+    assert middle[-1] == pytest.approx(close.mean())
+    assert upper[-1] - middle[-1] == pytest.approx(2 * close.std())
+
+def test_talib_equivalence(bars):
+    pytest.importorskip('talib')
+    report = compare_backends(backends.TalibBackend(), NumpyBackend(), *bars, rtol=1e-6)
+    assert report['passed'].all(), report
+
+def test_technical_indicators_without_talib(bars, monkeypatch):
+    # set_backend 修改模块级的当前后端, 测试结束后还原
+    monkeypatch.setattr(backends, '_active', backends._active)
+    monkeypatch.setattr(backends.TalibBackend, 'available', classmethod(lambda cls: False))
+    assert backends.available_backends() == ['numpy']
+    assert backends.set_backend('auto').name == 'numpy'
+    with pytest.raises(ValueError):
+        backends.set_backend('talib')
+
+    high, low, close, volume = (pd.Series(v) for v in bars)
+    ma = TechnicalIndicators.calculate_ma(close)
+    assert list(ma.columns) == ['MA5', 'MA10', 'MA20', 'MA60']
+    pd.testing.assert_series_equal(ma['MA20'], close.rolling(20).mean(), check_names=False)
+    trend = TechnicalIndicators.calculate_trend_indicators(close, high, low)
+    assert trend.index.equals(close.index)
+    assert trend['ADX'].notna().sum() == len(close) - 27
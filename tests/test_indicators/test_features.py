@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators.features import FeatureGraph
+from src.indicators.momentum import MomentumIndicators
+from src.indicators.trend import TrendIndicators
+from src.indicators.volatility import VolatilityIndicators
+from src.strategies.mean_reversion import MeanReversionStrategy
+
+@pytest.fixture
+def bars():
+    market = SyntheticMarket(1, '2019-01-01', '2021-12-31', seed=8)
+    return market.get_stock_data(market.symbols[0])
+
+def test_shared_intermediates(bars):
+    graph = FeatureGraph.from_bars(bars)
+    results = graph.compute({
+        'atr': ('atr', {'period': 14}),
+        'adx': 'adx',
+        'supertrend': ('supertrend', {'period': 14}),
+        'boll': 'bollinger',
+        'ma20': ('ma', {'period': 20}),
+        'rsi': 'rsi',
+        'macd': 'macd',
+        'kdj': 'kdj',
+    })
+    # 真实波幅和14日ATR只计算一次, 20日均线由 ma 和布林带共享
+    assert graph.evaluations[('tr', ())] == 1
+    assert graph.evaluations[('rolling_mean', (('field', 'tr'), ('window', 14)))] == 1
+    assert graph.evaluations[('rolling_mean', (('field', 'close'), ('window', 20)))] == 1
+    assert graph.get('atr') is results['atr']
+
+    high, low, close = bars['High'], bars['Low'], bars['Close']
+    pd.testing.assert_series_equal(results['atr'], VolatilityIndicators.calculate_atr(high, low, close), check_names=False)
+    for actual, expected in zip(results['adx'], TrendIndicators.calculate_adx(high, low, close)):
+        pd.testing.assert_series_equal(actual, expected, check_names=False)
+    for actual, expected in zip(results['supertrend'], TrendIndicators.calculate_supertrend(high, low, close, 14)):
+        pd.testing.assert_series_equal(actual, expected, check_names=False)
+    for actual, expected in zip(results['kdj'], MomentumIndicators.calculate_kdj(high, low, close)):
+        pd.testing.assert_series_equal(actual, expected, check_names=False, check_freq=False)
+    np.testing.assert_array_equal(results['rsi'].to_numpy(), MomentumIndicators.calculate_rsi(close).to_numpy())
+
+def test_panel_supertrend_with_suspensions():
+    market = SyntheticMarket(12, '2019-01-01', '2020-12-31', seed=9)
+    panel = market.panel()
+    graph = FeatureGraph(high=panel['high'], low=panel['low'], close=panel['close'])
+    supertrend, direction = graph.get('supertrend')
+    for symbol in market.symbols:
+        df = market.get_stock_data(symbol)
+        expected, expected_direction = TrendIndicators.calculate_supertrend(df['High'], df['Low'], df['Close'])
+        np.testing.assert_array_equal(supertrend[symbol].loc[df.index].to_numpy(), expected.to_numpy())
+        np.testing.assert_array_equal(direction[symbol].loc[df.index].to_numpy(), expected_direction.to_numpy())
+
+def test_unknown_feature_and_missing_input(bars):
+    graph = FeatureGraph(close=bars['Close'])
+    with pytest.raises(ValueError):
+        graph.get('no_such_feature')
+    with pytest.raises(ValueError):
+        graph.get('ma', window=5)
+    with pytest.raises(ValueError):
+        graph.get('atr')
+
+def test_strategy_uses_graph(bars):
+    data = bars.rename(columns=str.lower)
+    signals = MeanReversionStrategy().generate_signals(data.copy())
+    np.testing.assert_allclose(signals['ma'], data['close'].rolling(20).mean())
+    assert signals['rsi'].notna().all()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from src.data.synthetic import SyntheticMarket
+from src.indicators.momentum import MomentumIndicators
+from src.indicators.base import pack_valid, unpack
+from src.indicators.panel import PanelIndicators
+from src.indicators.trend import TrendIndicators
+from src.indicators.volatility import VolatilityIndicators
+
+def test_pack_roundtrip():
+    close = np.array([[1.0, np.nan], [np.nan, 2.0], [3.0, np.nan], [4.0, 5.0]])
+    valid, (packed,) = pack_valid(close)
+    np.testing.assert_array_equal(packed, [[1.0, 2.0], [3.0, 5.0], [4.0, np.nan], [np.nan, np.nan]])
+    np.testing.assert_array_equal(unpack(valid, packed), close)
+
+def test_panel_matches_single_symbol():
+    market = SyntheticMarket(25, '2018-01-01', '2020-12-31', seed=4)
+    panel = market.panel()
+    high, low, close = panel['high'], panel['low'], panel['close']
+    assert close.isna().any().any()
+
+    results = {
+        'ma': (PanelIndicators.calculate_ma(close, 10), lambda h, l, c: c.rolling(10).mean()),
+        'rsi': (PanelIndicators.calculate_rsi(close), lambda h, l, c: MomentumIndicators.calculate_rsi(c)),
+        'macd': (PanelIndicators.calculate_macd(close), lambda h, l, c: MomentumIndicators.calculate_macd(c)),
+        'kdj': (PanelIndicators.calculate_kdj(high, low, close), MomentumIndicators.calculate_kdj),
+        'atr': (PanelIndicators.calculate_atr(high, low, close), VolatilityIndicators.calculate_atr),
+        'boll': (
+            PanelIndicators.calculate_bollinger_bands(close),
+            lambda h, l, c: VolatilityIndicators.calculate_bollinger_bands(c)
+        ),
+        'adx': (PanelIndicators.calculate_adx(high, low, close), TrendIndicators.calculate_adx),
+    }
+    for symbol in market.symbols:
+        df = market.get_stock_data(symbol)
+        for name, (panel_result, single) in results.items():
+            expected = single(df['High'], df['Low'], df['Close'])
+            if not isinstance(expected, tuple):
+                expected, panel_result = (expected,), (panel_result,)
+            for p, e in zip(panel_result, expected):
+                assert isinstance(p, pd.DataFrame)
+                np.testing.assert_array_equal(p[symbol].loc[df.index].to_numpy(), np.asarray(e), err_msg=name)
+                assert p[symbol].drop(df.index).isna().all()
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators import result_cache
+from src.indicators.result_cache import IndicatorCache
+from src.indicators.technical import TechnicalIndicators
+from src.utils.cache import Cache
+
+@pytest.fixture
+def bars():
+    market = SyntheticMarket(1, '2018-01-01', '2021-12-31', seed=2)
+    return market.get_stock_data(market.symbols[0])
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = IndicatorCache(Cache(str(tmp_path)))
+    monkeypatch.setattr(result_cache, '_active', cache)
+    return cache
+
+def test_repeated_requests_hit_cache(cache, bars):
+    first = TechnicalIndicators.calculate_ma(bars['Close'])
+    first.iloc[:, :] = 0
+    second = TechnicalIndicators.calculate_ma(bars['Close'])
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'tail_updates': 0}
+    pd.testing.assert_series_equal(second['MA20'], bars['Close'].rolling(20).mean(), check_names=False)
+
+    # 磁盘层在新的缓存实例中仍然命中
+    restarted = IndicatorCache(cache.store)
+    result_cache.set_indicator_cache(restarted)
+    upper, middle, lower = TechnicalIndicators.calculate_bollinger_bands(bars['Close'])
+    upper, middle, lower = TechnicalIndicators.calculate_bollinger_bands(bars['Close'])
+    third = TechnicalIndicators.calculate_ma(bars['Close'])
+    assert restarted.stats() == {'hits': 2, 'misses': 1, 'tail_updates': 0}
+    pd.testing.assert_frame_equal(third, second, check_freq=False)
+
+def test_appended_bars_extend_cached_result(cache, bars):
+    history, latest = bars.iloc[:-3], bars
+    TechnicalIndicators.calculate_ma(history['Close'])
+    bands = TechnicalIndicators.calculate_bollinger_bands(history['Close'])
+    TechnicalIndicators.calculate_trend_indicators(history['Close'], history['High'], history['Low'])
+
+    extended = TechnicalIndicators.calculate_ma(latest['Close'])
+    extended_bands = TechnicalIndicators.calculate_bollinger_bands(latest['Close'])
+    trend = TechnicalIndicators.calculate_trend_indicators(latest['Close'], latest['High'], latest['Low'])
+    # 窗口类指标只计算新增K线, ADX 等递推指标全量重算
+    assert cache.stats() == {'hits': 0, 'misses': 6, 'tail_updates': 2}
+    pd.testing.assert_series_equal(extended_bands[1].iloc[:-3], bands[1], check_freq=False)
+
+    result_cache.set_indicator_cache(None)
+    expected = TechnicalIndicators.calculate_ma(latest['Close'])
+    pd.testing.assert_frame_equal(extended, expected, check_freq=False, rtol=1e-12)
+    for actual, full in zip(extended_bands, TechnicalIndicators.calculate_bollinger_bands(latest['Close'])):
+        pd.testing.assert_series_equal(actual, full, check_freq=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(
+        trend, TechnicalIndicators.calculate_trend_indicators(latest['Close'], latest['High'], latest['Low'])
+    )
+
+def test_changed_history_is_not_reused(cache, bars):
+    TechnicalIndicators.calculate_ma(bars['Close'].iloc[:-1])
+    revised = bars['Close'].copy()
+    revised.iloc[10] += 1
+    result = TechnicalIndicators.calculate_ma(revised)
+    assert cache.stats()['tail_updates'] == 0
+    assert result['MA5'].iloc[14] == pytest.approx(revised.iloc[10:15].mean())
+
+def test_lineage_stays_in_memory_unless_persisted(tmp_path, bars, monkeypatch):
+    store = Cache(str(tmp_path))
+    writes = []
+    original_set = store.set
+
+    def recording_set(key, value, *args, **kwargs):
+        writes.append(key)
+        return original_set(key, value, *args, **kwargs)
+
+    monkeypatch.setattr(store, 'set', recording_set)
+    monkeypatch.setattr(result_cache, '_active', IndicatorCache(store))
+    TechnicalIndicators.calculate_ma(bars['Close'].iloc[:-1])
+    assert writes and not any(key.startswith('indicator_lineage') for key in writes)
+
+    # 持久化谱系后, 新的缓存实例也能只计算新增K线
+    writes.clear()
+    persisted = IndicatorCache(store, persist_lineage=True)
+    monkeypatch.setattr(result_cache, '_active', persisted)
+    TechnicalIndicators.calculate_bollinger_bands(bars['Close'].iloc[:-1])
+    assert any(key.startswith('indicator_lineage') for key in writes)
+    restarted = IndicatorCache(store, persist_lineage=True)
+    monkeypatch.setattr(result_cache, '_active', restarted)
+    TechnicalIndicators.calculate_bollinger_bands(bars['Close'])
+    assert restarted.stats()['tail_updates'] == 1
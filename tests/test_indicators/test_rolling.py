@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators.panel import PanelIndicators
+from src.indicators.rolling import rolling_argmax, rolling_argmin, rolling_max, rolling_mean_matrix, rolling_min
+from src.indicators.trend import TrendIndicators
+
+def _bars_since(values: np.ndarray, window: int, pick) -> np.ndarray:
+    """逐窗口的参考实现, 并列时取最近的一次"""
+    result = np.full(values.shape, np.nan)
+    for t in range(window - 1, len(values)):
+        segment = values[t - window + 1:t + 1]
+        if not np.isnan(segment).any():
+            result[t] = window - 1 - np.flatnonzero(segment == pick(segment))[-1]
+    return result
+
+@pytest.mark.parametrize('window', [1, 3, 7, 20])
+def test_matches_pandas_with_gaps_and_ties(window):
+    rng = np.random.default_rng(3)
+    # 取整制造大量并列值, 并插入停牌缺口
+    values = np.round(rng.normal(10, 1, (120, 6)), 0)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    frame = pd.DataFrame(values)
+
+    np.testing.assert_array_equal(rolling_max(values, window), frame.rolling(window).max().to_numpy())
+    np.testing.assert_array_equal(rolling_min(values, window), frame.rolling(window).min().to_numpy())
+    np.testing.assert_array_equal(rolling_max(values[:, 0], window), frame[0].rolling(window).max().to_numpy())
+    for j in range(values.shape[1]):
+        np.testing.assert_array_equal(rolling_argmax(values, window)[:, j], _bars_since(values[:, j], window, np.max))
+        np.testing.assert_array_equal(rolling_argmin(values, window)[:, j], _bars_since(values[:, j], window, np.min))
+
+def test_window_longer_than_data():
+    assert np.isnan(rolling_max(np.arange(5.0), 10)).all()
+    with pytest.raises(ValueError):
+        rolling_min(np.arange(5.0), 0)
+
+def test_donchian_panel_matches_single_symbol():
+    market = SyntheticMarket(8, '2018-01-01', '2020-12-31', seed=5)
+    panel = market.panel(('high', 'low'))
+    upper, middle, lower = PanelIndicators.calculate_donchian(panel['high'], panel['low'], 20)
+    for symbol in market.symbols:
+        bars = market.get_stock_data(symbol)
+        expected = TrendIndicators.calculate_donchian(bars['High'], bars['Low'], 20)
+        for actual, series in zip((upper, middle, lower), expected):
+            pd.testing.assert_series_equal(actual[symbol].dropna(), series.dropna(), check_names=False, check_freq=False)
+
+def test_rolling_mean_matrix_matches_pandas():
+    values = 100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 3000))
+    values[500:505] = np.nan
+    windows = [1, 5, 60, 250, 4000]
+    result = rolling_mean_matrix(values, windows)
+    assert result.shape == (len(windows), len(values))
+    for row, window in zip(result, windows):
+        np.testing.assert_allclose(row, pd.Series(values).rolling(window).mean().to_numpy(), rtol=1e-12)
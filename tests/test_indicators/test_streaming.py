@@ -0,0 +1,59 @@
+import json
+import numpy as np
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators import streaming
+from src.indicators.momentum import MomentumIndicators
+from src.indicators.trend import TrendIndicators
+from src.indicators.volatility import VolatilityIndicators
+
+@pytest.fixture
+def bars():
+    market = SyntheticMarket(1, '2012-01-01', '2020-12-31', seed=21)
+    return market.get_stock_data(market.symbols[0])
+
+def run(indicator, inputs):
+    outputs = [indicator.update(x) for x in inputs]
+    if isinstance(outputs[0], tuple):
+        return [np.array(column) for column in zip(*outputs)]
+    return [np.array(outputs)]
+
+def assert_matches(outputs, expected):
+    if not isinstance(expected, tuple):
+        expected = (expected,)
+    for actual, batch in zip(outputs, expected):
+        np.testing.assert_array_equal(actual, np.asarray(batch, dtype=float))
+
+def test_streaming_matches_batch(bars):
+    high, low, close = bars['High'], bars['Low'], bars['Close']
+    hlc = list(zip(high, low, close))
+
+    for window in (1, 5, 20):
+        assert_matches(run(streaming.RollingMean(window), close), close.rolling(window).mean())
+        assert_matches(run(streaming.RollingExtreme(window, 'min'), low), low.rolling(window).min())
+        np.testing.assert_allclose(
+            run(streaming.RollingStd(window), close)[0], close.rolling(window).std(), rtol=1e-9
+        )
+    assert_matches(run(streaming.EMA(12), close), close.ewm(span=12, adjust=False).mean())
+    assert_matches(run(streaming.RSI(14), close), MomentumIndicators.calculate_rsi(close))
+    assert_matches(run(streaming.MACD(), close), MomentumIndicators.calculate_macd(close))
+    assert_matches(run(streaming.ATR(14), hlc), VolatilityIndicators.calculate_atr(high, low, close))
+    assert_matches(run(streaming.KDJ(), hlc), MomentumIndicators.calculate_kdj(high, low, close))
+    assert_matches(run(streaming.ADX(14), hlc), TrendIndicators.calculate_adx(high, low, close))
+
+def test_snapshot_restore(bars):
+    records = bars.to_dict('records')
+    split = len(records) // 2
+    for cls in (streaming.KDJ, streaming.ADX, streaming.MACD, streaming.ATR):
+        uses_bar = cls in (streaming.KDJ, streaming.ADX, streaming.ATR)
+        inputs = records if uses_bar else [r['Close'] for r in records]
+        full = cls()
+        expected = [full.update(x) for x in inputs]
+
+        first = cls()
+        for x in inputs[:split]:
+            first.update(x)
+        state = json.loads(json.dumps(first.snapshot()))
+        resumed = cls().restore(state)
+        actual = [resumed.update(x) for x in inputs[split:]]
+        np.testing.assert_array_equal(np.array(actual, dtype=float), np.array(expected[split:], dtype=float))
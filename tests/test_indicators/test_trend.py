@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators.backends import NumpyBackend
+from src.indicators.panel import PanelIndicators
+from src.indicators.trend import TrendIndicators, adx_kernel, supertrend_kernel, supertrend_panel
+
+def reference_adx(high, low, close, period):
+    """原先基于 Series 和 pd.concat 的实现"""
+    up_move = high - high.shift(1)
+    down_move = low.shift(1) - low
+    plus_dm = pd.Series(0.0, index=up_move.index)
+    plus_dm[(up_move > down_move) & (up_move > 0)] = up_move
+    minus_dm = pd.Series(0.0, index=down_move.index)
+    minus_dm[(down_move > up_move) & (down_move > 0)] = down_move
+    tr = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+    plus_di = 100 * plus_dm.rolling(period).mean() / tr.rolling(period).mean()
+    minus_di = 100 * minus_dm.rolling(period).mean() / tr.rolling(period).mean()
+    dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+    return dx.rolling(period).mean(), plus_di, minus_di
+
+def reference_supertrend(high, low, close, period, multiplier):
+    """原先基于 iloc 循环的实现"""
+    tr = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+    atr = tr.rolling(period).mean()
+    basic_upper = (high + low) / 2 + multiplier * atr
+    basic_lower = (high + low) / 2 - multiplier * atr
+    final_upper = pd.Series(index=close.index, dtype=float)
+    final_lower = pd.Series(index=close.index, dtype=float)
+    for i in range(len(close)):
+        if i == 0:
+            final_upper.iloc[i] = basic_upper.iloc[i]
+            final_lower.iloc[i] = basic_lower.iloc[i]
+        else:
+            final_upper.iloc[i] = (
+                basic_upper.iloc[i]
+                if (basic_upper.iloc[i] < final_upper.iloc[i-1] or close.iloc[i-1] > final_upper.iloc[i-1])
+                else final_upper.iloc[i-1]
+            )
+            final_lower.iloc[i] = (
+                basic_lower.iloc[i]
+                if (basic_lower.iloc[i] > final_lower.iloc[i-1] or close.iloc[i-1] < final_lower.iloc[i-1])
+                else final_lower.iloc[i-1]
+            )
+    supertrend = pd.Series(index=close.index, dtype=float)
+    for i in range(len(close)):
+        if i == 0:
+            supertrend.iloc[i] = final_upper.iloc[i]
+        elif supertrend.iloc[i-1] == final_upper.iloc[i-1]:
+            supertrend.iloc[i] = final_upper.iloc[i] if close.iloc[i] <= final_upper.iloc[i] else final_lower.iloc[i]
+        elif supertrend.iloc[i-1] == final_lower.iloc[i-1] and close.iloc[i] >= final_lower.iloc[i]:
+            supertrend.iloc[i] = final_lower.iloc[i]
+        else:
+            supertrend.iloc[i] = final_upper.iloc[i]
+    return supertrend, (close > supertrend).astype(int), final_upper, final_lower
+
+def test_supertrend_matches_reference():
+    market = SyntheticMarket(4, '2019-01-01', '2020-12-31', seed=3)
+    for symbol in market.symbols:
+        df = market.get_stock_data(symbol)
+        for period in (1, 10):
+            expected = reference_supertrend(df['High'], df['Low'], df['Close'], period, 3.0)
+            actual = supertrend_kernel(df['High'], df['Low'], df['Close'], period, 3.0)
+            defined = expected[0].notna().to_numpy()
+            for exp, act in zip(expected, actual):
+                np.testing.assert_array_equal(exp.to_numpy()[defined], act[defined])
+            # 原实现在 period > 1 时全部为 NaN, 新实现从第 period 根K线起有值
+            assert not np.isnan(actual[0][period - 1:]).any()
+
+        supertrend, direction = TrendIndicators.calculate_supertrend(df['High'], df['Low'], df['Close'])
+        assert supertrend.index.equals(df.index)
+        assert set(direction.unique()) <= {0, 1}
+
+def test_supertrend_panel_matches_kernel():
+    market = SyntheticMarket(30, '2018-01-01', '2020-12-31', seed=5)
+    data = market.generate()
+    assert np.isnan(data['close']).any()
+    panel = supertrend_panel(data['high'], data['low'], data['close'], 7, 2.5)
+    for j in range(len(market.symbols)):
+        single = supertrend_kernel(data['high'][:, j], data['low'][:, j], data['close'][:, j], 7, 2.5)
+        for p, s in zip(panel, single):
+            np.testing.assert_array_equal(p[:, j], s)
+
+
+def test_adx_matches_reference():
+    market = SyntheticMarket(3, '2019-01-01', '2020-12-31', seed=3)
+    for symbol in market.symbols:
+        df = market.get_stock_data(symbol)
+        high, low, close = df['High'], df['Low'], df['Close']
+        for period in (5, 14):
+            actual = TrendIndicators.calculate_adx(high, low, close, period)
+            for exp, act in zip(reference_adx(high, low, close, period), actual):
+                pd.testing.assert_series_equal(act, exp, check_names=False)
+
+            wilder = TrendIndicators.calculate_adx(high, low, close, period, smoothing='wilder')
+            arrays = (high.to_numpy(), low.to_numpy(), close.to_numpy())
+            np.testing.assert_allclose(wilder[0].to_numpy(), NumpyBackend().adx(*arrays, period))
+            assert wilder[0].notna().sum() == len(close) - 2 * period + 1
+
+    with pytest.raises(ValueError):
+        adx_kernel(high.to_numpy(), low.to_numpy(), close.to_numpy(), 14, 'ema')
+
+@pytest.mark.parametrize('smoothing', ['simple', 'wilder'])
+def test_adx_panel_matches_kernel(smoothing):
+    market = SyntheticMarket(30, '2018-01-01', '2020-12-31', seed=5)
+    data = market.generate()
+    panel = adx_kernel(data['high'], data['low'], data['close'], 14, smoothing)
+    for j in range(len(market.symbols)):
+        single = adx_kernel(data['high'][:, j], data['low'][:, j], data['close'][:, j], 14, smoothing)
+        for p, s in zip(panel, single):
+            np.testing.assert_allclose(p[:, j], s, rtol=1e-12)
+
+    frames = {field: pd.DataFrame(data[field]) for field in ('high', 'low', 'close')}
+    adx, _, _ = PanelIndicators.calculate_adx(frames['high'], frames['low'], frames['close'], smoothing=smoothing)
+    np.testing.assert_allclose(adx.to_numpy(), panel[0])
@@ -0,0 +1,135 @@
+import multiprocessing as mp
+import pytest
+import pandas as pd
+import numpy as np
+from src.utils.cache import Cache, LRUCache
+from src.utils.column_store import ColumnStore
+
+@pytest.fixture
+def bars():
+    dates = pd.date_range('2023-01-01', periods=300, freq='D')
+    return pd.DataFrame({
+        'open': np.random.rand(300) + 10,
+        'close': np.random.rand(300) + 10,
+        'volume': np.random.randint(1000, 10000, 300),
+    }, index=pd.Index(dates, name='Date'))
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_column_store_roundtrip(tmp_path, bars, compress):
+    store = ColumnStore(str(tmp_path), compress=compress)
+    assert store.write('sh.600000', bars)
+    result = store.read('sh.600000')
+    pd.testing.assert_frame_equal(result, bars, check_freq=False)
+
+def test_column_store_projection(tmp_path, bars):
+    store = ColumnStore(str(tmp_path))
+    store.write('sh.600000', bars)
+    result = store.read('sh.600000', columns=['close'], start='2023-06-01', end='2023-06-30')
+    expected = bars.loc['2023-06-01':'2023-06-30', ['close']]
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+def test_column_store_string_index(tmp_path, bars):
+    bars.index = bars.index.strftime('%Y-%m-%d').rename('Date')
+    store = ColumnStore(str(tmp_path))
+    store.write('sh.600000', bars)
+    result = store.read('sh.600000', start='2023-10-01')
+    assert result.index[0] == '2023-10-01'
+    assert len(result) == len(bars.loc['2023-10-01':])
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_column_store_missing_values_and_names(tmp_path, bars, compress):
+    bars['name'] = ['浦发银行', None, np.nan] * 100
+    bars['a/b .. c'] = bars['close']
+    bars['a%2Fb'] = bars['open']
+    store = ColumnStore(str(tmp_path), compress=compress)
+    assert store.write('sh.600000', bars)
+    result = store.read('sh.600000')
+    assert result['name'].isna().tolist() == bars['name'].isna().tolist()
+    assert result['name'].iloc[0] == '浦发银行'
+    pd.testing.assert_series_equal(result['a/b .. c'], bars['a/b .. c'], check_freq=False)
+    pd.testing.assert_series_equal(result['a%2Fb'], bars['a%2Fb'], check_freq=False)
+    assert sorted(p.name for p in (tmp_path / 'sh.600000').iterdir() if p.name != 'meta.json') == sorted(
+        f'{name}.npy' + ('.z' if compress else '')
+        for name in ['__index__', 'open', 'close', 'volume', 'name', 'name.null', 'a%2Fb%20%2E%2E%20c', 'a%252Fb']
+    )
+
+def test_cache_uses_column_store(tmp_path, bars):
+    cache = Cache(str(tmp_path))
+    assert cache.set('sh.600000_2023-01-01', bars)
+    assert len(cache.store.symbols()) == 1
+    assert list(cache.get('sh.600000_2023-01-01', columns=['close']).columns) == ['close']
+
+    # 非DataFrame对象仍然使用pickle
+    cache.set('info', {'name': '浦发银行'})
+    assert cache.get('info') == {'name': '浦发银行'}
+
+    cache.clear()
+    assert cache.get('sh.600000_2023-01-01') is None
+    assert cache.get('info') is None
+
+def test_lru_cache_byte_budget(bars):
+    size = LRUCache.sizeof(bars)
+    cache = LRUCache(max_bytes=size * 2)
+    cache.set('a', bars)
+    cache.set('b', bars)
+    cache.get('a')
+    cache.set('c', bars)
+
+    # b最久未使用, 被淘汰
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+
+def test_cache_manifest_versions_and_bulk(tmp_path, bars):
+    cache = Cache(str(tmp_path))
+    assert cache.set_many({'a': bars, 'b': bars, 'c': [1, 2, 3]})
+    cache.set('a', bars.iloc[:10])
+    assert cache.version('a') == 2 and cache.version('b') == 1
+    assert cache.version('missing') is None
+
+    result = cache.get_many(['a', 'c', 'missing'], columns=['close'])
+    assert set(result) == {'a', 'c'}
+    assert len(result['a']) == 10 and result['c'] == [1, 2, 3]
+
+    # 旧版本的文件已删除
+    assert len(cache.store.symbols()) == 2
+
+def test_cache_size_eviction(tmp_path, bars):
+    cache = Cache(str(tmp_path))
+    cache.set('probe', bars)
+    entry_size = cache.size()
+    cache.clear()
+
+    cache = Cache(str(tmp_path), max_bytes=entry_size * 2)
+    cache.set('a', bars)
+    cache.set('b', bars)
+    cache.get('a')
+    cache.set('c', bars)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.size() <= entry_size * 2
+
+def write_repeatedly(cache_dir, worker):
+    cache = Cache(cache_dir)
+    for i in range(20):
+        df = pd.DataFrame({'close': np.full(100, float(worker * 100 + i))})
+        assert cache.set('shared', df)
+        value = cache.get('shared')
+        # 读到的总是某一次完整的写入
+        assert value is None or value['close'].nunique() == 1
+
+def test_cache_concurrent_processes(tmp_path):
+    ctx = mp.get_context('spawn')
+    processes = [ctx.Process(target=write_repeatedly, args=(str(tmp_path), w)) for w in range(3)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(60)
+    assert [p.exitcode for p in processes] == [0, 0, 0]
+
+    cache = Cache(str(tmp_path))
+    assert cache.version('shared') == 60
+    assert len(cache.store.symbols()) == 1
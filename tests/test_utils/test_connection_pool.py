@@ -0,0 +1,53 @@
+import os
+import time
+import pytest
+from src.utils.connection_pool import BaostockWorkerPool
+
+def worker_pid(value):
+    return value, os.getpid()
+
+def failing_job():
+    raise ValueError("bad symbol")
+
+def crash_worker():
+    os._exit(1)
+
+def test_pool_runs_jobs_in_workers():
+    with BaostockWorkerPool(size=2) as pool:
+        futures = [pool.submit(worker_pid, i) for i in range(8)]
+        results = [f.result(timeout=60) for f in futures]
+    assert [value for value, _ in results] == list(range(8))
+    assert os.getpid() not in {pid for _, pid in results}
+
+def test_pool_reports_errors_and_restarts_workers():
+    with BaostockWorkerPool(size=1, health_interval=0.5) as pool:
+        with pytest.raises(RuntimeError, match="bad symbol"):
+            pool.submit(failing_job).result(timeout=60)
+
+        with pytest.raises(RuntimeError):
+            pool.submit(crash_worker).result(timeout=60)
+
+        # 退出的进程被重新拉起后继续处理任务
+        assert pool.submit(worker_pid, 1).result(timeout=60)[0] == 1
+
+def sleep_job(seconds):
+    time.sleep(seconds)
+    return seconds
+
+def test_pool_detects_dead_worker_while_others_return_results():
+    with BaostockWorkerPool(size=2, health_interval=0.5) as pool:
+        # 先让两个进程都启动完成, 再让其中一个退出, 另一个持续返回结果
+        [f.result(timeout=60) for f in [pool.submit(sleep_job, 0.5) for _ in range(2)]]
+        crashed = pool.submit(crash_worker)
+        busy = [pool.submit(sleep_job, 0.05) for _ in range(200)]
+        with pytest.raises(RuntimeError, match="异常退出"):
+            crashed.result(timeout=5)
+        assert all(f.result(timeout=60) == 0.05 for f in busy)
+
+def test_pool_skips_cancelled_jobs():
+    with BaostockWorkerPool(size=1) as pool:
+        first = pool.submit(sleep_job, 0.5)
+        queued = pool.submit(worker_pid, 1)
+        assert queued.cancel()
+        assert first.result(timeout=60) == 0.5
+        assert pool.submit(worker_pid, 2).result(timeout=60)[0] == 2
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import SyntheticMarket
+from src.indicators.features import FeatureGraph
+from src.strategies.factor_strategy import FactorStrategy
+from src.strategies.mean_reversion import MeanReversionStrategy
+from src.strategies.ml_strategy import MLStrategy
+from src.utils.precision import get_precision, set_precision, to_precision, use_precision
+
+REQUESTS = {
+    'ma': 'ma', 'ema': 'ema', 'bollinger': 'bollinger', 'donchian': 'donchian',
+    'atr': 'atr', 'macd': 'macd', 'drawdown': 'drawdown', 'rsi': 'rsi', 'kdj': 'kdj',
+}
+
+@pytest.fixture(scope='module')
+def market():
+    return SyntheticMarket(30, '2012-01-01', '2020-12-31', seed=4)
+
+def _compute(market, precision):
+    with use_precision(precision):
+        panel = market.panel()
+        graph = FeatureGraph(high=panel['high'], low=panel['low'], close=panel['close'])
+        return graph.compute(REQUESTS), panel['close'].to_numpy(dtype=np.float64)
+
+def test_float32_error_bounds(market):
+    exact, close = _compute(market, 'float64')
+    reduced, _ = _compute(market, 'float32')
+    price = np.nanmax(close, axis=0)
+
+    for name in REQUESTS:
+        outputs = (exact[name], reduced[name])
+        if not isinstance(exact[name], tuple):
+            outputs = ((exact[name],), (reduced[name],))
+        for expected, actual in zip(*outputs):
+            assert actual.dtypes.eq(np.float32).all(), name
+            expected = expected.to_numpy()
+            actual = actual.to_numpy(dtype=np.float64)
+            np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual))
+            error = np.abs(actual - expected)
+            if name in ('rsi', 'kdj'):
+                assert np.nanmax(error) < 0.01, name
+            elif name in ('macd', 'drawdown'):
+                assert np.nanmax(error / price) < 1e-6, name
+            else:
+                bound = 1e-5 if name == 'atr' else 1e-6
+                assert np.nanmax(error / np.abs(expected)) < bound, name
+
+def test_float32_signals(market):
+    results = []
+    for precision in ('float64', 'float32'):
+        with use_precision(precision):
+            bars = market.get_stock_data(market.symbols[0]).rename(columns=str.lower)
+            results.append(MeanReversionStrategy().generate_signals(bars))
+    exact, reduced = results
+    assert reduced['close'].dtype == np.float32 and reduced['rsi'].dtype == np.float32
+    # 成交额保持 float64
+    assert reduced['amount'].dtype == np.float64
+    pd.testing.assert_series_equal(exact['signal'], reduced['signal'])
+
+@pytest.mark.parametrize('strategy_cls', [MeanReversionStrategy, FactorStrategy, MLStrategy])
+def test_strategy_columns_follow_precision(market, strategy_cls):
+    with use_precision('float32'):
+        bars = market.get_stock_data(market.symbols[0]).rename(columns=str.lower)
+        columns = set(bars.columns)
+        signals = strategy_cls().generate_signals(bars)
+    added = signals[[column for column in signals.columns if column not in columns]]
+    floats = [column for column, dtype in added.dtypes.items() if np.issubdtype(dtype, np.floating)]
+    assert floats and all(added[column].dtype == np.float32 for column in floats)
+
+def test_precision_setting():
+    assert get_precision() == 'float64'
+    with use_precision('float32'):
+        frame = to_precision(pd.DataFrame({'Close': [1.5], 'Volume': [100]}))
+        assert frame.dtypes.to_dict() == {'Close': np.float32, 'Volume': np.int64}
+    assert get_precision() == 'float64'
+    with pytest.raises(ValueError):
+        set_precision('float16')
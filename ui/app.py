@@ -4,6 +4,7 @@ from ui.pages.single_stock import render_single_stock_page
 from ui.pages.screening import render_screening_page
 import pandas as pd
 import atexit
+from ui.data_source import DEFAULT_START_DATE, get_data_source, select_data_source
 
 def cleanup():
     """清理资源"""
@@ -32,8 +33,9 @@ def main():
             
             # 用户设置区
             with st.expander("⚙️ 系统设置", expanded=False):
-                st.selectbox("选择数据源", ["BaoStock", "TuShare", "离线数据"])
-                st.date_input("默认起始日期", value=pd.to_datetime('2020-01-01'))
+                source_name = st.selectbox("选择数据源", ["BaoStock", "TuShare", "离线数据"])
+                select_data_source(source_name)
+                st.date_input("默认起始日期", value=pd.to_datetime(DEFAULT_START_DATE), key='start_date')
             
             # 主导航
             page = st.radio(
@@ -51,7 +53,7 @@ def main():
             st.sidebar.markdown("### 关于")
             st.sidebar.info(
                 "本工具用于股票策略分析和回测。"
-                "数据来源: BaoStock"
+                f"数据来源: {get_data_source().name}"
             )
         
         # 主页面路由
@@ -0,0 +1,34 @@
+import streamlit as st
+from typing import Optional
+from src.data.market_data import MarketData
+from src.data.sources import DATA_SOURCES, DataSource, create_data_source
+from src.utils.config import Config
+
+DEFAULT_START_DATE = '2020-01-01'
+
+def select_data_source(source_name: str):
+    """根据侧边栏选择创建数据源, 保存在 session_state.data_source"""
+    if source_name not in DATA_SOURCES:
+        st.warning(f"{source_name} 暂不支持, 使用 BaoStock")
+        source_name = "BaoStock"
+    
+    current = st.session_state.get('data_source')
+    if current is not None and current.name == source_name:
+        return
+    
+    kwargs = {}
+    if source_name == "离线数据":
+        kwargs['root_dir'] = Config().get('data', {}).get('offline_dir', 'data/offline')
+    st.session_state.data_source = create_data_source(source_name, **kwargs)
+
+def get_data_source() -> DataSource:
+    """当前会话选择的数据源, 尚未选择时使用 BaoStock"""
+    if st.session_state.get('data_source') is None:
+        select_data_source("BaoStock")
+    return st.session_state.data_source
+
+def get_market_data(max_symbols: Optional[int] = None) -> MarketData:
+    """基于当前数据源和侧边栏起始日期的市场数据"""
+    start_date = st.session_state.get('start_date')
+    start_date = start_date.strftime('%Y-%m-%d') if start_date else DEFAULT_START_DATE
+    return MarketData(get_data_source(), start_date=start_date, max_symbols=max_symbols)
@@ -1,14 +1,15 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.data.market_data import MarketData
+from ui.data_source import get_market_data
 
 def render_market_overview():
     """渲染市场概览页面"""
     st.title("市场概览")
     
-    # 初始化数据
-    market_data = MarketData()
+    # 初始化数据, 全市场统计只扫描前 max_symbols 只股票
+    max_symbols = st.sidebar.number_input("统计股票数", min_value=10, max_value=6000, value=300, step=10)
+    market_data = get_market_data(max_symbols=int(max_symbols))
     
     # 1. 市场指标概览
     st.subheader("主要指数")
@@ -16,24 +17,16 @@ def render_market_overview():
     
     try:
         indices = market_data.get_market_overview()
-        with col1:
-            st.metric(
-                label="上证指数",
-                value=f"{indices['上证指数']['value']:,.2f}",
-                delta=f"{indices['上证指数']['change']:.2f}%"
-            )
-        with col2:
-            st.metric(
-                label="深证成指",
-                value=f"{indices['深证成指']['value']:,.2f}",
-                delta=f"{indices['深证成指']['change']:.2f}%"
-            )
-        with col3:
-            st.metric(
-                label="创业板指",
-                value=f"{indices['创业板指']['value']:,.2f}",
-                delta=f"{indices['创业板指']['change']:.2f}%"
-            )
+        for col, name in zip([col1, col2, col3], ["上证指数", "深证成指", "创业板指"]):
+            with col:
+                if name in indices:
+                    st.metric(
+                        label=name,
+                        value=f"{indices[name]['value']:,.2f}",
+                        delta=f"{indices[name]['change']:.2f}%"
+                    )
+                else:
+                    st.metric(label=name, value="-")
     except Exception as e:
         st.error(f"获取市场数据失败: {str(e)}")
     
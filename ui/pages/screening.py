@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.data.market_data import MarketData
+from ui.data_source import get_market_data
 
 def render_screening_page():
     """渲染策略选股页面"""
@@ -72,9 +72,10 @@ def render_screening_page():
     # 执行选股
     col1, col2 = st.columns([1, 3])
     with col1:
+        max_symbols = st.number_input("扫描股票数", min_value=10, max_value=6000, value=300, step=10)
         if st.button("开始选股", type="primary"):
             try:
-                market_data = MarketData()
+                market_data = get_market_data(max_symbols=int(max_symbols))
                 
                 # 收集筛选条件
                 criteria = {
@@ -96,8 +97,9 @@ def render_screening_page():
                     'industry': industry
                 }
                 
-                # 执行选股
-                results = market_data.screen_stocks(criteria)
+                # 执行选股; 市净率、成长和质量指标数据源不提供, 不参与筛选
+                with st.spinner(f"正在从 {market_data.source.name} 读取数据..."):
+                    results = market_data.screen_stocks(criteria)
                 
                 if not results.empty:
                     st.success(f"选股完成！找到 {len(results)} 只符合条件的股票")
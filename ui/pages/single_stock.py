@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.data.market_data import MarketData
+from ui.data_source import get_market_data
 from src.utils.validators import validate_stock_code
 
 def render_single_stock_page():
@@ -20,22 +20,26 @@ def render_single_stock_page():
         
         if st.button("获取数据"):
             try:
-                market_data = MarketData()
+                market_data = get_market_data()
                 stock_info = market_data.get_stock_info(symbol)
                 if stock_info:
                     st.success("数据获取成功！")
+                    st.session_state.stock_data = stock_info['data']
                     
                     # 显示基本信息
-                    st.subheader("基本信息")
+                    st.subheader(f"基本信息 ({market_data.source.name})")
                     metrics = {
+                        "名称": stock_info.get('name') or symbol,
                         "最新价": f"¥{stock_info['close']:.2f}",
                         "涨跌幅": f"{stock_info['change_pct']:.2f}%",
-                        "换手率": f"{stock_info['turnover_rate']:.2f}%",
-                        "市盈率": f"{stock_info['pe_ratio']:.2f}",
-                        "市值": f"{stock_info['market_cap']:.0f}亿"
+                        "成交量": f"{stock_info['volume']:,.0f}",
+                        "市盈率": f"{stock_info.get('pe_ratio', 0):.2f}",
+                        "市值": f"{stock_info.get('market_cap', 0):.0f}亿"
                     }
                     for key, value in metrics.items():
                         st.metric(key, value)
+                else:
+                    st.error(f"{market_data.source.name} 中没有 {symbol} 的数据")
             except Exception as e:
                 st.error(f"获取数据失败: {str(e)}")
     
@@ -63,7 +67,7 @@ def plot_stock_chart(data: pd.DataFrame):
     plt.figure(figsize=(12, 6))
     
     # 绘制K线图
-    plt.plot(data.index, data['close'], label='收盘价')
+    plt.plot(data.index, data['Close'], label='收盘价')
     plt.title("股票走势图")
     plt.xlabel("日期")
     plt.ylabel("价格")